@@ -1,4 +1,7 @@
 # app.py
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -10,14 +13,38 @@ from routers import stt, tts, game, diary, chat
 
 from common.logging import setup_logging, get_logger
 from common.errors import register_exception_handlers
+from common.llm import close_async_client
+from common.metrics import metrics
+from common.session_store import start_sweeper, stop_sweeper
+from common.session_backend import close_backends
+from common.background import start_queues, drain_queues
+from memory.vdb import close_vdb
 
 # 로깅 설정
 setup_logging()
 log = get_logger("greeni")
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # 버려진 대화 세션 주기적 정리
+    start_sweeper()
+    # 기억 저장 등 write-behind 작업
+    start_queues()
+    yield
+    await stop_sweeper()
+    # 남은 write-behind 작업을 먼저 처리(임베딩/벡터 저장소가 닫히기 전에)
+    await drain_queues()
+    await close_backends()
+    await asyncio.to_thread(close_vdb)
+    # 종료 시 공유 LLM 커넥션 풀 정리
+    await close_async_client()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # 전역 핸들러 등록
@@ -61,6 +88,11 @@ app.include_router(chat.router, prefix="/chat", tags=["chat"])
 def health():
     return {"ok": True, "env": settings.ENV}
 
+# 프로세스 내 메트릭(캐시 히트율 등)
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
 # HTTPException은 현재처럼 dict면 그대로 내려주되, 응답 형태는 고정
 @app.exception_handler(HTTPException)
 async def http_exception_handler(_: Request, exc: HTTPException):
@@ -0,0 +1,91 @@
+# bench/bench_ann.py
+"""
+memory/ann.py IVF / IVF-PQ recall vs 지연 (brute-force 대비).
+
+  python bench/bench_ann.py                       # 100k, dim 256
+  python bench/bench_ann.py --n 1000000 --nprobe 4 8 16
+
+- 데이터: 가우시안 혼합(임베딩처럼 군집이 있는 분포). 순수 랜덤 벡터는 IVF에 최악의 경우라 쓰지 않음
+- recall@10: 같은 Collection의 exact=True 결과 대비
+- 지연: 질의 1개 top-10 p50/p95
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from memory.vdb import Collection  # noqa: E402
+
+K = 10
+BATCH = 50_000
+
+
+def dataset(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(16, n // 500), dim), dtype=np.float32)
+    out = np.empty((n, dim), dtype=np.float32)
+    for s in range(0, n, BATCH):
+        m = min(BATCH, n - s)
+        out[s:s + m] = centers[rng.integers(0, centers.shape[0], m)] + 0.6 * rng.standard_normal((m, dim), dtype=np.float32)
+    return out
+
+
+def latency(col: Collection, queries: np.ndarray, **kw) -> tuple[list[list[str]], float, float]:
+    ids, ms = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        hits = col.search(q, K, **kw)[0]
+        ms.append((time.perf_counter() - t0) * 1000)
+        ids.append([h.id for h in hits])
+    return ids, float(np.percentile(ms, 50)), float(np.percentile(ms, 95))
+
+
+def recall(truth: list[list[str]], got: list[list[str]]) -> float:
+    return float(np.mean([len(set(t) & set(g)) / K for t, g in zip(truth, got)]))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=100_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    ap.add_argument("--kinds", nargs="+", default=["ivf", "ivfpq"])
+    args = ap.parse_args()
+
+    x = dataset(args.n, args.dim)
+    rng = np.random.default_rng(1)
+    queries = x[rng.choice(args.n, args.queries, replace=False)] + 0.1 * rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    print(f"n={args.n:,}, dim={args.dim}, k={K}, queries={args.queries}")
+
+    for kind in args.kinds:
+        workdir = tempfile.mkdtemp(prefix="bench_ann_")
+        try:
+            col = Collection(workdir, args.dim, index=kind, ann_min_vectors=1, max_segments=10**9)
+            for s in range(0, args.n, BATCH):
+                col.add([f"m{i}" for i in range(s, min(args.n, s + BATCH))], x[s:s + BATCH])
+            t0 = time.perf_counter()
+            col.flush()
+            build_s = time.perf_counter() - t0
+
+            truth, p50, p95 = latency(col, queries, exact=True)
+            print(f"\n[{kind}] build {build_s:.2f} s, nlist={len(col.index.lists)}")
+            print(f"  brute-force      recall 1.000   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+            for nprobe in args.nprobe:
+                got, p50, p95 = latency(col, queries, nprobe=nprobe)
+                print(f"  nprobe={nprobe:<4}      recall {recall(truth, got):.3f}   p50 {p50:7.2f} ms   p95 {p95:7.2f} ms")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
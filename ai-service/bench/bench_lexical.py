@@ -0,0 +1,65 @@
+# bench/bench_lexical.py
+"""
+memory/lexical.py LexicalIndex 지연 측정 (아이 1명 분량의 기억).
+
+  python bench/bench_lexical.py
+  python bench/bench_lexical.py --docs 100 500 2000
+
+- build : 전체 빌드 / 1건 추가 후 재빌드(reuse)
+- query : 질의 1개 top-5 (BM25 + 문자/자모 n-gram) p50/p95
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from memory.lexical import LexicalIndex  # noqa: E402
+
+WORDS = (
+    "오늘 친구 학교 유치원 엄마 아빠 동생 놀이터 그림 노래 책 게임 축구 피아노 수영 공룡 로봇 인형 "
+    "과자 케이크 비 눈 바다 산 여행 생일 선물 병원 치과 감기 강아지 고양이 할머니 김치전 블록"
+).split()
+QUERIES = ["오늘 유치원에서 친구랑 그림 그렸어", "강아지 보고 싶어", "할머니 댁에 또 가고 싶다", "치과 무서워"]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, nargs="+", default=[100, 500, 2000])
+    ap.add_argument("--rounds", type=int, default=1000)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.docs:
+        texts = [" ".join(rng.choice(WORDS, 10)) + "했다" for _ in range(n)]
+        ids = [f"m{i}" for i in range(n)]
+        metas = [{"text": t} for t in texts]
+
+        t0 = time.perf_counter()
+        index = LexicalIndex(ids, metas)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        index = LexicalIndex(ids + ["new"], metas + [{"text": "새로 추가된 기억"}], reuse=index)
+        rebuild_ms = (time.perf_counter() - t0) * 1000
+
+        ms = []
+        for i in range(args.rounds):
+            t0 = time.perf_counter()
+            index.search(QUERIES[i % len(QUERIES)], 5)
+            ms.append((time.perf_counter() - t0) * 1000)
+
+        print(
+            f"docs={n:>5}  build {build_ms:7.1f} ms   +1 rebuild {rebuild_ms:6.1f} ms   "
+            f"query p50 {np.percentile(ms, 50):.3f} ms  p95 {np.percentile(ms, 95):.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# bench/bench_stt_prepare.py
+"""
+STT 전처리 경로별 지연: 형식 판별 후 passthrough / NumPy 리샘플 vs 항상 ffmpeg.
+
+  python bench/bench_stt_prepare.py
+  python bench/bench_stt_prepare.py --seconds 3 10 --rounds 20
+
+입력(합성 음성):
+- wav16k  : 16kHz mono 16bit WAV -> resample (디코딩만)
+- wav44k  : 44.1kHz stereo 16bit WAV (브라우저/안드로이드 녹음 기본값) -> resample
+- wav48f  : 48kHz mono float32 WAV -> resample
+- mp3     : 44.1kHz mp3 -> passthrough
+- webm    : opus webm -> ffmpeg (비교용)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import time
+import wave
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common.upload import as_upload  # noqa: E402
+from services.stt_service import ffmpeg_exe, prepare_audio, transcode_to_pcm  # noqa: E402
+
+
+def make_wav(seconds: float, rate: int, channels: int) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    x = (np.sin(2 * np.pi * 220 * t) * 6000 + np.random.default_rng(0).normal(0, 500, t.size)).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.repeat(x, channels).tobytes())
+    return buf.getvalue()
+
+
+def convert(src: bytes, *args: str) -> bytes:
+    return subprocess.run(
+        [ffmpeg_exe(), "-loglevel", "error", "-i", "pipe:0", *args, "pipe:1"],
+        input=src, stdout=subprocess.PIPE, check=True,
+    ).stdout
+
+
+def inputs(seconds: float) -> dict:
+    wav44 = make_wav(seconds, 44100, 2)
+    return {
+        "wav16k": make_wav(seconds, 16000, 1),
+        "wav44k": wav44,
+        "wav48f": convert(wav44, "-ac", "1", "-ar", "48000", "-c:a", "pcm_f32le", "-f", "wav"),
+        "mp3": convert(wav44, "-f", "mp3"),
+        "webm": convert(wav44, "-c:a", "libopus", "-f", "webm"),
+    }
+
+
+async def timed(fn, rounds: int) -> list:
+    ms = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        await fn()
+        ms.append((time.perf_counter() - t0) * 1000)
+    return ms
+
+
+async def bench(args: argparse.Namespace) -> None:
+    for seconds in args.seconds:
+        print(f"--- {seconds:.0f}s")
+        for name, data in inputs(seconds).items():
+            path = (await prepare_audio(as_upload(data))).path
+            fast = await timed(lambda: prepare_audio(as_upload(data)), args.rounds)
+            slow = await timed(lambda: transcode_to_pcm(as_upload(data)), args.rounds)
+            print(
+                f"{name:<7} {len(data) / 1024:7.0f} KiB  {path:<11}  p50 {np.percentile(fast, 50):7.2f} ms   "
+                f"ffmpeg p50 {np.percentile(slow, 50):7.2f} ms   saved {np.percentile(slow, 50) - np.percentile(fast, 50):7.2f} ms"
+            )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, nargs="+", default=[3.0, 10.0])
+    ap.add_argument("--rounds", type=int, default=20)
+    asyncio.run(bench(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# bench/bench_stt_transcode.py
+"""
+STT 전처리(ffmpeg -> 16kHz mono) 비교: 임시 파일 경로 vs 파이프(메모리) 경로.
+
+  python bench/bench_stt_transcode.py
+  python bench/bench_stt_transcode.py --concurrency 1 4 16 --requests 64 --seconds 5
+
+- tempfile : 업로드를 ./tmp_stt에 쓰고 ffmpeg가 mp3 파일을 쓴 뒤 다시 읽음 (처음 구현)
+             (이전 구현: async 핸들러 안에서 subprocess.run -> 이벤트 루프가 멈춤)
+- pipe     : asyncio subprocess + stdin/stdout 파이프 -> PCM, 동시 실행 제한 없음
+- pool     : pipe + WorkerPool(코어 수만큼 실행, 넘치면 503) = services/stt_service.transcode_to_pcm
+             (shed: 503으로 거절된 비율. 지연/처리량은 성공한 요청 기준)
+동시 요청 c개를 이벤트 루프 하나에서 돌려 요청당 지연 p50/p95, 처리량, 루프 최대 정지 시간(loop stall),
+그리고 /proc/self/io 기준 요청당 I/O
+(disk write: 블록 장치 쓰기 write_bytes, syscall write: write 계열 시스템 호출 바이트 wchar).
+전사(OpenAI) 호출은 포함하지 않습니다.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+import wave
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import imageio_ffmpeg as iio_ffmpeg  # noqa: E402
+
+from common.errors import AppError  # noqa: E402
+from common.upload import as_upload  # noqa: E402
+from services.stt_service import _transcode, transcode_to_pcm  # noqa: E402
+
+TMP_DIR = os.path.join(ROOT, "tmp_stt_bench")
+FFMPEG_MP3_ARGS = ["-vn", "-ar", "16000", "-ac", "1", "-b:a", "64k", "-f", "mp3"]
+
+
+def make_wav(seconds: float, rate: int = 44100) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    pcm = (np.sin(2 * np.pi * 220 * t) * 6000 + np.random.default_rng(0).normal(0, 500, t.size)).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def transcode_tempfile(audio_bytes: bytes, filename: str) -> io.BytesIO:
+    unique = uuid.uuid4().hex
+    src = os.path.join(TMP_DIR, f"in_{unique}{os.path.splitext(filename)[1]}")
+    dst = os.path.join(TMP_DIR, f"conv_{unique}.mp3")
+    with open(src, "wb") as f:
+        f.write(audio_bytes)
+    try:
+        subprocess.run(
+            [iio_ffmpeg.get_ffmpeg_exe(), "-y", "-i", src, *FFMPEG_MP3_ARGS, dst],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        with open(dst, "rb") as f:
+            return io.BytesIO(f.read())
+    finally:
+        for path in (src, dst):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def proc_io() -> dict:
+    # 종료된 자식(ffmpeg)의 I/O도 wait 이후 부모 합계에 포함됩니다.
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+
+async def run(fn, audio: bytes, concurrency: int, requests: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    stall = [0.0]
+    running = True
+
+    async def heartbeat():
+        # 10ms마다 깨어나야 하는 작업이 실제로 얼마나 늦게 깨어나는지
+        while running:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stall[0] = max(stall[0], (time.perf_counter() - t0) * 1000 - 10)
+
+    async def one(_):
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                out = fn(audio, "voice.wav")
+                if asyncio.iscoroutine(out):
+                    await out
+            except AppError:
+                return None
+            return (time.perf_counter() - t0) * 1000
+
+    before_io = proc_io()
+    hb = asyncio.create_task(heartbeat())
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    ms = [m for m in results if m is not None] or [0.0]
+    wall = time.perf_counter() - t0
+    running = False
+    await hb
+    after_io = proc_io()
+    per = lambda k: (after_io.get(k, 0) - before_io.get(k, 0)) / requests  # noqa: E731
+    return {
+        "p50": np.percentile(ms, 50), "p95": np.percentile(ms, 95), "rps": len(ms) / wall, "stall": stall[0],
+        "shed": results.count(None) / requests,
+        "write_kb": per("write_bytes") / 1024, "wchar_kb": per("wchar") / 1024,
+    }
+
+
+async def bench(args: argparse.Namespace, audio: bytes) -> None:
+    # stt_service의 WorkerPool은 이벤트 루프 하나에 묶이므로 전체를 루프 하나에서 실행
+    await transcode_to_pcm(as_upload(audio), "voice.wav")  # warm-up
+    pipe = lambda audio, filename: _transcode(as_upload(audio), filename, 60.0)  # noqa: E731
+    pool = lambda audio, filename: transcode_to_pcm(as_upload(audio), filename)  # noqa: E731
+    for c in args.concurrency:
+        for name, fn in (("tempfile", transcode_tempfile), ("pipe", pipe), ("pool", pool)):
+            r = await run(fn, audio, c, args.requests)
+            print(
+                f"c={c:>3}  {name:<8}  p50 {r['p50']:7.1f} ms  p95 {r['p95']:7.1f} ms  {r['rps']:6.1f} req/s  "
+                f"loop stall {r['stall']:6.1f} ms  shed {r['shed']:4.0%}  "
+                f"disk write {r['write_kb']:7.1f} KiB/req  syscall write {r['wchar_kb']:7.1f} KiB/req"
+            )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--requests", type=int, default=64)
+    ap.add_argument("--seconds", type=float, default=5.0, help="업로드 음성 길이")
+    args = ap.parse_args()
+
+    os.makedirs(TMP_DIR, exist_ok=True)
+    audio = make_wav(args.seconds)
+    print(f"input: {len(audio) / 1024:.0f} KiB wav ({args.seconds:.0f}s)")
+    try:
+        asyncio.run(bench(args, audio))
+    finally:
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# bench/bench_turn_log.py
+"""
+TurnLog vs LangChain ConversationBufferMemory 비교.
+
+  python bench/bench_turn_log.py
+
+- import 시간: 새 프로세스에서 모듈 import에 걸린 시간
+- 턴당 할당량/시간: 히스토리 로드 -> OpenAI messages 조립 -> 턴 수 계산 -> 저장 1회
+(langchain_classic이 설치돼 있지 않으면 baseline은 건너뜁니다.)
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common.turn_log import TurnLog  # noqa: E402
+
+TURNS = 9
+ROUNDS = 2000
+USER = "오늘 유치원에서 친구랑 블록으로 큰 성을 만들었어"
+REPLY = "우와, 큰 성을 만들었구나! 어떤 모양으로 만들었는지 궁금해. 성 안에는 뭐가 있었어?"
+
+
+def import_ms(module: str) -> float:
+    code = f"import time; t=time.perf_counter(); import {module}; print((time.perf_counter()-t)*1000)"
+    return min(
+        float(subprocess.check_output([sys.executable, "-W", "ignore", "-c", code], cwd=ROOT).strip())
+        for _ in range(3)
+    )
+
+
+def turn_langchain(memory) -> int:
+    history = memory.load_memory_variables({})["chat_history"]
+    messages = [{"role": "system", "content": "sys"}]
+    for msg in history:
+        messages.append({"role": "user" if msg.type == "human" else "assistant", "content": msg.content})
+    messages.append({"role": "user", "content": USER})
+    tc = len(memory.chat_memory.messages) // 2
+    memory.save_context({"input": USER}, {"output": REPLY})
+    memory.chat_memory.messages[-2:] = []  # 히스토리 길이 고정
+    return tc
+
+
+def turn_log(log: TurnLog) -> int:
+    messages = [{"role": "system", "content": "sys"}]
+    messages.extend(log.messages)
+    messages.append({"role": "user", "content": USER})
+    tc = log.turn_count
+    log.append_turn(USER, REPLY)
+    del log.messages[-2:]
+    return tc
+
+
+def measure(fn, state) -> tuple[float, float]:
+    fn(state)
+    tracemalloc.start()
+    fn(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(state)
+    us = (time.perf_counter() - t0) / ROUNDS * 1e6
+    return us, peak / 1024
+
+
+def main() -> None:
+    print(f"history={TURNS} turns, rounds={ROUNDS}")
+
+    log = TurnLog()
+    for _ in range(TURNS):
+        log.append_turn(USER, REPLY)
+    us, kib = measure(turn_log, log)
+    print(f"TurnLog                   import {import_ms('common.turn_log'):8.1f} ms   turn {us:8.1f} us   peak alloc {kib:7.1f} KiB")
+
+    try:
+        from langchain_classic.memory import ConversationBufferMemory
+    except ImportError:
+        print("ConversationBufferMemory  (langchain_classic not installed, skipped)")
+        return
+
+    memory = ConversationBufferMemory(return_messages=True, memory_key="chat_history")
+    for _ in range(TURNS):
+        memory.save_context({"input": USER}, {"output": REPLY})
+    us, kib = measure(turn_langchain, memory)
+    print(f"ConversationBufferMemory  import {import_ms('langchain_classic.memory'):8.1f} ms   turn {us:8.1f} us   peak alloc {kib:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# bench/bench_vdb.py
+"""
+memory/vdb.py Collection 성능 측정.
+
+  python bench/bench_vdb.py                    # 10k / 100k / 1M, dim 256
+  python bench/bench_vdb.py --sizes 10000 --dim 512
+
+- build : add(배치 10k) + flush 전체 시간
+- open  : 재시작 시 컬렉션 열기(meta 재생 + mmap)
+- q1    : 질의 1개 top-10 지연(p50/p95)
+- q16   : 질의 16개 배치 top-10, 질의당 시간
+- argsort: 같은 점수 행렬을 전체 정렬했을 때(비교용)
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from memory.vdb import Collection, normalize  # noqa: E402
+
+K = 10
+BATCH = 10_000
+
+
+def pct(samples: list[float], p: float) -> float:
+    return float(np.percentile(samples, p))
+
+
+def run(n: int, dim: int, rounds: int) -> None:
+    rng = np.random.default_rng(0)
+    workdir = tempfile.mkdtemp(prefix="bench_vdb_")
+    try:
+        col = Collection(workdir, dim, max_segments=10**9)
+        t0 = time.perf_counter()
+        for start in range(0, n, BATCH):
+            m = min(BATCH, n - start)
+            vecs = rng.standard_normal((m, dim), dtype=np.float32)
+            col.add([f"m{start + i}" for i in range(m)], vecs, [{"kind": "summary"} for _ in range(m)])
+        col.flush()
+        col.compact()
+        build_s = time.perf_counter() - t0
+        del col
+
+        t0 = time.perf_counter()
+        col = Collection(workdir, dim)
+        open_ms = (time.perf_counter() - t0) * 1000
+
+        queries = rng.standard_normal((rounds, dim), dtype=np.float32)
+        col.search(queries[0], K)  # page-in
+
+        q1 = []
+        for q in queries:
+            t0 = time.perf_counter()
+            col.search(q, K)
+            q1.append((time.perf_counter() - t0) * 1000)
+
+        batches = max(1, rounds // 16)
+        t0 = time.perf_counter()
+        for b in range(batches):
+            col.search(queries[(b * 16) % rounds:(b * 16) % rounds + 16], K)
+        q16 = (time.perf_counter() - t0) * 1000 / (batches * 16)
+
+        mat = np.asarray(col._segments[0][1])
+        qn = normalize(queries[:1])
+        t0 = time.perf_counter()
+        for _ in range(min(rounds, 20)):
+            np.argsort(-(mat @ qn.T), axis=0)[:K]
+        full_sort = (time.perf_counter() - t0) * 1000 / min(rounds, 20)
+
+        print(
+            f"n={n:>9,}  build {build_s:7.2f} s   open {open_ms:7.1f} ms   "
+            f"q1 p50 {pct(q1, 50):7.2f} ms  p95 {pct(q1, 95):7.2f} ms   "
+            f"q16 {q16:6.2f} ms/q   argsort {full_sort:7.2f} ms"
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--rounds", type=int, default=100)
+    args = ap.parse_args()
+
+    print(f"dim={args.dim}, k={K}, float32 cosine (argpartition top-k)")
+    for n in args.sizes:
+        run(n, args.dim, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
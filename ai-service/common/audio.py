@@ -0,0 +1,257 @@
+# common/audio.py
+from __future__ import annotations
+
+import io
+import struct
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.signal import resample_poly
+
+# 전사 모델에 넣는 기본 형식
+TARGET_RATE = 16000
+
+_WAVE_PCM = 0x0001
+_WAVE_FLOAT = 0x0003
+_WAVE_EXTENSIBLE = 0xFFFE
+
+
+def sniff(data: bytes) -> str:
+    """앞부분 바이트(magic number)로 컨테이너를 판별합니다. 확장자/Content-Type은 믿지 않습니다."""
+    head = data[:16]
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:3] == b"ID3":
+        return "mp3"
+    # MPEG audio frame sync (11비트) + layer != 00 (00이면 AAC ADTS)
+    if len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0 and (head[1] & 0x06) != 0:
+        return "mp3"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    return "unknown"
+
+
+@dataclass
+class WavInfo:
+    format_tag: int       # 1=PCM, 3=IEEE float
+    channels: int
+    rate: int
+    bits: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def is_target(self) -> bool:
+        """이미 16kHz mono 16bit PCM이라 그대로 보내도 되는지."""
+        return self.format_tag == _WAVE_PCM and self.channels == 1 and self.rate == TARGET_RATE and self.bits == 16
+
+
+def wav_info(data: bytes) -> Optional[WavInfo]:
+    """
+    RIFF/WAVE 헤더를 읽습니다. 직접 디코딩할 수 있는 PCM(8/16/24/32bit) / float(32/64bit)가 아니면 None.
+    (ADPCM, mu-law 등은 ffmpeg로)
+    """
+    if sniff(data) != "wav":
+        return None
+    pos, fmt = 12, None
+    while pos + 8 <= len(data):
+        cid, size = data[pos:pos + 4], struct.unpack_from("<I", data, pos + 4)[0]
+        body = pos + 8
+        if cid == b"fmt " and size >= 16:
+            tag, channels, rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if tag == _WAVE_EXTENSIBLE and size >= 40:
+                tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (tag, channels, rate, bits)
+        elif cid == b"data" and fmt is not None:
+            tag, channels, rate, bits = fmt
+            ok = (tag == _WAVE_PCM and bits in (8, 16, 24, 32)) or (tag == _WAVE_FLOAT and bits in (32, 64))
+            if not ok or channels < 1 or rate < 1000:
+                return None
+            # 스트리밍으로 녹음된 파일은 data 크기가 0/0xFFFFFFFF일 수 있음 -> 남은 전체
+            avail = len(data) - body
+            size = avail if size == 0 or size > avail else size
+            size -= size % (channels * bits // 8)
+            return WavInfo(tag, channels, rate, bits, body, size)
+        pos = body + size + (size & 1)
+    return None
+
+
+def decode_wav(data: bytes, info: WavInfo) -> np.ndarray:
+    """PCM/float WAV -> mono float32 [-1, 1]."""
+    raw = memoryview(data)[info.data_offset:info.data_offset + info.data_size]
+    if info.format_tag == _WAVE_FLOAT:
+        x = np.frombuffer(raw, dtype="<f4" if info.bits == 32 else "<f8").astype(np.float32)
+    elif info.bits == 8:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif info.bits == 24:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        x = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 8388608.0
+    else:
+        dtype = "<i2" if info.bits == 16 else "<i4"
+        x = np.frombuffer(raw, dtype=dtype).astype(np.float32) / float(2 ** (info.bits - 1))
+    if info.channels > 1:
+        x = x.reshape(-1, info.channels).mean(axis=1)
+    return x
+
+
+def resample(x: np.ndarray, src_rate: int, dst_rate: int = TARGET_RATE) -> np.ndarray:
+    """polyphase FIR 리샘플링(anti-aliasing 포함). 44.1k -> 16k 같은 비정수 비율도 처리."""
+    if src_rate == dst_rate:
+        return x
+    g = np.gcd(src_rate, dst_rate)
+    return resample_poly(x, dst_rate // g, src_rate // g).astype(np.float32)
+
+
+def pcm16_to_float(raw: bytes) -> np.ndarray:
+    """s16le raw PCM(ffmpeg -f s16le 출력) -> float32 [-1, 1]."""
+    return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def encode_wav(x: np.ndarray, rate: int = TARGET_RATE) -> io.BytesIO:
+    """mono float32 -> 16bit PCM WAV 버퍼."""
+    pcm = (np.clip(x, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+    buf = io.BytesIO()
+    buf.write(b"RIFF" + struct.pack("<I", 36 + len(pcm)) + b"WAVE")
+    buf.write(b"fmt " + struct.pack("<IHHIIHH", 16, _WAVE_PCM, 1, rate, rate * 2, 2, 16))
+    buf.write(b"data" + struct.pack("<I", len(pcm)) + pcm)
+    buf.seek(0)
+    return buf
+
+
+def to_target_pcm(data: bytes, info: WavInfo) -> np.ndarray:
+    """WAV -> 16kHz mono float32 (디코딩/다운믹스/리샘플 모두 프로세스 안에서)."""
+    return resample(decode_wav(data, info), info.rate)
+
+
+# ========= 에너지 기반 VAD =========
+
+@dataclass
+class VadResult:
+    """
+    pcm: 앞뒤 무음을 자르고 긴 쉼을 줄인 음성 (말소리가 없으면 길이 0)
+    segments: 원본에서 말소리로 판단한 구간 [(시작 샘플, 끝 샘플)]
+    """
+    pcm: np.ndarray
+    input_sec: float
+    speech_sec: float
+    segments: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def output_sec(self) -> float:
+        return self.pcm.size / TARGET_RATE
+
+    @property
+    def silent(self) -> bool:
+        return self.pcm.size == 0
+
+
+def _frame_db(x: np.ndarray, frame: int) -> np.ndarray:
+    """프레임별 에너지(dBFS)."""
+    n = x.size // frame
+    return 10 * np.log10(np.mean(np.square(x[:n * frame].reshape(n, frame), dtype=np.float64), axis=1) + 1e-10)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """True 구간 [(시작, 끝)) 목록."""
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8), [0]])))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+
+def vad(
+    x: np.ndarray,
+    rate: int = TARGET_RATE,
+    *,
+    frame_ms: int = 20,
+    min_db: float = -50.0,
+    margin_db: float = 10.0,
+    pad_ms: int = 200,
+    max_pause_ms: int = 500,
+    min_speech_ms: int = 150,
+) -> VadResult:
+    """
+    프레임(frame_ms) 에너지로 말소리 구간을 찾아 무음을 잘라냅니다.
+
+    - 임계값: 배경 소음(하위 10% 프레임 에너지) + margin_db, 단 최대 에너지 - 20dB를 넘지 않고
+      min_db(dBFS)보다 낮지 않게. 쉬지 않고 말한 녹음도 잘리지 않고, 완전한 무음은 말소리로 잡히지 않습니다.
+    - 말소리 앞뒤로 pad_ms를 남겨 자음/숨소리가 잘리지 않게
+    - 말소리 사이 쉼이 max_pause_ms보다 길면 max_pause_ms로 줄임 (생각하느라 멈춘 시간)
+    - 말소리가 min_speech_ms보다 짧으면 무음으로 보고 pcm은 빈 배열
+    """
+    frame = max(1, rate * frame_ms // 1000)
+    input_sec = x.size / rate
+    if x.size < frame:
+        return VadResult(x[:0], input_sec, 0.0)
+
+    db = _frame_db(x, frame)
+    thr = max(min_db, min(np.percentile(db, 10) + margin_db, db.max() - 20.0))
+    speech = db > thr
+    speech_sec = int(speech.sum()) * frame / rate
+    if speech_sec * 1000 < min_speech_ms:
+        return VadResult(x[:0], input_sec, speech_sec)
+
+    pad = pad_ms // frame_ms
+    keep = np.convolve(speech, np.ones(2 * pad + 1, dtype=bool), mode="same") > 0 if pad else speech.copy()
+    segments = _runs(keep)
+
+    # 말소리 사이의 긴 쉼은 앞뒤로 max_pause_ms/2씩만 남김
+    half = max_pause_ms // frame_ms // 2
+    for (_, end), (start, _) in zip(segments, segments[1:]):
+        if start - end > 2 * half:
+            keep[end:end + half] = True
+            keep[start - half:start] = True
+        else:
+            keep[end:start] = True
+
+    mask = np.repeat(keep, frame)
+    if x.size > mask.size:
+        mask = np.concatenate([mask, np.zeros(x.size - mask.size, dtype=bool)])
+    return VadResult(
+        x[mask], input_sec, speech_sec,
+        segments=[(s * frame, min(x.size, e * frame)) for s, e in segments],
+    )
+
+
+def split(
+    x: np.ndarray,
+    rate: int = TARGET_RATE,
+    *,
+    max_sec: float = 20.0,
+    min_sec: float = 8.0,
+    overlap_ms: int = 300,
+    frame_ms: int = 20,
+) -> List[Tuple[int, int]]:
+    """
+    긴 음성을 [min_sec, max_sec] 길이 조각으로 나눌 구간 [(시작 샘플, 끝 샘플)]. max_sec 이하면 1개.
+
+    - 각 조각의 끝은 범위 안에서 가장 조용한 지점(100ms 평균 에너지 최소)
+    - 그 지점이 쉼(하위 10% + 6dB, 중앙값 - 10dB 중 낮은 쪽)보다 크면 말하는 중에 자른 것이므로
+      양쪽 조각이 overlap_ms씩 겹치게 (겹친 단어는 이어 붙일 때 제거)
+    """
+    max_n, min_n = int(max_sec * rate), int(min_sec * rate)
+    if x.size <= max_n:
+        return [(0, x.size)]
+
+    frame = max(1, rate * frame_ms // 1000)
+    db = _frame_db(x, frame)
+    smooth = np.convolve(db, np.ones(5) / 5, mode="same")
+    quiet = min(np.percentile(db, 10) + 6.0, np.median(db) - 10.0)
+    overlap = rate * overlap_ms // 1000
+
+    ranges: List[Tuple[int, int]] = []
+    start, pad = 0, 0
+    while x.size - start > max_n:
+        lo, hi = (start + min_n) // frame, (start + max_n) // frame
+        f = lo + int(np.argmin(smooth[lo:hi]))
+        cut = f * frame + frame // 2
+        prev_pad, pad = pad, (0 if smooth[f] <= quiet else overlap)
+        ranges.append((max(0, start - prev_pad), min(x.size, cut + pad)))
+        start = cut
+    ranges.append((max(0, start - pad), x.size))
+    return ranges
@@ -0,0 +1,130 @@
+# common/background.py
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, List, Optional
+
+from config import settings
+from common.logging import get_logger
+from common.metrics import metrics
+
+log = get_logger("greeni.background")
+
+Job = Callable[[], Awaitable[Any]]
+
+_queues: List["BackgroundQueue"] = []
+
+
+class BackgroundQueue:
+    """
+    응답 경로 밖에서 처리할 작업(write-behind) 큐.
+
+    - submit은 큐에 넣기만 하고 즉시 반환. 큐가 가득 차면 버리고 False (요청을 막지 않음)
+    - worker가 작업을 꺼내 실행하고, 실패하면 지수 backoff(+jitter)로 max_retries번까지 재시도
+    - 앱 종료 시 drain: 새 작업은 받지 않고 남은 작업을 timeout까지 처리한 뒤 worker 종료
+
+    메트릭(queue=name):
+      bg_enqueued / bg_done / bg_retries / bg_failed / bg_dropped
+      bg_depth (gauge)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        maxsize: int = 1000,
+        workers: int = 1,
+        max_retries: int = 5,
+        backoff_sec: float = 0.5,
+        max_backoff_sec: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+
+        self._queue: Optional["asyncio.Queue[tuple[str, Job]]"] = None
+        self._tasks: List["asyncio.Task"] = []
+        self._closed = False
+
+        metrics.register_gauge("bg_depth", lambda: self._queue.qsize() if self._queue is not None else 0, queue=name)
+        _queues.append(self)
+
+    def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._closed = False
+        self._tasks = [t for t in self._tasks if not t.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._worker(), name=f"bg-{self.name}-{len(self._tasks)}"))
+
+    def submit(self, label: str, job: Job) -> bool:
+        """label은 로그용(예: diary:<session_id>). job은 호출할 때마다 새 awaitable을 만드는 함수."""
+        if self._closed:
+            metrics.incr("bg_dropped", queue=self.name, reason="closed")
+            log.warning("bg_job_dropped", extra={"queue": self.name, "job": label, "reason": "closed"})
+            return False
+        if not self._tasks:
+            self.start()
+        try:
+            self._queue.put_nowait((label, job))
+        except asyncio.QueueFull:
+            metrics.incr("bg_dropped", queue=self.name, reason="full")
+            log.warning("bg_job_dropped", extra={"queue": self.name, "job": label, "reason": "full"})
+            return False
+        metrics.incr("bg_enqueued", queue=self.name)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            label, job = await self._queue.get()
+            try:
+                await self._run(label, job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, label: str, job: Job) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job()
+                metrics.incr("bg_done", queue=self.name)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                if attempt == self.max_retries:
+                    metrics.incr("bg_failed", queue=self.name)
+                    log.exception("bg_job_failed", extra={"queue": self.name, "job": label, "attempts": attempt + 1})
+                    return
+                metrics.incr("bg_retries", queue=self.name)
+                delay = min(self.max_backoff_sec, self.backoff_sec * 2 ** attempt)
+                log.warning("bg_job_retry", extra={"queue": self.name, "job": label, "attempt": attempt + 1})
+                await asyncio.sleep(delay * (0.5 + random.random()))
+
+    async def drain(self, timeout_sec: float) -> None:
+        """새 작업을 막고 남은 작업을 timeout_sec까지 처리한 뒤 worker를 멈춥니다."""
+        self._closed = True
+        if self._queue is not None and self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout_sec)
+            except asyncio.TimeoutError:
+                log.warning("bg_drain_timeout", extra={"queue": self.name, "remaining": self._queue.qsize()})
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+def start_queues() -> None:
+    """app lifespan에서 호출."""
+    for q in _queues:
+        q.start()
+
+
+async def drain_queues(timeout_sec: float = settings.BACKGROUND_DRAIN_SEC) -> None:
+    for q in _queues:
+        await q.drain(timeout_sec)
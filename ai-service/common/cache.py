@@ -0,0 +1,198 @@
+# common/cache.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from common.logging import get_logger
+from common.metrics import metrics
+
+log = get_logger("greeni.cache")
+
+_MISSING = object()
+
+
+def content_key(*parts: Any) -> str:
+    """(answer, prompt version, model)처럼 캐시 의미를 결정하는 값들로 sha256 키를 만듭니다."""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    메모리 LRU + TTL 캐시.
+    - max_entries 초과 시 가장 오래 안 쓴 항목부터 제거
+    - ttl_sec 이 지난 항목은 조회 시점에 만료 처리
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, ttl_sec: Optional[float] = None) -> None:
+        """ttl_sec: 이 항목만 더 짧게(예: 디스크에서 승격할 때 남은 TTL). 없으면 self.ttl_sec."""
+        ttl = self.ttl_sec if ttl_sec is None else min(ttl_sec, self.ttl_sec)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    디렉토리 기반 JSON 캐시(재시작 후에도 유지).
+    - 키마다 파일 1개(<key>.json), 쓰기는 임시파일 + os.replace 로 원자적 교체
+    - TTL은 파일 안의 저장 시각(ts) 기준
+    - 항목 수/전체 바이트가 한도를 넘으면 오래된 파일부터 삭제
+    - 파일 목록은 시작 시 한 번만 스캔해 메모리 인덱스로 유지합니다.
+    """
+
+    def __init__(self, directory: Path, max_entries: int, max_bytes: int, ttl_sec: float) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> size (오래된 순)
+        self._bytes = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for p in self.directory.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, p.stem, st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_with_ttl(key, default)[0]
+
+    def get_with_ttl(self, key: str, default: Any = None) -> Tuple[Any, float]:
+        """(값, 남은 TTL 초). 없거나 만료면 (default, 0)."""
+        if key not in self._index:
+            return default, 0.0
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            self._forget(key)
+            return default, 0.0
+
+        remaining = self.ttl_sec - (time.time() - float(record.get("ts", 0)))
+        if remaining <= 0:
+            self.delete(key)
+            return default, 0.0
+        return record.get("value", default), remaining
+
+    def put(self, key: str, value: Any) -> None:
+        data = json.dumps({"ts": time.time(), "value": value}, ensure_ascii=False).encode("utf-8")
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._bytes += len(data)
+            evict = []
+            while self._index and (len(self._index) > self.max_entries or self._bytes > self.max_bytes):
+                old_key, old_size = self._index.popitem(last=False)
+                self._bytes -= old_size
+                evict.append(old_key)
+
+        for old_key in evict:
+            try:
+                self._path(old_key).unlink()
+            except OSError:
+                pass
+
+    def delete(self, key: str) -> None:
+        self._forget(key)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+class TieredCache:
+    """
+    메모리(TTLCache) -> 디스크(DiskCache) 2단 캐시.
+    - 메모리 히트는 이벤트 루프에서 바로 반환, 디스크 I/O는 스레드에서 수행
+    - 디스크 히트는 메모리로 승격 (디스크에 남은 TTL만큼만 -> 디스크 만료보다 오래 남지 않음)
+    - name 라벨로 cache_hit/cache_miss 카운터를 남깁니다.
+    """
+
+    def __init__(self, name: str, memory: TTLCache, disk: Optional[DiskCache] = None) -> None:
+        self.name = name
+        self.memory = memory
+        self.disk = disk
+
+    async def get(self, key: str) -> Any:
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            metrics.incr("cache_hit", cache=self.name, tier="memory")
+            return value
+
+        if self.disk is not None:
+            value, remaining = await asyncio.to_thread(self.disk.get_with_ttl, key, _MISSING)
+            if value is not _MISSING:
+                self.memory.put(key, value, ttl_sec=remaining)
+                metrics.incr("cache_hit", cache=self.name, tier="disk")
+                return value
+
+        metrics.incr("cache_miss", cache=self.name)
+        return None
+
+    async def put(self, key: str, value: Any) -> None:
+        self.memory.put(key, value)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.put, key, value)
+            except OSError:
+                # 디스크 캐시 실패는 응답에 영향 주지 않음
+                log.warning("disk_cache_write_failed", extra={"cache": self.name})
@@ -0,0 +1,237 @@
+# common/embedding.py
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from common.cache import DiskCache, TTLCache, TieredCache, content_key
+from common.llm import embed_async
+from common.logging import get_logger
+from common.metrics import metrics
+
+log = get_logger("greeni.embedding")
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화: NFC, 앞뒤 공백 제거, 연속 공백 1칸."""
+    return _WS.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def _encode(vec: np.ndarray) -> str:
+    return base64.b64encode(np.asarray(vec, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _decode(raw: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(raw), dtype=np.float32)
+
+
+class LocalEmbedder:
+    """
+    오프라인 임베딩: 문자 1~3-gram feature hashing(부호 포함) -> dim 차원, L2 정규화.
+    네트워크 없이 결정적으로 같은 값을 내지만, upstream 임베딩과는 다른 공간입니다.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            padded = f" {text} "
+            for n in (1, 2, 3):
+                for j in range(len(padded) - n + 1):
+                    h = int.from_bytes(hashlib.blake2b(padded[j:j + n].encode("utf-8"), digest_size=8).digest(), "little")
+                    out[i, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+@dataclass
+class Embedded:
+    """vectors (n, dim). fallback[i]=True 면 upstream 대신 LocalEmbedder 결과(다른 벡터 공간)."""
+    vectors: np.ndarray
+    fallback: np.ndarray
+
+
+class EmbeddingService:
+    """
+    임베딩 계층: 캐시 -> micro-batching -> upstream(embed_async), 실패/지연 시 로컬 fallback.
+
+    - 정규화된 텍스트 해시(모델/차원 포함)로 메모리 LRU + 디스크 캐시(TieredCache)
+    - 캐시 미스는 window_ms 동안 모아서(또는 max_batch개가 차면) upstream 1번으로 처리.
+      같은 텍스트가 동시에 들어오면 한 번만 요청
+    - upstream이 timeout_ms 안에 답하지 않거나 실패하면 LocalEmbedder 값으로 채우고 fallback으로 표시
+      (fallback 벡터는 캐시하지 않음. 저장/검색에 쓸지는 호출 측이 판단)
+    - provider=local 이면 항상 LocalEmbedder 사용(오프라인 개발용)
+
+    메트릭:
+      embed_batch_size / embed_batch_wait_ms   upstream 배치 크기, 첫 요청부터 전송까지 대기
+      embed_texts{source=cache|upstream|fallback|local}
+      embed_cache_hit_ratio                     (gauge)
+      cache_hit/cache_miss{cache=embed}         (TieredCache)
+    """
+
+    def __init__(
+        self,
+        *,
+        provider: str = settings.EMBED_PROVIDER,
+        model: str = settings.EMBED_MODEL,
+        dim: int = settings.VDB_DIM,
+        window_ms: float = settings.EMBED_BATCH_WINDOW_MS,
+        max_batch: int = settings.EMBED_MAX_BATCH,
+        timeout_ms: float = settings.EMBED_TIMEOUT_MS,
+        cache: Optional[TieredCache] = None,
+    ) -> None:
+        if provider not in ("openai", "local"):
+            raise ValueError(f"unknown EMBED_PROVIDER: {provider}")
+        self.provider = provider
+        self.model = model
+        self.dim = dim
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.timeout_ms = timeout_ms
+        self.local = LocalEmbedder(dim)
+        self.cache = cache
+
+        self._queue: List[Tuple[str, str]] = []  # (key, text)
+        self._pending: Dict[str, "asyncio.Future"] = {}
+        self._first_at = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()  # 진행 중인 배치(Task가 GC되지 않도록 참조 유지)
+        self._lookups = 0
+        self._hits = 0
+
+        metrics.register_gauge("embed_cache_hit_ratio", lambda: round(self._hits / self._lookups, 4) if self._lookups else 0.0)
+        metrics.register_gauge("embed_pending", lambda: len(self._pending))
+
+    async def embed(self, texts: List[str]) -> Embedded:
+        norm = [normalize_text(t) for t in texts]
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        fallback = np.zeros(len(texts), dtype=bool)
+
+        if self.provider == "local":
+            vectors[:] = self.local.embed(norm)
+            metrics.incr("embed_texts", len(texts), source="local")
+            return Embedded(vectors, fallback)
+
+        keys = [content_key(self.model, self.dim, t) for t in norm]
+        first: Dict[str, int] = {}
+        for i, key in enumerate(keys):
+            first.setdefault(key, i)
+
+        found: Dict[str, Optional[np.ndarray]] = {}
+        futures: Dict[str, "asyncio.Future"] = {}
+        for key, i in first.items():
+            cached = await self.cache.get(key) if self.cache is not None else None
+            self._lookups += 1
+            if cached is not None:
+                self._hits += 1
+                found[key] = _decode(cached)
+                metrics.incr("embed_texts", source="cache")
+            else:
+                futures[key] = self._submit(key, norm[i])
+
+        for key, fut in futures.items():
+            # 다른 호출자와 공유하는 future이므로 호출 측 timeout으로 취소되지 않게 shield
+            found[key] = await asyncio.shield(fut)
+
+        missing = [i for i, key in enumerate(keys) if found[key] is None]
+        if missing:
+            vectors[missing] = self.local.embed([norm[i] for i in missing])
+            fallback[missing] = True
+        for i, key in enumerate(keys):
+            if found[key] is not None:
+                vectors[i] = found[key]
+        return Embedded(vectors, fallback)
+
+    # ========= micro-batching =========
+
+    def _submit(self, key: str, text: str) -> "asyncio.Future":
+        fut = self._pending.get(key)
+        if fut is not None:
+            return fut
+
+        loop = asyncio.get_running_loop()
+        fut = self._pending[key] = loop.create_future()
+        if not self._queue:
+            self._first_at = time.perf_counter()
+        self._queue.append((key, text))
+
+        if len(self._queue) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+        metrics.observe("embed_batch_size", len(batch))
+        metrics.observe("embed_batch_wait_ms", (time.perf_counter() - self._first_at) * 1000)
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, str]]) -> None:
+        texts = [text for _, text in batch]
+        try:
+            vecs = await asyncio.wait_for(
+                embed_async(texts, model=self.model, dimensions=self.dim, feature="embed_batch"),
+                timeout=self.timeout_ms / 1000,
+            )
+        except Exception as e:
+            # HTTPException(502) / TimeoutError 모두 로컬 fallback
+            log.warning("embed_upstream_fallback", extra={"batch": len(batch), "error": type(e).__name__})
+            metrics.incr("embed_texts", len(batch), source="fallback")
+            vecs = None
+        else:
+            metrics.incr("embed_texts", len(batch), source="upstream")
+
+        for i, (key, _) in enumerate(batch):
+            fut = self._pending.pop(key, None)
+            if fut is not None and not fut.done():
+                fut.set_result(None if vecs is None else vecs[i])
+
+        if vecs is not None and self.cache is not None:
+            for i, (key, _) in enumerate(batch):
+                await self.cache.put(key, _encode(vecs[i]))
+
+
+_embedder: Optional[EmbeddingService] = None
+
+
+def get_embedder() -> EmbeddingService:
+    global _embedder
+    if _embedder is None:
+        _embedder = EmbeddingService(
+            cache=TieredCache(
+                "embed",
+                memory=TTLCache(
+                    max_entries=settings.EMBED_CACHE_MAX_ENTRIES,
+                    ttl_sec=settings.EMBED_CACHE_TTL_SEC,
+                ),
+                disk=DiskCache(
+                    settings.EMBED_CACHE_DIR,
+                    max_entries=settings.EMBED_CACHE_DISK_MAX_ENTRIES,
+                    max_bytes=settings.EMBED_CACHE_DISK_MAX_BYTES,
+                    ttl_sec=settings.EMBED_CACHE_TTL_SEC,
+                ),
+            ),
+        )
+    return _embedder
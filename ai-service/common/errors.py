@@ -17,16 +17,19 @@ class AppError(Exception):
     - status_code: HTTP status
     - message: 사용자(또는 클라이언트)에게 보여줄 에러 메시지
     - detail: 내부 디버깅용
+    - headers: 응답 헤더(예: 503의 Retry-After)
     """
     message: str
     code: str = "internal_error"
     status_code: int = 500
     detail: Optional[Any] = None
+    headers: Optional[Dict[str, str]] = None
 
     def to_http_exception(self) -> HTTPException:
         return HTTPException(
             status_code=self.status_code,
             detail={"error": self.message, "code": self.code},
+            headers=self.headers,
         )
 
 
@@ -46,6 +49,7 @@ def register_exception_handlers(app: FastAPI, logger=None) -> None:
         return JSONResponse(
             status_code=exc.status_code,
             content={"error": exc.message, "code": exc.code},
+            headers=exc.headers,
         )
 
 
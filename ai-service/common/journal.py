@@ -0,0 +1,280 @@
+# common/journal.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+from config import settings
+from common.logging import get_logger
+from common.metrics import metrics
+from common.turn_log import TurnLog
+
+log = get_logger("greeni.journal")
+
+_STOP = object()
+
+
+class SessionJournal:
+    """
+    세션별 append-only JSONL 저널 + 스냅샷.
+
+    파일 구성 (directory/<sha1(session_id)>.*):
+      .jsonl          {"n": 턴 번호, "u": user_text, "a": reply} 한 줄 = 턴 1개 (append only)
+      .snapshot.json  compaction 결과 (chat_histories/*.json 과 같은 형식)
+
+    - append/delete는 큐에 넣기만 하고 바로 반환(이벤트 루프에서 디스크 I/O 없음)
+    - 전용 writer 스레드가 fsync_interval_sec 동안 모인 기록을 한 번에 쓰고 파일당 fsync 1번
+    - 저널이 compact_every 줄을 넘으면 스냅샷으로 합치고 저널을 비움
+    - load는 스냅샷 + 저널을 재생해 TurnLog를 복원(재시작 후 첫 접근 시 lazy 복원용)
+      스냅샷에 이미 들어간 턴 번호(n)는 건너뛰므로, compaction 도중 죽어도 중복 재생되지 않습니다.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        fsync_interval_sec: float = settings.SESSION_JOURNAL_FSYNC_INTERVAL_SEC,
+        compact_every: int = settings.SESSION_JOURNAL_COMPACT_EVERY,
+        retention_sec: float = settings.SESSION_IDLE_TTL_SEC,
+        max_open_files: int = 256,
+    ) -> None:
+        self.name = f"journal:{Path(directory).name}"
+        self.directory = Path(directory)
+        self.fsync_interval_sec = fsync_interval_sec
+        self.compact_every = compact_every
+        self.retention_sec = retention_sec
+        self.max_open_files = max_open_files
+
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._files: "OrderedDict[str, IO[str]]" = OrderedDict()  # key -> append handle (writer 스레드 전용)
+        self._lines: Dict[str, int] = {}  # key -> 저널 줄 수 (writer 스레드 전용)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f"journal-{self.directory.name}", daemon=True)
+        self._thread.start()
+
+    # ========= public =========
+
+    def append(self, session_id: str, turn_index: int, user_text: str, reply: str) -> None:
+        """turn_index: 0부터 시작하는 이번 턴 번호."""
+        self._queue.put(("turn", self._key(session_id), {"n": turn_index, "u": user_text, "a": reply}))
+
+    def delete(self, session_id: str) -> None:
+        self._queue.put(("delete", self._key(session_id), None))
+
+    async def load(self, session_id: str) -> Optional[TurnLog]:
+        await self.flush()
+        turn_log = await asyncio.to_thread(self._read, self._key(session_id))
+        if turn_log is not None:
+            metrics.incr("journal_recovered_sessions")
+        return turn_log
+
+    async def flush(self) -> None:
+        """지금까지 넣은 기록이 디스크(fsync)까지 반영될 때까지 대기."""
+        done = threading.Event()
+        self._queue.put(("barrier", "", done))
+        await asyncio.to_thread(done.wait)
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def sweep(self) -> int:
+        """retention_sec 동안 갱신이 없던 세션 파일 삭제(sweeper가 호출)."""
+        deadline = time.time() - self.retention_sec
+        stale = set()
+        for p in self.directory.glob("*.jsonl"):
+            try:
+                if p.stat().st_mtime < deadline:
+                    stale.add(p.name.split(".", 1)[0])
+            except OSError:
+                continue
+        for key in stale:
+            self._queue.put(("delete", key, None))
+        return len(stale)
+
+    # ========= files =========
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+
+    def _journal_path(self, key: str) -> Path:
+        return self.directory / f"{key}.jsonl"
+
+    def _snapshot_path(self, key: str) -> Path:
+        return self.directory / f"{key}.snapshot.json"
+
+    def _read(self, key: str) -> Optional[TurnLog]:
+        snap, journal = self._snapshot_path(key), self._journal_path(key)
+        if not snap.exists() and not journal.exists():
+            return None
+
+        turn_log = TurnLog()
+        if snap.exists():
+            turn_log = TurnLog.loads(snap.read_text(encoding="utf-8"))
+        if journal.exists():
+            with open(journal, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                        n, user_text, reply = rec["n"], rec["u"], rec["a"]
+                    except (ValueError, KeyError, TypeError):
+                        # 크래시로 잘린 줄: 건너뛰고 뒤의 기록은 계속 재생
+                        metrics.incr("journal_bad_lines")
+                        continue
+                    if n < turn_log.turn_count:
+                        continue
+                    turn_log.append_turn(user_text, reply)
+        return turn_log
+
+    # ========= writer thread =========
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.fsync_interval_sec
+            while batch[-1] is not _STOP and batch[-1][0] != "barrier":
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                self._apply(batch)
+            except Exception:
+                log.exception("journal_write_failed", extra={"journal": self.name})
+
+            if batch[-1] is _STOP:
+                for fh in self._files.values():
+                    fh.close()
+                self._files.clear()
+                return
+
+    def _apply(self, batch: List[Any]) -> None:
+        dirty: Dict[str, IO[str]] = {}  # 이번 batch에서 쓰고 아직 fsync하지 않은 파일
+        written: set = set()  # 이번 batch에서 쓴 key (compaction 대상)
+        barriers: List[threading.Event] = []
+
+        try:
+            for op in batch:
+                if op is _STOP:
+                    continue
+                kind, key, payload = op
+                if kind == "turn":
+                    fh = self._open(key, dirty)
+                    fh.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                    self._lines[key] = self._lines.get(key, 0) + 1
+                    dirty[key] = fh
+                    written.add(key)
+                elif kind == "delete":
+                    dirty.pop(key, None)
+                    written.discard(key)
+                    self._remove(key)
+                elif kind == "barrier":
+                    barriers.append(payload)
+
+            for fh in dirty.values():
+                self._sync(fh)
+            if written:
+                metrics.incr("journal_fsync_batches")
+                metrics.observe("journal_batch_size", len(batch))
+
+            for key in written:
+                if self._lines.get(key, 0) >= self.compact_every:
+                    self._compact(key)
+        finally:
+            # 쓰기에 실패해도 flush()를 기다리는 쪽이 멈추지 않도록
+            for ev in barriers:
+                ev.set()
+
+    @staticmethod
+    def _sync(fh: IO[str]) -> None:
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    def _open(self, key: str, dirty: Dict[str, IO[str]]) -> IO[str]:
+        """
+        append handle. 열린 파일이 max_open_files를 넘으면 오래 안 쓴 것부터 닫는데,
+        이번 batch에서 쓴(dirty) 파일은 닫기 전에 fsync하고 dirty에서 뺍니다(닫힌 handle을 fsync하지 않도록).
+        """
+        fh = self._files.get(key)
+        if fh is not None:
+            self._files.move_to_end(key)
+            return fh
+
+        path = self._journal_path(key)
+        if key not in self._lines:
+            self._lines[key] = self._repair(path)
+        fh = open(path, "a", encoding="utf-8")
+        self._files[key] = fh
+        while len(self._files) > self.max_open_files:
+            old_key, old = self._files.popitem(last=False)
+            if dirty.pop(old_key, None) is not None:
+                self._sync(old)
+            old.close()
+        return fh
+
+    def _repair(self, path: Path) -> int:
+        """
+        이 프로세스에서 처음 여는 저널: 크래시로 잘린 마지막 줄을 잘라내고 완전한 줄 수를 반환합니다.
+        (잘린 줄 뒤에 다음 기록을 이어 쓰면 그 기록까지 깨지므로 append 전에 정리)
+        """
+        try:
+            with open(path, "rb+") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    f.truncate(end)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    metrics.incr("journal_truncated")
+                    log.warning("journal_partial_line_truncated", extra={
+                        "journal": self.name, "file_name": path.name, "bytes": len(data) - end,
+                    })
+                return data.count(b"\n")
+        except FileNotFoundError:
+            return 0
+
+    def _close(self, key: str) -> None:
+        fh = self._files.pop(key, None)
+        if fh is not None:
+            fh.close()
+
+    def _remove(self, key: str) -> None:
+        self._close(key)
+        self._lines.pop(key, None)
+        for path in (self._journal_path(key), self._snapshot_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _compact(self, key: str) -> None:
+        turn_log = self._read(key)
+        if turn_log is None:
+            return
+        snap = self._snapshot_path(key)
+        tmp = snap.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(turn_log.dumps())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, snap)
+
+        # 스냅샷이 확정된 뒤에 저널 비우기
+        self._close(key)
+        open(self._journal_path(key), "w").close()
+        self._lines[key] = 0
+        metrics.incr("journal_compactions")
@@ -3,15 +3,19 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
+import httpx
+import numpy as np
 from fastapi import HTTPException
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
 from config import settings
+from common.metrics import metrics
 
 logger = logging.getLogger("greeni.llm")
 
 _client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
 
 
 def get_client() -> OpenAI:
@@ -25,6 +29,60 @@ def get_client() -> OpenAI:
     return _client
 
 
+def get_async_client() -> AsyncOpenAI:
+    """
+    AsyncOpenAI client singleton.
+    - 요청마다 client를 새로 만들면 TLS 연결을 매번 다시 맺으므로, 프로세스당 하나의 httpx 풀을 공유합니다.
+    - keep-alive/연결 수 제한은 settings(LLM_*)로 조정합니다.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SEC,
+                ),
+                timeout=httpx.Timeout(60.0, connect=settings.LLM_CONNECT_TIMEOUT_SEC),
+            ),
+        )
+    return _async_client
+
+
+async def close_async_client() -> None:
+    """앱 종료 시 공유 풀을 닫습니다."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+
+
+def _extract_text(resp: Any) -> str:
+    text = (resp.choices[0].message.content or "").strip()
+    if not text:
+        raise HTTPException(status_code=502, detail="llm_bad_response")
+    return text
+
+
+def _usage_extra(usage: Any, feature: str) -> dict[str, Any]:
+    """
+    usage에서 prompt/cached 토큰 수를 꺼내 로그 extra로 돌려주고 메트릭에 누적합니다.
+    - cached_tokens: OpenAI 자동 prompt caching으로 재사용된 입력 토큰 수
+    - 캐시 히트율 = llm_cached_tokens / llm_prompt_tokens (feature별)
+    """
+    if usage is None:
+        return {}
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+
+    metrics.incr("llm_prompt_tokens", prompt_tokens, feature=feature)
+    metrics.incr("llm_cached_tokens", cached_tokens, feature=feature)
+    return {"prompt_tokens": prompt_tokens, "cached_tokens": cached_tokens}
+
+
 def chat_text(
     *,
     messages: list[dict[str, str]],
@@ -104,3 +162,209 @@ def chat_text(
         dt = int((time.time() - t0) * 1000)
         logger.info("llm_call_done",
                     extra={"feature": feature, "session_id": session_id, "latency_ms": dt})
+
+
+async def chat_text_async(
+    *,
+    messages: list[dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    feature: str = "unknown",
+    session_id: Optional[str] = None,
+    timeout_sec: float = 30.0,
+) -> str:
+    """
+    chat_text의 async 버전.
+
+    - async 핸들러에서 호출해도 이벤트 루프를 막지 않습니다.
+    - 공유 AsyncOpenAI 풀(get_async_client)을 사용합니다.
+    - 에러 표준화(HTTPException 502)와 llm_call_done 로깅은 chat_text와 동일합니다.
+    """
+
+    use_model = model or getattr(settings, "CHAT_MODEL", "gpt-4o")
+    client = get_async_client()
+
+    usage_extra: dict[str, Any] = {}
+    t0 = time.time()
+    try:
+        resp = await client.chat.completions.create(
+            model=use_model,
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            timeout=timeout_sec,
+        )
+        usage_extra = _usage_extra(getattr(resp, "usage", None), feature)
+        return _extract_text(resp)
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.exception("llm_call_failed",
+                         extra={"feature": feature, "session_id": session_id})
+        raise HTTPException(status_code=502, detail="llm_upstream_error") from e
+
+    finally:
+        dt = int((time.time() - t0) * 1000)
+        logger.info("llm_call_done",
+                    extra={"feature": feature, "session_id": session_id, "latency_ms": dt,
+                           **usage_extra})
+
+
+async def embed_async(
+    texts: list[str],
+    *,
+    model: Optional[str] = None,
+    dimensions: Optional[int] = None,
+    feature: str = "embed",
+    timeout_sec: float = 10.0,
+) -> np.ndarray:
+    """
+    텍스트 임베딩 (len(texts), dimensions) float32.
+    - 기본 모델/차원은 settings.EMBED_MODEL / settings.VDB_DIM (memory/vdb.py 벡터와 같은 차원)
+    - 실패는 HTTPException(502)로 표준화합니다.
+    """
+    use_model = model or settings.EMBED_MODEL
+    client = get_async_client()
+
+    t0 = time.time()
+    try:
+        resp = await client.embeddings.create(
+            model=use_model,
+            input=texts,
+            dimensions=dimensions or settings.VDB_DIM,
+            timeout=timeout_sec,
+        )
+        return np.asarray([d.embedding for d in resp.data], dtype=np.float32)
+
+    except Exception as e:
+        logger.exception("llm_embed_failed", extra={"feature": feature})
+        raise HTTPException(status_code=502, detail="llm_upstream_error") from e
+
+    finally:
+        dt = int((time.time() - t0) * 1000)
+        logger.info("llm_embed_done", extra={"feature": feature, "latency_ms": dt, "inputs": len(texts)})
+
+
+async def transcribe_async(
+    file: Any,
+    *,
+    model: Optional[str] = None,
+    language: str = "ko",
+    feature: str = "stt",
+    session_id: Optional[str] = None,
+    timeout_sec: float = 60.0,
+) -> str:
+    """
+    음성 전사(텍스트만 반환). file은 (파일명, bytes/파일 객체) 튜플.
+    - 공유 AsyncOpenAI 풀을 사용하므로 전사 중에도 이벤트 루프를 막지 않습니다.
+    - 실패는 HTTPException(502)로 표준화합니다. (취소는 그대로 전파)
+    """
+    use_model = model or settings.STT_MODEL
+    client = get_async_client()
+
+    t0 = time.time()
+    try:
+        resp = await client.audio.transcriptions.create(
+            model=use_model,
+            file=file,
+            language=language,
+            response_format="json",
+            timeout=timeout_sec,
+        )
+        return (resp.text or "").strip()
+
+    except Exception as e:
+        logger.exception("llm_transcribe_failed", extra={"feature": feature, "session_id": session_id})
+        raise HTTPException(status_code=502, detail="llm_upstream_error") from e
+
+    finally:
+        dt = int((time.time() - t0) * 1000)
+        logger.info("llm_transcribe_done", extra={"feature": feature, "session_id": session_id, "latency_ms": dt})
+
+
+async def stream_text_async(
+    *,
+    messages: list[dict[str, str]],
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    top_p: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    feature: str = "unknown",
+    session_id: Optional[str] = None,
+    timeout_sec: float = 30.0,
+) -> AsyncIterator[str]:
+    """
+    Chat Completions(stream=True) 호출 후 토큰 delta를 순서대로 내보내는 iterator를 반환.
+
+    - 스트림 연결까지는 여기서 기다리므로, 연결 실패는 응답 시작 전에 HTTPException(502)으로 올라갑니다.
+    - 스트림 도중 실패도 HTTPException(502)으로 표준화합니다(호출 측에서 에러 이벤트로 변환).
+    - 종료 시 llm_call_done에 latency_ms와 함께 ttft_ms(첫 토큰까지 걸린 시간)를 남깁니다.
+    """
+
+    use_model = model or getattr(settings, "CHAT_MODEL", "gpt-4o")
+    client = get_async_client()
+
+    t0 = time.time()
+    try:
+        stream = await client.chat.completions.create(
+            model=use_model,
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            timeout=timeout_sec,
+            stream=True,
+            # 마지막 chunk에 usage(cached_tokens 포함)를 받기 위함
+            stream_options={"include_usage": True},
+        )
+    except Exception as e:
+        logger.exception("llm_call_failed",
+                         extra={"feature": feature, "session_id": session_id, "stream": True})
+        dt = int((time.time() - t0) * 1000)
+        logger.info("llm_call_done",
+                    extra={"feature": feature, "session_id": session_id, "latency_ms": dt,
+                           "ttft_ms": None, "stream": True})
+        raise HTTPException(status_code=502, detail="llm_upstream_error") from e
+
+    return _iter_stream(stream, t0=t0, feature=feature, session_id=session_id)
+
+
+async def _iter_stream(
+    stream: Any,
+    *,
+    t0: float,
+    feature: str,
+    session_id: Optional[str],
+) -> AsyncIterator[str]:
+    ttft_ms: Optional[int] = None
+    usage_extra: dict[str, Any] = {}
+    try:
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage_extra = _usage_extra(chunk.usage, feature)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if ttft_ms is None:
+                ttft_ms = int((time.time() - t0) * 1000)
+            yield delta
+
+    except Exception as e:
+        logger.exception("llm_stream_failed",
+                         extra={"feature": feature, "session_id": session_id})
+        raise HTTPException(status_code=502, detail="llm_upstream_error") from e
+
+    finally:
+        # 클라이언트가 중간에 끊은 경우에도 upstream 연결을 정리
+        await stream.close()
+        dt = int((time.time() - t0) * 1000)
+        logger.info("llm_call_done",
+                    extra={"feature": feature, "session_id": session_id, "latency_ms": dt,
+                           "ttft_ms": ttft_ms, "stream": True, **usage_extra})
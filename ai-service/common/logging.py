@@ -12,6 +12,10 @@ from typing import Any, Dict, Optional
 from config import settings
 
 
+# LogRecord 기본 속성(이 외의 속성은 extra로 들어온 것으로 간주)
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
 class _JsonFormatter(logging.Formatter):
     """한 줄 JSON 로그 포맷터(파서 친화)."""
 
@@ -28,6 +32,12 @@ class _JsonFormatter(logging.Formatter):
             if hasattr(record, k):
                 base[k] = getattr(record, k)
 
+        # 그 외 extra 필드(latency_ms, feature 등)
+        for k, v in record.__dict__.items():
+            if k in _RESERVED_ATTRS or k in base:
+                continue
+            base[k] = v if isinstance(v, (str, int, float, bool, type(None))) else str(v)
+
         if record.exc_info:
             base["exc"] = self.formatException(record.exc_info)
 
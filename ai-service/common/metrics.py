@@ -0,0 +1,65 @@
+# common/metrics.py
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Tuple
+
+
+def _key(name: str, labels: Dict[str, Any]) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f"{k}={labels[k]}" for k in sorted(labels))
+    return f"{name}{{{inner}}}"
+
+
+class Metrics:
+    """
+    프로세스 내 경량 메트릭 레지스트리.
+    - counter: incr("cache_hit", cache="fiveq_hint")
+    - summary: observe("llm_latency_ms", 120, feature="diary_chat") -> count/sum/min/max
+    - gauge: register_gauge("sessions_live", fn) -> snapshot 시점에 fn() 호출
+    GET /metrics 에서 snapshot()을 그대로 내려줍니다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._summaries: Dict[str, Tuple[int, float, float, float]] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        k = _key(name, labels)
+        with self._lock:
+            self._counters[k] += value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        k = _key(name, labels)
+        with self._lock:
+            cnt, total, lo, hi = self._summaries.get(k, (0, 0.0, value, value))
+            self._summaries[k] = (cnt + 1, total + value, min(lo, value), max(hi, value))
+
+    def register_gauge(self, name: str, fn: Callable[[], Any], **labels: Any) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = fn
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {
+                k: {"count": c, "sum": s, "avg": (s / c if c else 0.0), "min": lo, "max": hi}
+                for k, (c, s, lo, hi) in self._summaries.items()
+            }
+            gauges = dict(self._gauges)
+
+        gauge_values: Dict[str, Any] = {}
+        for k, fn in gauges.items():
+            try:
+                gauge_values[k] = fn()
+            except Exception:
+                gauge_values[k] = None
+
+        return {"counters": counters, "summaries": summaries, "gauges": gauge_values}
+
+
+metrics = Metrics()
@@ -0,0 +1,84 @@
+# common/session_actor.py
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, TypeVar
+
+from config import settings
+from common.errors import AppError
+from common.metrics import metrics
+from common.singleflight import SingleFlight
+
+T = TypeVar("T")
+
+POLICIES = ("queue", "reject", "merge")
+
+
+class SessionActors:
+    """
+    세션 1개의 턴은 한 번에 하나씩만 실행되도록 직렬화합니다(세션별 asyncio.Lock).
+    서로 다른 세션은 그대로 병렬로 실행됩니다.
+
+    같은 세션에 턴이 진행 중일 때 새 요청 처리(policy):
+      queue  : 앞 턴이 끝날 때까지 기다렸다가 실행(기본)
+      reject : 409 session_busy 로 즉시 거절
+      merge  : 같은 user_text(더블탭/재시도)면 진행 중인 턴 결과를 같이 받고, 다르면 queue
+
+    메트릭:
+      session_turn_queued{actor=...}    앞 턴을 기다린 요청 수
+      session_turn_rejected{actor=...}  거절된 요청 수
+      singleflight_coalesced{flight=<actor>_turn}  merge로 합쳐진 요청 수
+    """
+
+    def __init__(self, name: str, policy: str = settings.SESSION_DUPLICATE_POLICY) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"unknown session duplicate policy: {policy}")
+        self.name = name
+        self.policy = policy
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+        self._flight = SingleFlight(f"{name}_turn")
+
+    @asynccontextmanager
+    async def lock(self, session_id: str, *, reject_if_busy: bool = False) -> AsyncIterator[None]:
+        """세션 lock. 대기자가 없어지면 lock 객체도 정리합니다."""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+
+        if lock.locked():
+            if reject_if_busy:
+                metrics.incr("session_turn_rejected", actor=self.name)
+                raise AppError(
+                    message="이전 대화가 아직 처리 중입니다.",
+                    code="session_busy",
+                    status_code=409,
+                )
+            metrics.incr("session_turn_queued", actor=self.name)
+
+        self._users[session_id] = self._users.get(session_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[session_id] -= 1
+            if self._users[session_id] == 0:
+                del self._users[session_id]
+                del self._locks[session_id]
+
+    def turn(self, session_id: str):
+        """스트리밍 턴용 lock. merge는 스트림에서는 queue로 동작합니다."""
+        return self.lock(session_id, reject_if_busy=self.policy == "reject")
+
+    async def run(self, session_id: str, user_text: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """policy에 따라 fn()(턴 1개)을 실행합니다."""
+        if self.policy == "merge":
+            return await self._flight.do(f"{session_id}\x00{user_text}", lambda: self._locked(session_id, fn))
+
+        async with self.turn(session_id):
+            return await fn()
+
+    async def _locked(self, session_id: str, fn: Callable[[], Awaitable[T]]) -> T:
+        async with self.lock(session_id):
+            return await fn()
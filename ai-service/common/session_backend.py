@@ -0,0 +1,331 @@
+# common/session_backend.py
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional
+
+from config import settings
+from common.logging import get_logger
+from common.session_store import SessionStore, register_sweepable
+from common.turn_log import TurnLog
+from common.journal import SessionJournal
+
+log = get_logger("greeni.session_backend")
+
+Message = dict[str, str]
+
+_backends: list["SessionBackend"] = []
+
+
+class SessionBackend(ABC):
+    """
+    roleplay/diary 턴 히스토리 저장소 인터페이스.
+    - 히스토리는 OpenAI messages 형식({"role": "user"|"assistant", "content": ...}) 그대로 주고받습니다.
+    - append_turn은 (user, assistant) 한 쌍을 원자적으로 추가하고 추가 후 턴 수를 반환합니다.
+    - SESSION_BACKEND 설정으로 memory(기본) / journal / sqlite / redis 중 선택합니다.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def load(self, session_id: str) -> list[Message]:
+        ...
+
+    @abstractmethod
+    async def append_turn(self, session_id: str, user_text: str, reply: str) -> int:
+        ...
+
+    @abstractmethod
+    async def turn_count(self, session_id: str) -> int:
+        ...
+
+    @abstractmethod
+    async def delete(self, session_id: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        return None
+
+
+# ========= in-process (default) =========
+
+class MemoryBackend(SessionBackend):
+    """
+    프로세스 메모리(SessionStore[TurnLog]). 단일 worker 전용.
+    - load는 TurnLog.messages를 복사 없이 그대로 돌려줍니다(읽기 전용).
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._store: SessionStore[TurnLog] = SessionStore(
+            name, TurnLog, sizeof=lambda log: log.nbytes,
+        )
+
+    async def load(self, session_id: str) -> list[Message]:
+        log = self._store.get(session_id)
+        return log.messages if log is not None else []
+
+    async def append_turn(self, session_id: str, user_text: str, reply: str) -> int:
+        return self._store.get_or_create(session_id).append_turn(user_text, reply)
+
+    async def turn_count(self, session_id: str) -> int:
+        log = self._store.get(session_id)
+        return log.turn_count if log is not None else 0
+
+    async def delete(self, session_id: str) -> None:
+        log = self._store.pop(session_id)
+        if log is not None:
+            log.clear()
+
+
+class JournaledMemoryBackend(MemoryBackend):
+    """
+    MemoryBackend + 세션별 append-only 저널(common/journal.py).
+    - 턴 저장은 메모리에 바로 반영하고, 디스크 기록은 writer 스레드가 배치로 처리
+    - 배포/크래시 후 메모리에 없는 세션은 첫 접근 시 저널에서 복원
+    - 저널은 프로세스 로컬 파일이므로 단일 worker 전용입니다.
+    """
+
+    def __init__(self, name: str, directory: Path) -> None:
+        super().__init__(name)
+        self._journal = SessionJournal(directory)
+        register_sweepable(self._journal)
+
+    async def _get(self, session_id: str) -> Optional[TurnLog]:
+        turn_log = self._store.get(session_id)
+        if turn_log is None:
+            turn_log = await self._journal.load(session_id)
+            if turn_log is not None:
+                self._store.put(session_id, turn_log)
+        return turn_log
+
+    async def load(self, session_id: str) -> list[Message]:
+        turn_log = await self._get(session_id)
+        return turn_log.messages if turn_log is not None else []
+
+    async def append_turn(self, session_id: str, user_text: str, reply: str) -> int:
+        turn_log = await self._get(session_id)
+        if turn_log is None:
+            turn_log = self._store.get_or_create(session_id)
+        tc = turn_log.append_turn(user_text, reply)
+        self._journal.append(session_id, tc - 1, user_text, reply)
+        return tc
+
+    async def turn_count(self, session_id: str) -> int:
+        turn_log = await self._get(session_id)
+        return turn_log.turn_count if turn_log is not None else 0
+
+    async def delete(self, session_id: str) -> None:
+        await super().delete(session_id)
+        self._journal.delete(session_id)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._journal.close)
+
+
+# ========= SQLite (WAL) =========
+
+class SQLiteBackend(SessionBackend):
+    """
+    SQLite WAL 파일 1개를 여러 worker가 공유(단일 호스트 multi-worker용).
+    - 쿼리는 스레드에서 실행(스레드별 connection)
+    - append_turn은 BEGIN IMMEDIATE 트랜잭션으로 두 메시지를 함께 기록
+    - idle TTL이 지난 세션은 sweeper가 삭제
+    """
+
+    def __init__(self, name: str, path: Path, idle_ttl_sec: float = settings.SESSION_IDLE_TTL_SEC) -> None:
+        self.name = name
+        self.path = Path(path)
+        self.idle_ttl_sec = idle_ttl_sec
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS session_turns (
+                store TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                ts REAL NOT NULL,
+                PRIMARY KEY (store, session_id, seq)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_session_turns_ts ON session_turns (store, ts)")
+        register_sweepable(self)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def _load(self, session_id: str) -> list[Message]:
+        rows = self._conn().execute(
+            "SELECT role, content FROM session_turns WHERE store=? AND session_id=? ORDER BY seq",
+            (self.name, session_id),
+        ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def _append_turn(self, session_id: str, user_text: str, reply: str) -> int:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (n,) = conn.execute(
+                "SELECT COUNT(*) FROM session_turns WHERE store=? AND session_id=?",
+                (self.name, session_id),
+            ).fetchone()
+            conn.executemany(
+                "INSERT INTO session_turns (store, session_id, seq, role, content, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (self.name, session_id, n, "user", user_text, now),
+                    (self.name, session_id, n + 1, "assistant", reply, now),
+                ],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return (n + 2) // 2
+
+    def _count(self, session_id: str) -> int:
+        (n,) = self._conn().execute(
+            "SELECT COUNT(*) FROM session_turns WHERE store=? AND session_id=?",
+            (self.name, session_id),
+        ).fetchone()
+        return n
+
+    def _delete(self, session_id: str) -> None:
+        self._conn().execute(
+            "DELETE FROM session_turns WHERE store=? AND session_id=?",
+            (self.name, session_id),
+        )
+
+    def sweep(self) -> int:
+        """idle TTL이 지난 세션을 지우고 지운 세션 수를 반환합니다."""
+        deadline = time.time() - self.idle_ttl_sec
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            expired = [
+                (self.name, session_id)
+                for (session_id,) in conn.execute(
+                    "SELECT session_id FROM session_turns WHERE store=? GROUP BY session_id HAVING MAX(ts) < ?",
+                    (self.name, deadline),
+                )
+            ]
+            conn.executemany("DELETE FROM session_turns WHERE store=? AND session_id=?", expired)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(expired)
+
+    async def load(self, session_id: str) -> list[Message]:
+        return await asyncio.to_thread(self._load, session_id)
+
+    async def append_turn(self, session_id: str, user_text: str, reply: str) -> int:
+        return await asyncio.to_thread(self._append_turn, session_id, user_text, reply)
+
+    async def turn_count(self, session_id: str) -> int:
+        return await asyncio.to_thread(self._count, session_id) // 2
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._delete, session_id)
+
+
+# ========= Redis protocol =========
+
+class RedisBackend(SessionBackend):
+    """
+    Redis 프로토콜 서버(Redis/Valkey/KeyDB 등)의 list 1개 = 세션 1개.
+    - append_turn: MULTI { RPUSH user, assistant ; EXPIRE ttl } EXEC 로 원자적 추가
+    - idle TTL은 EXPIRE로 서버가 처리
+    - client를 직접 넘기면(예: 로컬 stand-in) 그대로 사용합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str = settings.SESSION_REDIS_URL,
+        idle_ttl_sec: float = settings.SESSION_IDLE_TTL_SEC,
+        client: Optional[Any] = None,
+    ) -> None:
+        self.name = name
+        self.idle_ttl_sec = int(idle_ttl_sec)
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError as e:
+                raise RuntimeError("SESSION_BACKEND=redis 사용 시 redis 패키지가 필요합니다(pip install -r requirements-redis.txt).") from e
+            client = aioredis.from_url(url, decode_responses=True)
+        self._redis = client
+
+    def _key(self, session_id: str) -> str:
+        return f"greeni:session:{self.name}:{session_id}"
+
+    async def load(self, session_id: str) -> list[Message]:
+        raw = await self._redis.lrange(self._key(session_id), 0, -1)
+        return [json.loads(item) for item in raw]
+
+    async def append_turn(self, session_id: str, user_text: str, reply: str) -> int:
+        key = self._key(session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(
+                key,
+                json.dumps({"role": "user", "content": user_text}, ensure_ascii=False),
+                json.dumps({"role": "assistant", "content": reply}, ensure_ascii=False),
+            )
+            pipe.expire(key, self.idle_ttl_sec)
+            n, _ = await pipe.execute()
+        return n // 2
+
+    async def turn_count(self, session_id: str) -> int:
+        return await self._redis.llen(self._key(session_id)) // 2
+
+    async def delete(self, session_id: str) -> None:
+        await self._redis.delete(self._key(session_id))
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_backend(name: str) -> SessionBackend:
+    """settings.SESSION_BACKEND 값에 맞는 backend를 만듭니다. name은 roleplay/diary 구분용."""
+    kind = settings.SESSION_BACKEND
+    backend: SessionBackend
+    if kind == "memory":
+        backend = MemoryBackend(name)
+    elif kind == "journal":
+        backend = JournaledMemoryBackend(name, settings.SESSION_JOURNAL_DIR / name)
+    elif kind == "sqlite":
+        backend = SQLiteBackend(name, settings.SESSION_SQLITE_PATH)
+    elif kind == "redis":
+        backend = RedisBackend(name)
+    else:
+        raise ValueError(f"unknown SESSION_BACKEND: {kind}")
+    _backends.append(backend)
+    return backend
+
+
+async def close_backends() -> None:
+    """app 종료 시 외부 연결(redis 등) 정리."""
+    for backend in _backends:
+        try:
+            await backend.close()
+        except Exception:
+            log.exception("session_backend_close_failed", extra={"store": backend.name})
@@ -0,0 +1,159 @@
+# common/session_store.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar
+
+from config import settings
+from common.logging import get_logger
+from common.metrics import metrics
+
+log = get_logger("greeni.session_store")
+
+V = TypeVar("V")
+
+# sweeper가 주기적으로 sweep()을 호출할 대상(SessionStore, SQLite backend 등)
+_sweepables: List[Any] = []
+_sweeper_task: Optional["asyncio.Task"] = None
+
+
+class SessionStore(Generic[V]):
+    """
+    세션별 상태(대화 메모리 등)를 담는 bounded 저장소.
+
+    - max_sessions 초과 시 가장 오래 안 쓴 세션부터 제거(LRU)
+    - idle_ttl_sec 동안 접근이 없던 세션은 만료
+    - 요청 경로에서는 해당 세션 1개의 만료만 확인하고, 전체 정리는 주기적 sweeper가 담당
+      (OrderedDict가 마지막 접근 순으로 정렬돼 있어 sweep은 만료된 앞부분만 훑고 멈춤)
+
+    메트릭:
+      sessions_live{store=...}           현재 세션 수(gauge)
+      sessions_bytes{store=...}          대략적인 메모리 사용량(gauge, sizeof 기준)
+      session_evicted{store=...,reason}  ttl/lru 로 제거된 세션 수
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], V],
+        *,
+        max_sessions: int = settings.SESSION_MAX_COUNT,
+        idle_ttl_sec: float = settings.SESSION_IDLE_TTL_SEC,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ) -> None:
+        self.name = name
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl_sec = idle_ttl_sec
+        self.sizeof = sizeof
+        self._data: "OrderedDict[str, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        metrics.register_gauge("sessions_live", lambda: len(self), store=name)
+        metrics.register_gauge("sessions_bytes", self.approx_bytes, store=name)
+        register_sweepable(self)
+
+    def get(self, session_id: str) -> Optional[V]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(session_id)
+            if item is None:
+                return None
+            last, value = item
+            if now - last > self.idle_ttl_sec:
+                del self._data[session_id]
+                metrics.incr("session_evicted", store=self.name, reason="ttl")
+                return None
+            self._data[session_id] = (now, value)
+            self._data.move_to_end(session_id)
+            return value
+
+    def get_or_create(self, session_id: str) -> V:
+        value = self.get(session_id)
+        if value is not None:
+            return value
+
+        value = self.factory()
+        self.put(session_id, value)
+        return value
+
+    def put(self, session_id: str, value: V) -> None:
+        with self._lock:
+            self._data[session_id] = (time.monotonic(), value)
+            self._data.move_to_end(session_id)
+            while len(self._data) > self.max_sessions:
+                old_id, _ = self._data.popitem(last=False)
+                metrics.incr("session_evicted", store=self.name, reason="lru")
+                log.info("session_evicted", extra={"store": self.name, "session_id": old_id, "reason": "lru"})
+
+    def pop(self, session_id: str) -> Optional[V]:
+        with self._lock:
+            item = self._data.pop(session_id, None)
+        return item[1] if item else None
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def sweep(self) -> int:
+        """idle TTL이 지난 세션 제거. 제거한 개수를 반환합니다."""
+        deadline = time.monotonic() - self.idle_ttl_sec
+        removed = 0
+        with self._lock:
+            while self._data:
+                session_id, (last, _) = next(iter(self._data.items()))
+                if last > deadline:
+                    break
+                del self._data[session_id]
+                removed += 1
+        if removed:
+            metrics.incr("session_evicted", removed, store=self.name, reason="ttl")
+        return removed
+
+    def approx_bytes(self) -> int:
+        if self.sizeof is None:
+            return 0
+        with self._lock:
+            values = [v for _, v in self._data.values()]
+        return sum(self.sizeof(v) for v in values)
+
+
+def register_sweepable(obj: Any) -> None:
+    """name 속성과 sweep() -> int 메서드를 가진 객체를 주기 정리 대상에 등록합니다."""
+    _sweepables.append(obj)
+
+
+async def _sweep_loop(interval_sec: float) -> None:
+    while True:
+        await asyncio.sleep(interval_sec)
+        for store in list(_sweepables):
+            try:
+                removed = await asyncio.to_thread(store.sweep)
+            except Exception:
+                log.exception("session_sweep_failed", extra={"store": store.name})
+                continue
+            if removed:
+                log.info("session_sweep", extra={"store": store.name, "removed": removed})
+
+
+def start_sweeper(interval_sec: float = settings.SESSION_SWEEP_INTERVAL_SEC) -> None:
+    """app lifespan에서 호출. 모든 SessionStore를 주기적으로 정리합니다."""
+    global _sweeper_task
+    if _sweeper_task is None or _sweeper_task.done():
+        _sweeper_task = asyncio.get_running_loop().create_task(_sweep_loop(interval_sec))
+
+
+async def stop_sweeper() -> None:
+    global _sweeper_task
+    if _sweeper_task is not None:
+        _sweeper_task.cancel()
+        try:
+            await _sweeper_task
+        except asyncio.CancelledError:
+            pass
+        _sweeper_task = None
@@ -0,0 +1,73 @@
+# common/singleflight.py
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from common.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    같은 key로 동시에 들어온 upstream 호출을 1번으로 합칩니다.
+    - 첫 호출(leader)만 fn()을 실행하고, 나머지는 같은 Task 결과를 기다립니다.
+    - upstream 호출은 별도 Task로 돌기 때문에, leader 요청이 끊겨도 기다리던 요청들은 결과를 받습니다.
+    - 결과(예외 포함)는 완료 즉시 공유가 끝나며, 캐시 역할은 하지 않습니다.
+    - abandon_grace_sec를 주면 기다리는 요청이 모두 떠난 뒤 그 시간 안에 아무도 다시 합류하지 않을 때
+      upstream Task를 취소합니다(None이면 끝까지 실행).
+
+    메트릭:
+      singleflight_calls{flight=...}      전체 호출 수
+      singleflight_coalesced{flight=...}  기존 호출에 합쳐진 수
+      singleflight_inflight{flight=...}   현재 진행 중인 key 수(gauge)
+      singleflight_abandoned{flight=...}  기다리는 요청이 없어 취소한 수
+    """
+
+    def __init__(self, name: str, *, abandon_grace_sec: Optional[float] = None) -> None:
+        self.name = name
+        self.abandon_grace_sec = abandon_grace_sec
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+        self._waiters: Dict["asyncio.Task", int] = {}
+        metrics.register_gauge("singleflight_inflight", lambda: len(self._inflight), flight=name)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        metrics.incr("singleflight_calls", flight=self.name)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.incr("singleflight_coalesced", flight=self.name)
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._done(k, t))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if self._waiters[task] == 0:
+                del self._waiters[task]
+                if self.abandon_grace_sec is not None and not task.done():
+                    asyncio.get_running_loop().call_later(self.abandon_grace_sec, self._abandon, task)
+
+    def _abandon(self, task: "asyncio.Task") -> None:
+        if task.done() or self._waiters.get(task):
+            return
+        metrics.incr("singleflight_abandoned", flight=self.name)
+        task.cancel()
+
+    def _done(self, key: str, task: "asyncio.Task") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 기다리던 쪽이 모두 끊긴 경우에도 "exception was never retrieved" 경고가 나지 않도록
+        if not task.cancelled():
+            task.exception()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
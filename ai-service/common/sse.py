@@ -0,0 +1,71 @@
+# common/sse.py
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncGenerator, AsyncIterator, Optional
+
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+# events()가 준비(세션 lock + upstream 연결)를 마쳤다는 표시. 클라이언트로는 보내지 않음
+READY = ""
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """Server-Sent Events 한 건을 직렬화합니다. data는 한 줄 JSON으로 보냅니다."""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+class StartedStream:
+    """
+    첫 yield(READY)까지 실행된 이벤트 generator.
+    generator 안에서 잡은 자원(세션 lock 등)은 generator가 끝나거나 닫힐 때 풀립니다.
+    - 끝까지 읽거나 aclose()하면 바로
+    - 한 번도 읽지 않고 버려져도 asyncio의 async generator finalizer가 aclose를 호출
+    """
+
+    def __init__(self, events: AsyncGenerator[str, None]) -> None:
+        self._events = events
+
+    def __aiter__(self) -> "StartedStream":
+        return self
+
+    async def __anext__(self) -> str:
+        return await self._events.__anext__()
+
+    async def aclose(self) -> None:
+        await self._events.aclose()
+
+
+async def start_stream(events: AsyncGenerator[str, None]) -> StartedStream:
+    """
+    events를 첫 yield(READY)까지 실행합니다.
+    lock 거절(409)이나 upstream 연결 실패(502)가 응답 시작 전에 예외로 올라가도록 하면서,
+    lock은 generator 안에서만 잡아 어떤 경우에도 generator 정리와 함께 풀리게 합니다.
+    """
+    first = await events.__anext__()
+    if first != READY:
+        await events.aclose()
+        raise RuntimeError("event stream must yield READY first")
+    return StartedStream(events)
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """
+    text/event-stream 응답.
+    - 프록시(nginx 등)가 버퍼링하지 않도록 X-Accel-Buffering: no 를 붙입니다.
+    - 응답이 끝나면(끊김 포함) events를 닫아 안에서 잡은 lock 등을 바로 풉니다.
+    """
+    aclose = getattr(events, "aclose", None)
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+        background=BackgroundTask(aclose) if aclose is not None else None,
+    )
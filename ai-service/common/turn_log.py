@@ -0,0 +1,87 @@
+# common/turn_log.py
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Optional
+
+Message = dict[str, str]
+
+# chat_histories/*.json (LangChain messages_to_dict 형식) <-> OpenAI role
+_TYPE_TO_ROLE = {"human": "user", "ai": "assistant", "system": "system"}
+_ROLE_TO_TYPE = {v: k for k, v in _TYPE_TO_ROLE.items()}
+
+
+class TurnLog:
+    """
+    세션 1개의 대화 기록(ConversationBufferMemory 대체).
+
+    - 메시지를 OpenAI API 형식({"role", "content"})으로 한 번만 만들어 보관하므로
+      매 턴 변환/복사가 없습니다. messages는 읽기 전용으로 취급해 주세요.
+    - 턴 수/바이트 수는 append 시점에 갱신되어 O(1)로 조회합니다.
+    - chat_histories/*.json 과 같은 LangChain 직렬화 형식으로 읽고 쓸 수 있습니다.
+    """
+
+    __slots__ = ("messages", "nbytes")
+
+    def __init__(self, messages: Optional[Iterable[Message]] = None) -> None:
+        self.messages: list[Message] = []
+        self.nbytes = 0
+        if messages:
+            for msg in messages:
+                self._append(msg["role"], msg["content"])
+
+    def _append(self, role: str, content: str) -> None:
+        self.messages.append({"role": role, "content": content})
+        self.nbytes += len(content.encode("utf-8"))
+
+    def append_turn(self, user_text: str, reply: str) -> int:
+        """(user, assistant) 한 쌍 추가 후 턴 수 반환."""
+        self._append("user", user_text)
+        self._append("assistant", reply)
+        return self.turn_count
+
+    @property
+    def turn_count(self) -> int:
+        return len(self.messages) // 2
+
+    def clear(self) -> None:
+        self.messages = []
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    # ========= chat_histories/*.json 호환 =========
+
+    def to_dict(self) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        for msg in self.messages:
+            msg_type = _ROLE_TO_TYPE.get(msg["role"], msg["role"])
+            data: dict[str, Any] = {
+                "content": msg["content"],
+                "additional_kwargs": {},
+                "response_metadata": {},
+                "type": msg_type,
+                "name": None,
+                "id": None,
+            }
+            if msg_type == "ai":
+                data.update({"tool_calls": [], "invalid_tool_calls": [], "usage_metadata": None})
+            out.append({"type": msg_type, "data": data})
+        return out
+
+    @classmethod
+    def from_dict(cls, items: Iterable[dict[str, Any]]) -> "TurnLog":
+        log = cls()
+        for item in items:
+            role = _TYPE_TO_ROLE.get(item.get("type", ""), item.get("type", ""))
+            log._append(role, item.get("data", {}).get("content", ""))
+        return log
+
+    def dumps(self) -> str:
+        # 기존 파일과 같은 형태(ASCII escape)로 저장
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def loads(cls, raw: str) -> "TurnLog":
+        return cls.from_dict(json.loads(raw))
@@ -0,0 +1,93 @@
+# common/upload.py
+from __future__ import annotations
+
+import io
+from typing import AsyncIterator
+
+from fastapi import Request
+from starlette.datastructures import FormData, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from common.errors import AppError, bad_request
+
+# 파일 외 폼 필드/multipart 경계 등에 허용하는 여유분
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+def too_large(max_bytes: int) -> AppError:
+    return AppError(
+        message=f"upload too large (max {max_bytes // (1024 * 1024)}MB)",
+        code="upload_too_large",
+        status_code=413,
+    )
+
+
+async def limited_stream(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    """
+    요청 body를 받는 대로 흘려보내면서 크기를 셉니다.
+    Content-Length가 이미 크면 body를 읽기 전에, 아니면(chunked 등) 한도를 넘는 순간 413.
+    """
+    limit = max_bytes + FORM_OVERHEAD_BYTES
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > limit:
+        raise too_large(max_bytes)
+
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise too_large(max_bytes)
+        yield chunk
+
+
+class _SpooledParser(MultiPartParser):
+    """파일 파트를 spool_bytes까지만 메모리에 두고, 넘으면 임시 파일로 넘기는 multipart 파서."""
+
+    def __init__(self, *args, spool_bytes: int, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.spool_max_size = spool_bytes
+
+
+async def parse_multipart(
+    request: Request,
+    *,
+    max_bytes: int,
+    spool_bytes: int = 1024 * 1024,
+    max_files: int = 1,
+    max_fields: int = 16,
+) -> FormData:
+    """
+    request.form() 대신 쓰는 스트리밍 multipart 파싱.
+    - body 크기를 받는 동안 검사(limited_stream) -> 큰 업로드는 끝까지 받지 않고 413
+    - 파일 파트는 청크 단위로 spool에 기록 -> 요청당 메모리는 spool_bytes + 청크 크기로 제한
+    """
+    if "multipart/form-data" not in request.headers.get("content-type", ""):
+        raise bad_request("multipart/form-data required")
+    parser = _SpooledParser(
+        request.headers, limited_stream(request, max_bytes),
+        max_files=max_files, max_fields=max_fields, spool_bytes=spool_bytes,
+    )
+    try:
+        return await parser.parse()
+    except MultiPartException as e:
+        raise bad_request(str(e)) from e
+
+
+async def iter_chunks(upload: UploadFile, chunk_bytes: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """업로드 파일을 처음부터 청크 단위로 읽습니다."""
+    await upload.seek(0)
+    while chunk := await upload.read(chunk_bytes):
+        yield chunk
+
+
+async def read_head(upload: UploadFile, n: int = 64) -> bytes:
+    """형식 판별용 앞부분. 읽은 뒤 위치는 처음으로 되돌립니다."""
+    await upload.seek(0)
+    head = await upload.read(n)
+    await upload.seek(0)
+    return head
+
+
+def as_upload(data: bytes, filename: str = "upload") -> UploadFile:
+    """bytes를 UploadFile 인터페이스로 (벤치/내부 호출용)."""
+    return UploadFile(io.BytesIO(data), size=len(data), filename=filename)
@@ -0,0 +1,88 @@
+# common/worker_pool.py
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from common.errors import AppError
+from common.logging import get_logger
+from common.metrics import metrics
+
+log = get_logger("greeni.worker_pool")
+
+
+class WorkerPool:
+    """
+    CPU를 쓰는 작업(ffmpeg 등)의 동시 실행 수 제한 + 대기열 + load shedding.
+
+    - 동시에 size개까지 실행(기본: CPU 코어 수), 나머지는 최대 max_queue개까지 대기
+    - 대기열이 가득 찼거나 max_wait_sec 안에 차례가 오지 않으면 503 + Retry-After로 바로 거절
+      (밀린 작업이 API 이벤트 루프/다른 기능의 CPU를 잡아먹지 않도록)
+    - Retry-After는 최근 작업 시간(EWMA)과 대기 수로 추정
+
+    메트릭(pool=name):
+      pool_active / pool_waiting (gauge), pool_wait_ms / pool_run_ms (summary), pool_shed{reason}
+    """
+
+    def __init__(self, name: str, *, size: int = 0, max_queue: int = 0, max_wait_sec: float = 5.0) -> None:
+        self.name = name
+        self.size = size or os.cpu_count() or 1
+        self.max_queue = max_queue or self.size * 4
+        self.max_wait_sec = max_wait_sec
+        self._sem = asyncio.Semaphore(self.size)
+        self._active = 0
+        self._waiting = 0
+        self._run_sec = 0.5  # 작업 1개 소요 시간 EWMA (초기 추정치)
+
+        metrics.register_gauge("pool_active", lambda: self._active, pool=name)
+        metrics.register_gauge("pool_waiting", lambda: self._waiting, pool=name)
+
+    def retry_after(self) -> int:
+        """지금 줄을 서면 차례가 오기까지 걸릴 시간(초) 추정. 1~60초."""
+        return max(1, min(60, math.ceil(self._run_sec * (self._waiting + 1) / self.size)))
+
+    def _shed(self, reason: str) -> AppError:
+        metrics.incr("pool_shed", pool=self.name, reason=reason)
+        retry = self.retry_after()
+        log.warning("pool_shed", extra={
+            "pool": self.name, "reason": reason, "active": self._active, "waiting": self._waiting,
+            "retry_after": retry,
+        })
+        return AppError(
+            message="서버가 바빠요. 잠시 후 다시 시도해 주세요.",
+            code="server_busy",
+            status_code=503,
+            headers={"Retry-After": str(retry)},
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """실행 자리 1개. 자리가 없으면 대기하고, 대기열이 넘치거나 오래 기다리면 AppError(503)."""
+        # 실행 중 + 대기 중 수는 await 없이 갱신되므로 동시에 몰려도 정확
+        if self._active + self._waiting >= self.size + self.max_queue:
+            raise self._shed("queue_full")
+
+        t0 = time.perf_counter()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.max_wait_sec)
+        except asyncio.TimeoutError:
+            raise self._shed("wait_timeout") from None
+        finally:
+            self._waiting -= 1
+
+        t1 = time.perf_counter()
+        metrics.observe("pool_wait_ms", (t1 - t0) * 1000, pool=self.name)
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._sem.release()
+            run = time.perf_counter() - t1
+            self._run_sec = 0.8 * self._run_sec + 0.2 * run
+            metrics.observe("pool_run_ms", run * 1000, pool=self.name)
@@ -31,6 +31,122 @@ class Settings:
     CLOVA_API_KEY_ID: str = os.getenv("CLOVA_API_KEY_ID", "")
     CLOVA_API_KEY: str = os.getenv("CLOVA_API_KEY", "")
 
+    # STT (services/stt_service.py)
+    STT_MODEL: str = os.getenv("STT_MODEL", "gpt-4o-transcribe")
+    FFMPEG_PATH: str = os.getenv("FFMPEG_PATH", "")  # 비우면 PATH의 ffmpeg -> imageio-ffmpeg 번들
+    STT_TRANSCODE_TIMEOUT_SEC: float = float(os.getenv("STT_TRANSCODE_TIMEOUT_SEC", "20"))
+    STT_TRANSCRIBE_TIMEOUT_SEC: float = float(os.getenv("STT_TRANSCRIBE_TIMEOUT_SEC", "60"))
+    # ffmpeg 동시 실행 수(0이면 CPU 코어 수) / 대기열 길이(0이면 동시 실행 수 x4) / 최대 대기
+    STT_TRANSCODE_WORKERS: int = int(os.getenv("STT_TRANSCODE_WORKERS", "0"))
+    STT_TRANSCODE_QUEUE_MAX: int = int(os.getenv("STT_TRANSCODE_QUEUE_MAX", "0"))
+    STT_TRANSCODE_QUEUE_TIMEOUT_SEC: float = float(os.getenv("STT_TRANSCODE_QUEUE_TIMEOUT_SEC", "5"))
+    # 변환 없이 그대로 전사 API로 보낼 형식(헤더로 판별)과 최대 크기(API 업로드 한도 25MB 이하)
+    STT_PASSTHROUGH_FORMATS: str = os.getenv("STT_PASSTHROUGH_FORMATS", "mp3,m4a")
+    STT_PASSTHROUGH_MAX_BYTES: int = int(os.getenv("STT_PASSTHROUGH_MAX_BYTES", str(24 * 1024 * 1024)))
+    # passthrough 녹음 길이 추정용 최저 비트레이트: 크기가 STT_SEGMENT_MAX_SEC 분량을 넘으면 디코딩해 분할
+    STT_PASSTHROUGH_MIN_KBPS: int = int(os.getenv("STT_PASSTHROUGH_MIN_KBPS", "64"))
+    # 에너지 VAD (common/audio.vad): 무음 자르기 / 긴 쉼 줄이기 / 무음 녹음은 전사 전에 거절
+    STT_VAD_ENABLED: bool = os.getenv("STT_VAD_ENABLED", "true").lower() == "true"
+    STT_VAD_MIN_DB: float = float(os.getenv("STT_VAD_MIN_DB", "-50"))
+    STT_VAD_MARGIN_DB: float = float(os.getenv("STT_VAD_MARGIN_DB", "10"))
+    STT_VAD_PAD_MS: int = int(os.getenv("STT_VAD_PAD_MS", "200"))
+    STT_VAD_MAX_PAUSE_MS: int = int(os.getenv("STT_VAD_MAX_PAUSE_MS", "500"))
+    STT_VAD_MIN_SPEECH_MS: int = int(os.getenv("STT_VAD_MIN_SPEECH_MS", "150"))
+    # 긴 음성 분할 전사: MAX_SEC보다 길면 [MIN_SEC, MAX_SEC] 조각으로 나눠 CONCURRENCY개씩 동시 전사
+    STT_SEGMENT_MAX_SEC: float = float(os.getenv("STT_SEGMENT_MAX_SEC", "20"))
+    STT_SEGMENT_MIN_SEC: float = float(os.getenv("STT_SEGMENT_MIN_SEC", "8"))
+    STT_SEGMENT_OVERLAP_MS: int = int(os.getenv("STT_SEGMENT_OVERLAP_MS", "300"))
+    STT_SEGMENT_CONCURRENCY: int = int(os.getenv("STT_SEGMENT_CONCURRENCY", "4"))
+    # 업로드: MAX_BYTES를 넘으면 받는 도중 413, 파일 파트는 SPOOL_BYTES까지 메모리/넘으면 임시 파일
+    STT_UPLOAD_MAX_BYTES: int = int(os.getenv("STT_UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+    STT_UPLOAD_SPOOL_BYTES: int = int(os.getenv("STT_UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+    STT_UPLOAD_CHUNK_BYTES: int = int(os.getenv("STT_UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+    # 같은 녹음 재업로드(클라이언트 재시도)에 쓰는 전사 결과 캐시
+    STT_CACHE_MAX_ENTRIES: int = int(os.getenv("STT_CACHE_MAX_ENTRIES", "512"))
+    STT_CACHE_TTL_SEC: float = float(os.getenv("STT_CACHE_TTL_SEC", "600"))
+    # 요청이 모두 끊긴 전사를 재시도 합류용으로 유지하는 시간 (지나면 ffmpeg/전사 취소, 0이면 즉시)
+    STT_ABANDON_GRACE_SEC: float = float(os.getenv("STT_ABANDON_GRACE_SEC", "2"))
+    # store_audio 녹음 보관 (services/stt_archive.py): 백그라운드 presign 업로드, URL은 세션별 조회
+    STT_ARCHIVE_QUEUE_MAX: int = int(os.getenv("STT_ARCHIVE_QUEUE_MAX", "200"))
+    STT_ARCHIVE_MAX_BYTES: int = int(os.getenv("STT_ARCHIVE_MAX_BYTES", str(256 * 1024 * 1024)))
+    STT_ARCHIVE_WORKERS: int = int(os.getenv("STT_ARCHIVE_WORKERS", "2"))
+    STT_ARCHIVE_BATCH: int = max(1, int(os.getenv("STT_ARCHIVE_BATCH", "8")))
+    STT_ARCHIVE_RETRIES: int = int(os.getenv("STT_ARCHIVE_RETRIES", "5"))
+    STT_ARCHIVE_ENCODE_WORKERS: int = max(1, int(os.getenv("STT_ARCHIVE_ENCODE_WORKERS", "1")))
+    STT_ARCHIVE_SESSIONS_MAX: int = int(os.getenv("STT_ARCHIVE_SESSIONS_MAX", "10000"))
+    STT_ARCHIVE_URL_TTL_SEC: float = float(os.getenv("STT_ARCHIVE_URL_TTL_SEC", str(24 * 3600)))
+
+    # OpenAI 공유 커넥션 풀 (common/llm.py)
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    LLM_KEEPALIVE_EXPIRY_SEC: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SEC", "60"))
+    LLM_CONNECT_TIMEOUT_SEC: float = float(os.getenv("LLM_CONNECT_TIMEOUT_SEC", "5"))
+
+    # 다섯고개 힌트 캐시 (services/game_service.py)
+    CACHE_DIR: Path = STORAGE_DIR / "cache"
+    HINT_CACHE_DIR: Path = CACHE_DIR / "fiveq"
+    HINT_CACHE_MAX_ENTRIES: int = int(os.getenv("HINT_CACHE_MAX_ENTRIES", "2048"))
+    HINT_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("HINT_CACHE_DISK_MAX_ENTRIES", "20000"))
+    HINT_CACHE_DISK_MAX_BYTES: int = int(os.getenv("HINT_CACHE_DISK_MAX_BYTES", str(64 * 1024 * 1024)))
+    HINT_CACHE_TTL_SEC: float = float(os.getenv("HINT_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+    HINT_CACHE_VARIANTS: int = max(1, int(os.getenv("HINT_CACHE_VARIANTS", "1")))
+
+    # 대화 세션 저장소 (common/session_store.py)
+    SESSION_MAX_COUNT: int = int(os.getenv("SESSION_MAX_COUNT", "5000"))
+    SESSION_IDLE_TTL_SEC: float = float(os.getenv("SESSION_IDLE_TTL_SEC", "3600"))
+    SESSION_SWEEP_INTERVAL_SEC: float = float(os.getenv("SESSION_SWEEP_INTERVAL_SEC", "60"))
+    # memory(기본, 단일 worker) / journal(memory + 디스크 저널, 단일 worker)
+    # / sqlite(단일 호스트 multi-worker) / redis(multi-replica)
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "memory")
+    SESSION_JOURNAL_DIR: Path = Path(os.getenv("SESSION_JOURNAL_DIR") or STORAGE_DIR / "journal")
+    SESSION_JOURNAL_FSYNC_INTERVAL_SEC: float = float(os.getenv("SESSION_JOURNAL_FSYNC_INTERVAL_SEC", "0.05"))
+    SESSION_JOURNAL_COMPACT_EVERY: int = int(os.getenv("SESSION_JOURNAL_COMPACT_EVERY", "32"))
+    # 같은 세션에 턴이 진행 중일 때: queue(대기) / reject(409) / merge(같은 발화면 결과 공유)
+    SESSION_DUPLICATE_POLICY: str = os.getenv("SESSION_DUPLICATE_POLICY", "queue")
+    SESSION_SQLITE_PATH: Path = Path(os.getenv("SESSION_SQLITE_PATH") or STORAGE_DIR / "sessions.db")
+    SESSION_REDIS_URL: str = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+
+    # 아이별 기억 벡터 저장소 (memory/vdb.py)
+    VDB_DIR: Path = Path(os.getenv("VDB_DIR") or STORAGE_DIR / "vdb")
+    VDB_DIM: int = int(os.getenv("VDB_DIM", "256"))
+    VDB_COMPACT_RATIO: float = float(os.getenv("VDB_COMPACT_RATIO", "0.25"))
+    VDB_MAX_SEGMENTS: int = int(os.getenv("VDB_MAX_SEGMENTS", "8"))
+    # flat(항상 전체 스캔) / ivf / ivfpq (memory/ann.py). 벡터가 VDB_ANN_MIN_VECTORS개 이상인 아이만 인덱스 사용
+    VDB_INDEX: str = os.getenv("VDB_INDEX", "ivf")
+    VDB_ANN_MIN_VECTORS: int = int(os.getenv("VDB_ANN_MIN_VECTORS", "20000"))
+    VDB_IVF_NLIST: int = int(os.getenv("VDB_IVF_NLIST", "0"))  # 0이면 4*sqrt(n)
+    VDB_IVF_NPROBE: int = int(os.getenv("VDB_IVF_NPROBE", "8"))
+    VDB_PQ_M: int = int(os.getenv("VDB_PQ_M", "32"))
+    VDB_PQ_RERANK: int = int(os.getenv("VDB_PQ_RERANK", "16"))
+
+    # 임베딩 (common/embedding.py). openai(기본) / local(오프라인 hashing 임베더)
+    EMBED_PROVIDER: str = os.getenv("EMBED_PROVIDER", "openai")
+    EMBED_MODEL: str = os.getenv("EMBED_MODEL", "text-embedding-3-small")
+    EMBED_BATCH_WINDOW_MS: float = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+    EMBED_MAX_BATCH: int = int(os.getenv("EMBED_MAX_BATCH", "64"))
+    EMBED_TIMEOUT_MS: float = float(os.getenv("EMBED_TIMEOUT_MS", "1500"))
+    EMBED_CACHE_DIR: Path = CACHE_DIR / "embed"
+    EMBED_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "10000"))
+    EMBED_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("EMBED_CACHE_DISK_MAX_ENTRIES", "200000"))
+    EMBED_CACHE_DISK_MAX_BYTES: int = int(os.getenv("EMBED_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+    EMBED_CACHE_TTL_SEC: float = float(os.getenv("EMBED_CACHE_TTL_SEC", str(30 * 24 * 3600)))
+
+    # 턴 직전 기억 검색 (memory/recall.py)
+    RECALL_BUDGET_MS: float = float(os.getenv("RECALL_BUDGET_MS", "80"))
+    RECALL_TOP_K: int = int(os.getenv("RECALL_TOP_K", "3"))
+    RECALL_MAX_TOKENS: int = int(os.getenv("RECALL_MAX_TOKENS", "200"))
+    RECALL_MIN_SCORE: float = float(os.getenv("RECALL_MIN_SCORE", "0.3"))
+    # lexical(기본, BM25 + n-gram, 네트워크 없음) / dense(임베딩) / hybrid(둘 다, dense가 늦으면 lexical만)
+    # dense/hybrid는 매 턴 발화를 upstream으로 임베딩(과금)하므로 임베딩 지연이 RECALL_BUDGET_MS 안에 들 때만 켜세요
+    RECALL_MODE: str = os.getenv("RECALL_MODE", "lexical")
+    RECALL_HYBRID_ALPHA: float = float(os.getenv("RECALL_HYBRID_ALPHA", "0.6"))
+
+    # 백그라운드 write-behind 큐 (common/background.py, memory/indexer.py)
+    MEMORY_QUEUE_MAX: int = int(os.getenv("MEMORY_QUEUE_MAX", "1000"))
+    MEMORY_QUEUE_WORKERS: int = int(os.getenv("MEMORY_QUEUE_WORKERS", "2"))
+    MEMORY_QUEUE_RETRIES: int = int(os.getenv("MEMORY_QUEUE_RETRIES", "5"))
+    BACKGROUND_DRAIN_SEC: float = float(os.getenv("BACKGROUND_DRAIN_SEC", "10"))
+
 settings = Settings()
 
 # 디렉토리 설정 (없으면 만들어줌)
@@ -0,0 +1,270 @@
+# memory/ann.py
+from __future__ import annotations
+
+import math
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from common.metrics import metrics
+
+_KMEANS_ITERS = 10
+_PQ_CODES = 256
+
+
+def kmeans(x: np.ndarray, k: int, *, iters: int = _KMEANS_ITERS, seed: int = 0, spherical: bool = True) -> np.ndarray:
+    """
+    k-means 중심 (k, d). spherical=True면 정규화된 벡터용(cosine 기준 할당, 중심도 정규화).
+    x는 학습 샘플이므로 호출하는 쪽에서 크기를 제한해 주세요.
+    """
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float32)
+    k = min(k, x.shape[0])
+    centroids = x[rng.choice(x.shape[0], k, replace=False)].copy()
+    for _ in range(iters):
+        assign = _nearest(x, centroids, spherical)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(x[order], np.concatenate([[0], np.cumsum(counts)[:-1]])[nonempty], axis=0)
+        empty = counts == 0
+        if empty.any():
+            # 빈 클러스터는 임의 샘플로 다시 시작
+            sums[empty] = x[rng.choice(x.shape[0], int(empty.sum()))]
+            counts[empty] = 1
+        centroids = sums / counts[:, None].astype(np.float32)
+        if spherical:
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+def _nearest(x: np.ndarray, centroids: np.ndarray, spherical: bool) -> np.ndarray:
+    out = np.empty(x.shape[0], dtype=np.int64)
+    for s in range(0, x.shape[0], 8192):
+        chunk = x[s:s + 8192]
+        if spherical:
+            out[s:s + 8192] = np.argmax(chunk @ centroids.T, axis=1)
+        else:
+            d = (centroids ** 2).sum(1)[None, :] - 2 * chunk @ centroids.T
+            out[s:s + 8192] = np.argmin(d, axis=1)
+    return out
+
+
+class _List:
+    """inverted list 1개: 행 번호 + (벡터 또는 PQ 코드). 용량 2배씩 증가."""
+
+    __slots__ = ("rows", "data", "n")
+
+    def __init__(self, width: int, dtype) -> None:
+        self.rows = np.empty(0, dtype=np.int64)
+        self.data = np.empty((0, width), dtype=dtype)
+        self.n = 0
+
+    def extend(self, rows: np.ndarray, data: np.ndarray) -> None:
+        need = self.n + rows.shape[0]
+        if need > self.rows.shape[0]:
+            cap = max(need, 2 * self.rows.shape[0], 16)
+            new_rows = np.empty(cap, dtype=np.int64)
+            new_rows[:self.n] = self.rows[:self.n]
+            new_data = np.empty((cap, self.data.shape[1]), dtype=self.data.dtype)
+            new_data[:self.n] = self.data[:self.n]
+            self.rows, self.data = new_rows, new_data
+        self.rows[self.n:need] = rows
+        self.data[self.n:need] = data
+        self.n = need
+
+
+class IVFIndex:
+    """
+    IVF(inverted file) 근사 최근접 인덱스. 정규화된 float32 벡터 + 내적(cosine) 기준.
+
+    - nlist개 중심(spherical k-means)으로 공간을 나누고, 질의 때 가까운 nprobe개 리스트만 스캔
+    - pq_m > 0 이면 리스트에 벡터 대신 중심과의 잔차(residual) PQ 코드(pq_m 바이트/벡터)를 저장하고
+      q·c + ADC(q, 잔차)로 근사 점수를 낸 뒤 상위 k * rerank 개를 원본 벡터로 다시 채점
+    - add는 가장 가까운 중심의 리스트에 붙이기만 하므로 증분 추가가 가능합니다.
+      (학습 때보다 크게 늘어나면 Collection이 재학습을 요청)
+    - 행 번호는 Collection의 행 번호를 그대로 사용하고, 삭제 여부는 질의 때 alive 마스크로 거릅니다.
+
+    튜닝: nprobe↑ -> recall↑, 지연↑ / pq_m↑ -> 정확도↑, 메모리↑ / rerank↑ -> PQ recall↑
+    """
+
+    def __init__(self, dim: int, *, nlist: int = 0, nprobe: int = 8, pq_m: int = 0, rerank: int = 8) -> None:
+        if pq_m and dim % pq_m:
+            raise ValueError(f"dim {dim} must be divisible by pq_m {pq_m}")
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.rerank = rerank
+
+        self.centroids: Optional[np.ndarray] = None
+        self.codebooks: Optional[np.ndarray] = None  # (pq_m, 256, dim / pq_m)
+        self.lists: List[_List] = []
+        self.ntotal = 0
+        self.trained_on = 0
+        self.base = ""  # 이 인덱스가 가리키는 Collection 세대(compaction 후 첫 세그먼트 이름)
+
+    @property
+    def ready(self) -> bool:
+        return self.centroids is not None
+
+    # ========= build =========
+
+    def train(self, x: np.ndarray, *, ntotal: Optional[int] = None, seed: int = 0) -> None:
+        """x: 학습 샘플. ntotal: 전체 벡터 수(nlist 자동 계산/재학습 기준, 기본 len(x))."""
+        n = ntotal or x.shape[0]
+        nlist = self.nlist_for(n)
+        rng = np.random.default_rng(seed)
+        if x.shape[0] > self.train_size(n):
+            x = x[np.sort(rng.choice(x.shape[0], self.train_size(n), replace=False))]
+        sample = np.asarray(x, dtype=np.float32)
+
+        self.centroids = kmeans(sample, nlist, seed=seed)
+        if self.pq_m:
+            sub = self.dim // self.pq_m
+            pq_sample = sample[:min(sample.shape[0], 64 * _PQ_CODES)]
+            pq_sample = pq_sample - self.centroids[_nearest(pq_sample, self.centroids, True)]
+            self.codebooks = np.stack([
+                kmeans(pq_sample[:, j * sub:(j + 1) * sub], _PQ_CODES, seed=seed + j, spherical=False)
+                for j in range(self.pq_m)
+            ])
+        self.lists = [self._new_list() for _ in range(self.centroids.shape[0])]
+        self.ntotal = 0
+        self.trained_on = n
+
+    def nlist_for(self, n: int) -> int:
+        """전체 n개일 때 중심 수. nlist=0이면 4·sqrt(n) (16 ~ 4096)."""
+        return self.nlist or int(min(4096, max(16, 4 * math.sqrt(n))))
+
+    def train_size(self, n: int) -> int:
+        """전체 n개를 학습할 때 train이 실제로 쓰는 샘플 수(중심당 32개). 더 넘기면 다시 뽑아 버림."""
+        return min(n, 32 * self.nlist_for(n))
+
+    def empty_like(self) -> "IVFIndex":
+        """학습 결과(중심/코드북)는 그대로 쓰고 리스트만 비운 새 인덱스 (행 번호가 바뀐 뒤 재할당용)."""
+        index = IVFIndex(self.dim, nlist=self.nlist, nprobe=self.nprobe, pq_m=self.pq_m, rerank=self.rerank)
+        index.centroids, index.codebooks, index.trained_on = self.centroids, self.codebooks, self.trained_on
+        index.lists = [index._new_list() for _ in range(self.centroids.shape[0])]
+        return index
+
+    def _new_list(self) -> _List:
+        return _List(self.pq_m, np.uint8) if self.pq_m else _List(self.dim, np.float32)
+
+    def encode(self, x: np.ndarray) -> np.ndarray:
+        sub = self.dim // self.pq_m
+        codes = np.empty((x.shape[0], self.pq_m), dtype=np.uint8)
+        for j in range(self.pq_m):
+            codes[:, j] = _nearest(x[:, j * sub:(j + 1) * sub], self.codebooks[j], False)
+        return codes
+
+    def add(self, rows: np.ndarray, x: np.ndarray) -> None:
+        x = np.asarray(x, dtype=np.float32)
+        rows = np.asarray(rows, dtype=np.int64)
+        assign = _nearest(x, self.centroids, True)
+        data = self.encode(x - self.centroids[assign]) if self.pq_m else x
+        order = np.argsort(assign, kind="stable")
+        bounds = np.searchsorted(assign[order], np.arange(len(self.lists) + 1))
+        for c in range(len(self.lists)):
+            lo, hi = bounds[c], bounds[c + 1]
+            if lo < hi:
+                sel = order[lo:hi]
+                self.lists[c].extend(rows[sel], data[sel])
+        self.ntotal += rows.shape[0]
+
+    # ========= search =========
+
+    def search(
+        self, q: np.ndarray, k: int, alive: np.ndarray, vectors_of=None, *, nprobe: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        q (Q, dim) 정규화된 질의 -> (rows, scores) 각각 (k, Q). 후보가 k개보다 적으면 -inf/-1로 채움.
+        vectors_of(rows) -> (len(rows), dim): PQ rerank용 원본 벡터 조회 함수.
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.lists))
+        probes = np.argpartition(-(q @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        out_rows = np.full((k, q.shape[0]), -1, dtype=np.int64)
+        out_scores = np.full((k, q.shape[0]), -np.inf, dtype=np.float32)
+        scanned = 0
+        for j in range(q.shape[0]):
+            probed = [c for c in probes[j] if self.lists[c].n]
+            if not probed:
+                continue
+            lists = [self.lists[c] for c in probed]
+            rows = np.concatenate([lst.rows[:lst.n] for lst in lists])
+            data = np.concatenate([lst.data[:lst.n] for lst in lists])
+            scanned += rows.shape[0]
+
+            if self.pq_m:
+                coarse = np.repeat(self.centroids[probed] @ q[j], [lst.n for lst in lists])
+                scores = coarse + self._adc(q[j], data)
+            else:
+                scores = data @ q[j]
+            scores[~alive[rows]] = -np.inf
+
+            if self.pq_m and vectors_of is not None:
+                m = min(k * self.rerank, rows.shape[0])
+                top = np.argpartition(-scores, m - 1)[:m] if m < rows.shape[0] else np.arange(rows.shape[0])
+                top = top[np.isfinite(scores[top])]
+                rows = rows[top]
+                scores = np.asarray(vectors_of(rows), dtype=np.float32) @ q[j] if rows.shape[0] else scores[top]
+
+            m = min(k, rows.shape[0])
+            if m == 0:
+                continue
+            top = np.argpartition(-scores, m - 1)[:m] if m < rows.shape[0] else np.arange(rows.shape[0])
+            top = top[np.argsort(-scores[top])]
+            out_rows[:m, j] = rows[top]
+            out_scores[:m, j] = scores[top]
+
+        metrics.observe("vdb_ann_scanned", scanned / max(1, q.shape[0]))
+        return out_rows, out_scores
+
+    def _adc(self, q: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        sub = self.dim // self.pq_m
+        tables = np.einsum("mcd,md->mc", self.codebooks, q.reshape(self.pq_m, sub))  # (pq_m, 256)
+        return tables[np.arange(self.pq_m), codes].sum(axis=1)
+
+    # ========= persistence =========
+
+    def save(self, path: Path) -> None:
+        sizes = np.array([lst.n for lst in self.lists], dtype=np.int64)
+        arrays = {
+            "centroids": self.centroids,
+            "sizes": sizes,
+            "rows": np.concatenate([lst.rows[:lst.n] for lst in self.lists]),
+            "data": np.concatenate([lst.data[:lst.n] for lst in self.lists]),
+            "info": np.array([self.dim, self.pq_m, self.trained_on], dtype=np.int64),
+            "base": np.array(self.base),
+        }
+        if self.codebooks is not None:
+            arrays["codebooks"] = self.codebooks
+        path = Path(path)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, *, nprobe: int = 8, rerank: int = 8) -> "IVFIndex":
+        with np.load(path) as z:
+            dim, pq_m, trained_on = (int(v) for v in z["info"])
+            index = cls(dim, nlist=z["centroids"].shape[0], nprobe=nprobe, pq_m=pq_m, rerank=rerank)
+            index.centroids = z["centroids"]
+            index.codebooks = z["codebooks"] if "codebooks" in z.files else None
+            index.trained_on = trained_on
+            index.base = str(z["base"])
+            rows, data = z["rows"], z["data"]
+            offsets = np.concatenate([[0], np.cumsum(z["sizes"])])
+        index.lists = []
+        for c in range(index.centroids.shape[0]):
+            lst = index._new_list()
+            lst.extend(rows[offsets[c]:offsets[c + 1]], data[offsets[c]:offsets[c + 1]])
+            index.lists.append(lst)
+        index.ntotal = int(offsets[-1])
+        return index
@@ -0,0 +1,72 @@
+# memory/indexer.py
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+from config import settings
+from common.background import BackgroundQueue
+from common.embedding import get_embedder
+from common.logging import get_logger
+from memory.vdb import get_vdb
+
+log = get_logger("greeni.memory_indexer")
+
+EMOTION_KO = {"angry": "화남", "happy": "기쁨", "sad": "슬픔", "surprised": "놀람", "anxiety": "불안"}
+
+# 일기 요약 -> 아이별 기억 저장 (write-behind)
+_queue = BackgroundQueue(
+    "memory_index",
+    maxsize=settings.MEMORY_QUEUE_MAX,
+    workers=settings.MEMORY_QUEUE_WORKERS,
+    max_retries=settings.MEMORY_QUEUE_RETRIES,
+)
+
+
+class EmbeddingUnavailable(RuntimeError):
+    """upstream 임베딩 실패(fallback 벡터). 다른 공간의 벡터를 저장하지 않도록 재시도합니다."""
+
+
+async def index_diary_summary(
+    child_id: str,
+    session_id: str,
+    *,
+    summary: str,
+    keyword: str,
+    emotion: str,
+    ts: Optional[float] = None,
+) -> None:
+    """
+    일기 1건을 기억 3개(summary/keyword/emotion)로 저장합니다.
+    id가 diary:<session_id>:<kind> 로 고정이라 재시도/중복 호출돼도 upsert입니다.
+    """
+    ts = ts or time.time()
+    day = time.strftime("%Y-%m-%d", time.localtime(ts))
+    docs = [
+        ("summary", summary),
+        ("keyword", keyword),
+        ("emotion", f"{keyword} 이야기를 하며 {EMOTION_KO.get(emotion, emotion)}을(를) 느꼈다"),
+    ]
+    texts = [text for _, text in docs]
+
+    emb = await get_embedder().embed(texts)
+    if emb.fallback.any():
+        raise EmbeddingUnavailable("embedding upstream unavailable")
+
+    ids = [f"diary:{session_id}:{kind}" for kind, _ in docs]
+    metas = [
+        {"kind": kind, "text": text, "ts": ts, "day": day, "session_id": session_id, "source": "diary"}
+        for kind, text in docs
+    ]
+    await asyncio.to_thread(get_vdb().add, child_id, ids, emb.vectors, metas)
+    log.info("memory_indexed", extra={"child_id": child_id, "session_id": session_id, "docs": len(ids)})
+
+
+def enqueue_diary_summary(child_id: str, session_id: str, *, summary: str, keyword: str, emotion: str) -> bool:
+    """응답 경로에서 호출. 큐에 넣고 바로 반환합니다(가득 차면 False)."""
+    ts = time.time()
+    return _queue.submit(
+        f"diary:{session_id}",
+        lambda: index_diary_summary(child_id, session_id, summary=summary, keyword=keyword, emotion=emotion, ts=ts),
+    )
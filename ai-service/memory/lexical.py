@@ -0,0 +1,232 @@
+# memory/lexical.py
+from __future__ import annotations
+
+import re
+import weakref
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from config import settings
+from memory.vdb import Collection, Hit
+
+# ========= 한글 자모 =========
+
+_HANGUL_BASE, _HANGUL_LAST = 0xAC00, 0xD7A3
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = ["", *"ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"]
+
+_WORD = re.compile(r"\w+")
+
+
+def to_jamo(text: str) -> str:
+    """한글 음절을 초/중/종성 호환 자모로 분해합니다. (먹었어 -> ㅁㅓㄱㅇㅓㅆㅇㅓ)"""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            idx = code - _HANGUL_BASE
+            out.append(_CHO[idx // 588])
+            out.append(_JUNG[(idx % 588) // 28])
+            out.append(_JONG[idx % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def terms(text: str) -> List[str]:
+    """
+    BM25 용어: 단어 + 단어 안의 음절 bigram.
+    조사/어미가 붙어도(강아지가/강아지랑) bigram(강아/아지)이 겹쳐서 형태소 분석 없이 매칭됩니다.
+    """
+    out: List[str] = []
+    for word in _WORD.findall(text.lower()):
+        out.append("w:" + word)
+        for i in range(len(word) - 1):
+            out.append("b:" + word[i:i + 2])
+    return out
+
+
+def _hash(term: str, n_features: int) -> int:
+    return zlib.crc32(term.encode("utf-8")) % n_features
+
+
+def _column_dot(mat: sparse.csc_matrix, cols: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """mat[:, cols] @ weights. 질의 열이 수십 개뿐이라 scipy 슬라이싱 대신 CSC 배열을 직접 모아 bincount."""
+    starts, ends = mat.indptr[cols], mat.indptr[cols + 1]
+    if not cols.size or not (ends > starts).any():
+        return np.zeros(mat.shape[0], dtype=np.float32)
+    rows = np.concatenate([mat.indices[a:b] for a, b in zip(starts, ends)])
+    vals = np.concatenate([mat.data[a:b] * w for a, b, w in zip(starts, ends, weights)])
+    return np.bincount(rows, weights=vals, minlength=mat.shape[0])
+
+
+# ========= sparse n-gram vectorizer =========
+
+class NgramVectorizer:
+    """
+    hashed 문자 n-gram + 자모 n-gram -> scipy.sparse CSR (sublinear tf, L2 정규화).
+    - 문자 n-gram: 철자가 같은 부분
+    - 자모 n-gram: 받침/활용이 달라도 비슷한 소리(먹었/먹어, 갔/가)
+    어휘 사전 없이 해시로 열을 정하므로 학습/저장이 필요 없습니다.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, char_ngrams: Sequence[int] = (2, 3),
+                 jamo_ngrams: Sequence[int] = (3,)) -> None:
+        self.n_features = n_features
+        self.char_ngrams = tuple(char_ngrams)
+        self.jamo_ngrams = tuple(jamo_ngrams)
+
+    def features(self, text: str) -> Dict[int, float]:
+        counts: Dict[int, float] = {}
+        for word in _WORD.findall(text.lower()):
+            padded = f" {word} "
+            jamo = f" {to_jamo(word)} "
+            for prefix, src, sizes in (("c", padded, self.char_ngrams), ("j", jamo, self.jamo_ngrams)):
+                for n in sizes:
+                    for i in range(len(src) - n + 1):
+                        col = _hash(prefix + src[i:i + n], self.n_features)
+                        counts[col] = counts.get(col, 0.0) + 1.0
+        return counts
+
+    def weights(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """(열 번호, 가중치) 한 문서/질의 분량."""
+        feats = self.features(text)
+        cols = np.fromiter(feats.keys(), dtype=np.int64, count=len(feats))
+        vals = 1.0 + np.log(np.fromiter(feats.values(), dtype=np.float32, count=len(feats)))
+        if vals.size:
+            vals /= np.linalg.norm(vals)
+        return cols, vals
+
+    def transform(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            cols, vals = self.weights(text)
+            indices.extend(cols.tolist())
+            data.extend(vals.tolist())
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(indptr) - 1, self.n_features),
+        )
+
+
+# ========= BM25 + n-gram 하이브리드 =========
+
+class LexicalIndex:
+    """
+    아이 1명의 기억(요약/키워드 등 meta["text"])에 대한 네트워크 없는 검색.
+
+    - BM25 (k1, b): 문서-용어 가중치 행렬을 CSC로 미리 계산해 두고, 질의 용어 열만 더함
+    - 문자/자모 n-gram cosine: 오타/활용형 보완
+    - score = bm25_weight * (BM25 / 최대 BM25) + (1 - bm25_weight) * n-gram cosine  (0~1)
+    문서 수가 적은(수백 개) 아이별 기록 기준으로 질의당 1ms 미만입니다.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        metas: Sequence[Dict[str, Any]],
+        *,
+        vectorizer: Optional[NgramVectorizer] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        n_features: int = 2 ** 18,
+        reuse: Optional["LexicalIndex"] = None,
+    ) -> None:
+        """reuse: 이전 인덱스. 텍스트가 같은 문서는 특징 추출 결과를 재사용(추가된 문서만 새로 계산)."""
+        self.ids = list(ids)
+        self.metas = list(metas)
+        self.vectorizer = vectorizer or NgramVectorizer()
+        self.n_features = n_features
+        texts = [m.get("text", "") for m in self.metas]
+
+        # 문서별 (BM25 용어 열, n-gram 열, n-gram 가중치)
+        old = reuse._features if reuse is not None and reuse.n_features == n_features else {}
+        self._features: Dict[str, tuple] = {}
+        for text in texts:
+            if text not in self._features:
+                self._features[text] = old.get(text) or (
+                    np.fromiter((_hash(t, n_features) for t in terms(text)), dtype=np.int64),
+                    *self.vectorizer.weights(text),
+                )
+        feats = [self._features[t] for t in texts]
+
+        # BM25 가중치 (문서 x 해시 용어)
+        lengths = np.array([f[0].size for f in feats], dtype=np.float32)
+        rows = np.repeat(np.arange(len(texts)), lengths.astype(np.int64))
+        cols = np.concatenate([f[0] for f in feats]) if feats else np.zeros(0, dtype=np.int64)
+        tf = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(texts), n_features),
+        )
+        tf.sum_duplicates()
+        n = max(1, len(texts))
+        df = np.bincount(tf.indices, minlength=n_features)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(lengths.mean()) if len(texts) else 1.0
+        norm = k1 * (1 - b + b * lengths / max(avgdl, 1e-6))
+        doc_of = np.repeat(np.arange(tf.shape[0]), np.diff(tf.indptr))
+        tf.data = tf.data * (k1 + 1) / (tf.data + norm[doc_of]) * idf[tf.indices]
+        self._bm25 = tf.tocsc()
+
+        self._ngrams = sparse.csr_matrix(
+            (
+                np.concatenate([f[2] for f in feats]) if feats else np.zeros(0, dtype=np.float32),
+                np.concatenate([f[1] for f in feats]) if feats else np.zeros(0, dtype=np.int64),
+                np.concatenate([[0], np.cumsum([f[1].size for f in feats])]).astype(np.int64),
+            ),
+            shape=(len(texts), n_features),
+        ).tocsc()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, text: str, k: int = 5, *, bm25_weight: float = 0.7) -> List[Hit]:
+        if not self.ids:
+            return []
+        cols = np.unique(np.fromiter((_hash(t, self.n_features) for t in terms(text)), dtype=np.int64))
+        bm25 = _column_dot(self._bm25, cols, np.ones(cols.size, dtype=np.float32))
+        cos = _column_dot(self._ngrams, *self.vectorizer.weights(text))
+
+        top_bm25 = bm25.max()
+        scores = bm25_weight * (bm25 / top_bm25 if top_bm25 > 0 else bm25) + (1 - bm25_weight) * cos
+        m = min(k, scores.shape[0])
+        idx = np.argpartition(-scores, m - 1)[:m] if m < scores.shape[0] else np.arange(scores.shape[0])
+        idx = idx[np.argsort(-scores[idx])]
+        return [Hit(self.ids[i], float(scores[i]), self.metas[i]) for i in idx if scores[i] > 0]
+
+
+_indexes: "weakref.WeakKeyDictionary[Collection, tuple[int, LexicalIndex]]" = weakref.WeakKeyDictionary()
+
+
+def for_collection(col: Collection) -> LexicalIndex:
+    """Collection의 살아 있는 기억으로 만든 LexicalIndex. 기억이 바뀐 경우에만 다시 만듭니다."""
+    cached = _indexes.get(col)
+    if cached is not None and cached[0] == col.version:
+        return cached[1]
+    version = col.version
+    ids, metas = col.docs()
+    index = LexicalIndex(ids, metas, reuse=cached[1] if cached is not None else None)
+    _indexes[col] = (version, index)
+    return index
+
+
+def fuse(dense: Sequence[Hit], lexical: Sequence[Hit], *, alpha: float = settings.RECALL_HYBRID_ALPHA) -> List[Hit]:
+    """
+    dense(cosine) / lexical 점수를 각 목록의 최고점으로 나눠 0~1로 맞춘 뒤
+    alpha * dense + (1 - alpha) * lexical 로 합칩니다. 한쪽에만 있는 기억은 다른 쪽 점수 0.
+    """
+    merged: Dict[str, List[Any]] = {}
+    for weight, hits in ((alpha, dense), (1 - alpha, lexical)):
+        top = max((h.score for h in hits), default=0.0)
+        if top <= 0:
+            continue
+        for h in hits:
+            entry = merged.setdefault(h.id, [0.0, h.meta])
+            entry[0] += weight * h.score / top
+    out = [Hit(id_, score, meta) for id_, (score, meta) in merged.items()]
+    out.sort(key=lambda h: -h.score)
+    return out
@@ -0,0 +1,194 @@
+# memory/recall.py
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from config import settings
+from common.embedding import get_embedder
+from common.logging import get_logger
+from common.metrics import metrics
+from memory import lexical
+from memory.vdb import Hit, get_vdb
+
+log = get_logger("greeni.recall")
+
+MEMORY_HEADER = "아이에 대한 기억(이전 대화에서 알게 된 내용입니다. 대화에 자연스럽게 도움이 될 때만 활용하세요):"
+
+# 오래된 기억일수록 약간 낮게 (반감기 약 30일)
+_RECENCY_WEIGHT = 0.1
+_RECENCY_DAYS = 30.0
+_KIND_WEIGHT = {"summary": 1.0, "keyword": 0.9, "emotion": 0.8}
+# lexical 점수(0~1)가 이보다 낮으면 우연히 겹친 음절로 보고 버림
+_LEXICAL_MIN_SCORE = 0.2
+
+
+@dataclass
+class Recall:
+    """
+    outcome: hit(기억 주입) / miss(관련 기억 없음) / timeout(어느 경로도 예산 안에 못 끝남) / error
+             / fallback(upstream 임베딩 실패로 로컬 벡터 -> 저장된 기억과 비교 불가) / skipped(child_id 없음, 기억 없음)
+    source: 결과를 만든 검색 경로 dense / lexical / hybrid (결과가 없으면 "")
+    message: prompt에 넣을 system 메시지(없으면 None)
+    """
+    outcome: str
+    source: str = ""
+    message: Optional[dict] = None
+    hits: List[Hit] = field(default_factory=list)
+    tokens: int = 0
+    latency_ms: int = 0
+
+
+def approx_tokens(text: str) -> int:
+    # 토크나이저 없이 보수적으로 추정: 한글 1음절(UTF-8 3바이트) ≈ 1 토큰, 영문 약 3자 = 1 토큰
+    return math.ceil(len(text.encode("utf-8")) / 3)
+
+
+def rerank(hits: List[Hit], *, now: Optional[float] = None, min_score: float = settings.RECALL_MIN_SCORE) -> List[Hit]:
+    """검색 점수에 기억 종류/최근성 가중치를 반영하고, 같은 내용은 하나만 남깁니다."""
+    now = now or time.time()
+    scored = []
+    for h in hits:
+        if h.score < min_score:
+            continue
+        age_days = max(0.0, (now - float(h.meta.get("ts", now))) / 86400)
+        score = h.score * _KIND_WEIGHT.get(h.meta.get("kind", ""), 1.0) \
+            + _RECENCY_WEIGHT * math.exp(-age_days / _RECENCY_DAYS)
+        scored.append((score, h))
+    scored.sort(key=lambda x: -x[0])
+
+    seen = set()
+    out: List[Hit] = []
+    for _, h in scored:
+        text = h.meta.get("text", "").strip()
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        out.append(h)
+    return out
+
+
+def pack(hits: List[Hit], max_tokens: int) -> tuple[Optional[dict], List[Hit], int]:
+    """토큰 예산 안에서 기억을 system 메시지 1개로 묶습니다."""
+    lines = [MEMORY_HEADER]
+    tokens = approx_tokens(MEMORY_HEADER)
+    used: List[Hit] = []
+    for h in hits:
+        line = f"- {h.meta['text'].strip()}"
+        cost = approx_tokens(line)
+        if tokens + cost > max_tokens:
+            break
+        lines.append(line)
+        tokens += cost
+        used.append(h)
+    if not used:
+        return None, [], 0
+    return {"role": "system", "content": "\n".join(lines)}, used, tokens
+
+
+async def _retrieve(child_id: str, text: str, k: int) -> Optional[List[Hit]]:
+    emb = await get_embedder().embed([text])
+    if emb.fallback[0]:
+        return None
+    return await asyncio.to_thread(get_vdb().search, child_id, emb.vectors[0], k)
+
+
+def _lexical(child_id: str, text: str, k: int) -> List[Hit]:
+    hits = lexical.for_collection(get_vdb().collection(child_id)).search(text, k)
+    return [h for h in hits if h.score >= _LEXICAL_MIN_SCORE]
+
+
+async def _search(child_id: str, text: str, k: int, mode: str, budget_ms: float) -> tuple[Optional[List[Hit]], str, str]:
+    """
+    (hits, source, dense 상태) 반환. hits=None 이면 어느 경로도 예산 안에 결과를 못 냄.
+    hybrid: lexical은 dense와 동시에 돌리고, dense가 늦거나 fallback이면 lexical 결과만 사용.
+    """
+    deadline = time.perf_counter() + budget_ms / 1000
+    lex_task = asyncio.ensure_future(asyncio.to_thread(_lexical, child_id, text, k)) if mode != "dense" else None
+
+    dense: Optional[List[Hit]] = None
+    dense_state = "off"
+    if mode != "lexical":
+        try:
+            dense = await asyncio.wait_for(_retrieve(child_id, text, k), timeout=budget_ms / 1000)
+            dense_state = "ok" if dense is not None else "fallback"
+        except asyncio.TimeoutError:
+            dense_state = "timeout"
+        if dense is not None:
+            dense = [h for h in dense if h.score >= settings.RECALL_MIN_SCORE]
+
+    lex: Optional[List[Hit]] = None
+    if lex_task is not None:
+        try:
+            lex = await asyncio.wait_for(lex_task, timeout=max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            pass
+
+    if dense is not None and lex is not None:
+        return lexical.fuse(dense, lex), "hybrid", dense_state
+    if dense is not None:
+        return dense, "dense", dense_state
+    if lex is not None:
+        return lex, "lexical", dense_state
+    return None, "", dense_state
+
+
+async def recall(
+    child_id: Optional[str],
+    text: str,
+    *,
+    feature: str,
+    session_id: Optional[str] = None,
+    budget_ms: float = settings.RECALL_BUDGET_MS,
+    k: int = settings.RECALL_TOP_K,
+    max_tokens: int = settings.RECALL_MAX_TOKENS,
+    mode: str = settings.RECALL_MODE,
+) -> Recall:
+    """
+    발화와 관련된 아이의 기억을 찾아 prompt에 넣을 system 메시지로 만듭니다.
+
+    - mode(RECALL_MODE): dense = 임베딩 -> 아이별 벡터 검색(memory/vdb.py)
+                         lexical = BM25 + 문자/자모 n-gram(memory/lexical.py), 네트워크 없음
+                         hybrid = 둘을 동시에 돌려 점수 합산(memory/lexical.fuse)
+      -> rerank -> 토큰 예산 안에서 묶기
+    - 전체가 budget_ms 안에 끝나지 않으면 기다리지 않고 기억 없이 진행(outcome=timeout).
+      hybrid에서 dense만 늦으면 lexical 결과로 진행
+    - 기본은 lexical. dense/hybrid는 발화를 매 턴 upstream으로 임베딩하므로(발화가 반복되는 일이 드물어 캐시가
+      거의 맞지 않음) 임베딩 왕복이 budget_ms 안에 드는 환경에서만 RECALL_MODE로 켭니다.
+    - 실패해도 턴은 막지 않습니다(outcome=error).
+
+    메트릭(feature별): recall_turns{outcome,source}, recall_dense{state}, recall_latency_ms,
+                      recall_prompt_tokens, recall_hits
+    """
+    t0 = time.perf_counter()
+    result = Recall(outcome="skipped")
+    dense_state = "off"
+    try:
+        if child_id and get_vdb().exists(child_id):
+            hits, source, dense_state = await _search(child_id, text, k * 2, mode, budget_ms)
+            if hits is None:
+                result = Recall(outcome="fallback" if dense_state == "fallback" else "timeout")
+            else:
+                message, used, tokens = pack(rerank(hits, min_score=0.0)[:k], max_tokens)
+                result = Recall(outcome="hit" if used else "miss", source=source,
+                                message=message, hits=used, tokens=tokens)
+    except Exception:
+        log.exception("memory_recall_failed", extra={"feature": feature, "session_id": session_id})
+        result = Recall(outcome="error")
+
+    result.latency_ms = int((time.perf_counter() - t0) * 1000)
+    metrics.incr("recall_turns", feature=feature, outcome=result.outcome, source=result.source)
+    if result.outcome != "skipped":
+        metrics.incr("recall_dense", feature=feature, state=dense_state)
+        metrics.observe("recall_latency_ms", result.latency_ms, feature=feature)
+        metrics.observe("recall_prompt_tokens", result.tokens, feature=feature)
+        metrics.observe("recall_hits", len(result.hits), feature=feature)
+    log.info("memory_recall", extra={
+        "feature": feature, "session_id": session_id, "child_id": child_id, "outcome": result.outcome,
+        "source": result.source, "dense": dense_state,
+        "hits": len(result.hits), "prompt_tokens": result.tokens, "latency_ms": result.latency_ms,
+    })
+    return result
@@ -0,0 +1,611 @@
+# memory/vdb.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from common.logging import get_logger
+from common.metrics import metrics
+from memory.ann import IVFIndex
+
+log = get_logger("greeni.vdb")
+
+_META = "meta.jsonl"
+_INDEX = "ivf.npz"
+_SEG_NAME = re.compile(r"seg-\d{6}\.npy")
+
+
+@dataclass
+class Hit:
+    id: str
+    score: float
+    meta: Dict[str, Any]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화(float32). 정규화된 벡터끼리의 내적 = cosine."""
+    x = np.asarray(vectors, dtype=np.float32)
+    if x.ndim == 1:
+        x = x[None, :]
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+def topk(scores: np.ndarray, k: int) -> np.ndarray:
+    """scores (n, q) 에서 열마다 점수 높은 k개 행 번호 (k, q), 점수 내림차순."""
+    n = scores.shape[0]
+    if k >= n:
+        idx = np.argsort(-scores, axis=0)
+    else:
+        idx = np.argpartition(-scores, k - 1, axis=0)[:k]
+        order = np.argsort(-np.take_along_axis(scores, idx, axis=0), axis=0)
+        idx = np.take_along_axis(idx, order, axis=0)
+    return idx
+
+
+class Collection:
+    """
+    아이 1명의 기억 벡터 모음.
+
+    디스크 구성 (directory/):
+      seg-000001.npy  float32 (n, dim) 정규화된 벡터. 열 때 mmap으로 붙이므로 RAM에 올리지 않음
+      meta.jsonl      {"op": "add", "seg": ..., "ids": [...], "meta": [...]} / {"op": "del", "ids": [...]}
+
+    - add는 메모리 tail에 쌓고, flush 때 tail을 새 세그먼트 1개로 쓰고 meta.jsonl에 한 줄 추가
+      (세그먼트를 먼저 쓰고 meta 줄을 커밋 기록으로 사용. meta에 없는 세그먼트는 열 때 삭제)
+    - 같은 id를 다시 add하면 이전 행은 tombstone(upsert)
+    - delete는 tombstone만 표시, 죽은 행 비율이 compact_ratio를 넘거나 세그먼트가 많아지면 compaction
+    - index가 ivf/ivfpq이고 벡터가 ann_min_vectors개 이상이면 flush 때 IVF 인덱스(memory/ann.py)를 만들고
+      이후 질의는 인덱스로 처리. 인덱스는 ivf.npz로 저장하고, 열 때 저장 이후 추가된 행만 이어서 넣음
+    - 인덱스 학습/할당은 lock 밖에서 하고 끝나면 교체하므로, 그동안 검색/추가는 기존 인덱스(없으면 전체 스캔)로 계속됨
+    - 모든 메서드는 스레드 안전(lock). 이벤트 루프에서는 asyncio.to_thread로 호출해 주세요.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        dim: int,
+        *,
+        compact_ratio: float = settings.VDB_COMPACT_RATIO,
+        max_segments: int = settings.VDB_MAX_SEGMENTS,
+        index: str = settings.VDB_INDEX,
+        ann_min_vectors: int = settings.VDB_ANN_MIN_VECTORS,
+    ) -> None:
+        if index not in ("flat", "ivf", "ivfpq"):
+            raise ValueError(f"unknown VDB_INDEX: {index}")
+        self.directory = Path(directory)
+        self.dim = dim
+        self.compact_ratio = compact_ratio
+        self.max_segments = max_segments
+        self.index_kind = index
+        self.ann_min_vectors = ann_min_vectors
+        self.index: Optional[IVFIndex] = None
+        self._index_saved = -1  # 마지막으로 저장한 index.ntotal
+        self.version = 0  # 살아 있는 문서가 바뀔 때마다 증가(파생 인덱스 캐시 무효화용)
+
+        self._segments: List[Tuple[str, np.ndarray]] = []  # (파일명, mmap 배열)
+        self._tail: List[np.ndarray] = []  # flush 전 벡터 (1, dim)
+        self._tail_ids: List[str] = []
+        self._tail_mat: Optional[np.ndarray] = None  # _tail을 합친 캐시
+
+        self._ids: List[str] = []  # 전체 행(세그먼트 순 + tail) -> id
+        self._meta: List[Dict[str, Any]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._row: Dict[str, int] = {}  # 살아 있는 id -> 행 번호
+        self._pending_del: List[str] = []
+        self._next_seg = 1
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()  # 인덱스 생성은 한 번에 하나 (lock 밖에서 진행)
+        self._epoch = 0  # compaction마다 증가(행 번호가 바뀜)
+        self._reindex: Optional[IVFIndex] = None  # compaction으로 내려놓은 인덱스(중심 재사용)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._open()
+        self._open_index()
+
+    # ========= public =========
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray, metas: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        vecs = normalize(vectors)
+        if vecs.shape != (len(ids), self.dim):
+            raise ValueError(f"vectors shape {vecs.shape} != ({len(ids)}, {self.dim})")
+        metas = list(metas) if metas is not None else [{} for _ in ids]
+
+        with self._lock:
+            start = len(self._ids)
+            self._grow(len(ids))
+            for i, (id_, meta) in enumerate(zip(ids, metas)):
+                self._tombstone(id_)
+                self._ids.append(id_)
+                self._meta.append(meta)
+                self._row[id_] = start + i
+            self._alive[start:start + len(ids)] = True
+            self._tail.append(vecs)
+            self._tail_ids.extend(ids)
+            self._tail_mat = None
+            if self.index is not None:
+                self.index.add(np.arange(start, start + len(ids)), vecs)
+            self.version += 1
+
+    def delete(self, ids: Iterable[str]) -> int:
+        removed = 0
+        with self._lock:
+            for id_ in ids:
+                if self._tombstone(id_):
+                    self._pending_del.append(id_)
+                    removed += 1
+            if removed:
+                self.version += 1
+        return removed
+
+    def docs(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """살아 있는 (ids, metas)."""
+        with self._lock:
+            rows = sorted(self._row.values())
+            return [self._ids[r] for r in rows], [self._meta[r] for r in rows]
+
+    def get(self, id_: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._row.get(id_)
+            return self._meta[row] if row is not None else None
+
+    def search(self, queries: np.ndarray, k: int = 5, *, exact: bool = False,
+               nprobe: Optional[int] = None) -> List[List[Hit]]:
+        """
+        queries (q, dim) 또는 (dim,) -> 질의마다 cosine 상위 k개.
+        인덱스가 있으면 근사 검색(nprobe로 recall/지연 조절), exact=True면 항상 전체 스캔.
+        """
+        q = normalize(queries)
+        with self._lock:
+            if self.index is not None and not exact:
+                rows, scores = self.index.search(q, k, self._alive, self._vectors_of, nprobe=nprobe)
+                metrics.incr("vdb_queries", q.shape[0], mode="ann")
+            else:
+                rows, scores = self._search_exact(q, k)
+                metrics.incr("vdb_queries", q.shape[0], mode="exact")
+
+            ids, metas = self._ids, self._meta
+            return [
+                [Hit(ids[r], float(s), metas[r]) for r, s in zip(rows[:, j], scores[:, j]) if np.isfinite(s)]
+                for j in range(q.shape[0])
+            ]
+
+    def _search_exact(self, q: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        alive = self._alive
+        cand_rows: List[np.ndarray] = []
+        cand_scores: List[np.ndarray] = []
+        for offset, mat in self._blocks():
+            n = mat.shape[0]
+            if n == 0:
+                continue
+            scores = mat @ q.T  # (n, q)
+            scores[~alive[offset:offset + n]] = -np.inf
+            idx = topk(scores, min(k, n))
+            cand_rows.append(idx + offset)
+            cand_scores.append(np.take_along_axis(scores, idx, axis=0))
+
+        if not cand_rows:
+            return np.zeros((0, q.shape[0]), np.int64), np.zeros((0, q.shape[0]), np.float32)
+
+        rows = np.concatenate(cand_rows, axis=0)
+        scores = np.concatenate(cand_scores, axis=0)
+        best = topk(scores, min(k, rows.shape[0]))
+        return np.take_along_axis(rows, best, axis=0), np.take_along_axis(scores, best, axis=0)
+
+    def flush(self) -> None:
+        """tail/삭제 기록을 디스크에 반영하고, 필요하면 compaction."""
+        with self._lock:
+            if self._tail:
+                name = self._seg_name()
+                mat = self._tail_matrix()
+                self._write_npy(self.directory / name, mat)
+                self._append_meta({
+                    "op": "add", "seg": name, "ids": self._tail_ids,
+                    "meta": self._meta[len(self._ids) - len(self._tail_ids):],
+                })
+                self._segments.append((name, np.load(self.directory / name, mmap_mode="r")))
+                self._tail, self._tail_ids, self._tail_mat = [], [], None
+            if self._pending_del:
+                self._append_meta({"op": "del", "ids": self._pending_del})
+                self._pending_del = []
+
+            total = len(self._ids)
+            dead = total - len(self._row)
+            if total and (dead / total > self.compact_ratio or len(self._segments) > self.max_segments):
+                self._compact()
+        self._maybe_build_index()
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._save_index()
+
+    def compact(self) -> None:
+        """살아 있는 행만 세그먼트 1개로 합치고 meta.jsonl을 새로 씀."""
+        with self._lock:
+            self._compact()
+        self._maybe_build_index()
+
+    def _compact(self) -> None:
+        with self._lock:
+            rows = np.flatnonzero(self._alive[:len(self._ids)])
+            parts = [mat for _, mat in self._blocks()]
+            mat = np.concatenate(parts, axis=0)[rows] if parts else np.zeros((0, self.dim), np.float32)
+            ids = [self._ids[r] for r in rows]
+            metas = [self._meta[r] for r in rows]
+
+            name = self._seg_name()
+            self._write_npy(self.directory / name, mat)
+            tmp = self.directory / (_META + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "add", "seg": name, "ids": ids, "meta": metas}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.directory / _META)
+
+            old = [seg for seg, _ in self._segments]
+            self._segments = [(name, np.load(self.directory / name, mmap_mode="r"))]
+            self._tail, self._tail_ids, self._tail_mat = [], [], None
+            self._pending_del = []
+            self._ids, self._meta = ids, metas
+            self._alive = np.ones(len(ids), dtype=bool)
+            self._row = {id_: i for i, id_ in enumerate(ids)}
+            for seg in old:
+                self._unlink(seg)
+            self._epoch += 1
+            if self.index is not None:
+                # 행 번호가 바뀌었으므로 다시 할당할 때까지(기존 중심 재사용) 전체 스캔
+                self._reindex, self.index = self.index, None
+        metrics.incr("vdb_compactions")
+
+    # ========= ANN index =========
+
+    def _base(self) -> str:
+        return self._segments[0][0] if self._segments else ""
+
+    def _new_index(self) -> IVFIndex:
+        return IVFIndex(
+            self.dim,
+            nlist=settings.VDB_IVF_NLIST,
+            nprobe=settings.VDB_IVF_NPROBE,
+            pq_m=settings.VDB_PQ_M if self.index_kind == "ivfpq" else 0,
+            rerank=settings.VDB_PQ_RERANK,
+        )
+
+    def _maybe_build_index(self) -> None:
+        if self.index_kind == "flat":
+            return
+        with self._lock:
+            if self._reindex is not None:
+                retrain = False
+            elif self.index is None:
+                if len(self._row) < self.ann_min_vectors:
+                    return
+                retrain = True
+            elif self.index.ntotal > 4 * self.index.trained_on:
+                # 학습 때보다 많이 커지면 리스트가 불균형해지므로 재학습
+                retrain = True
+            else:
+                return
+        self._build_index(retrain=retrain)
+
+    def _build_index(self, *, retrain: bool) -> None:
+        """
+        lock 안에서는 행 스냅샷(세그먼트 mmap + tail 행렬)만 잡고, 학습/할당은 lock 밖에서 한 뒤
+        다시 lock을 잡아 그 사이 추가된 행을 이어 넣고 교체합니다. 그 사이 compaction이 끼면 처음부터.
+        이미 다른 스레드가 만드는 중이면 건너뜀(다음 flush에서 다시 판단).
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            for _ in range(3):
+                if self._build_once(retrain=retrain):
+                    return
+            log.warning("vdb_index_build_skipped", extra={"collection": self.directory.name})
+        finally:
+            self._build_lock.release()
+
+    def _build_once(self, *, retrain: bool) -> bool:
+        t0 = time.perf_counter()
+        with self._lock:
+            epoch, n = self._epoch, len(self._ids)
+            blocks = self._blocks()
+            prev = self.index or self._reindex
+            alive = np.flatnonzero(self._alive[:n])
+
+        sample = None
+        if retrain or prev is None:
+            index = self._new_index()
+            # train이 실제로 쓰는 만큼만 읽음(중심당 32개)
+            sample = np.random.default_rng(0).choice(alive, index.train_size(alive.shape[0]), replace=False)
+            index.train(self._vectors_of(np.sort(sample), blocks), ntotal=alive.shape[0])
+        else:
+            index = prev.empty_like()
+        for offset, mat in blocks:
+            for s in range(0, mat.shape[0], 65536):
+                chunk = np.asarray(mat[s:s + 65536])
+                index.add(np.arange(offset + s, offset + s + chunk.shape[0]), chunk)
+
+        with self._lock:
+            if self._epoch != epoch:
+                return False
+            if len(self._ids) > n:
+                rows = np.arange(n, len(self._ids))
+                index.add(rows, self._vectors_of(rows))
+            index.base = self._base()
+            self.index, self._reindex = index, None
+            self._save_index()
+        metrics.incr("vdb_index_builds", kind=self.index_kind)
+        log.info("vdb_index_built", extra={
+            "collection": self.directory.name, "vectors": index.ntotal, "trained": retrain or prev is None,
+            "sample": 0 if sample is None else sample.shape[0], "nlist": len(index.lists),
+            "ms": round((time.perf_counter() - t0) * 1000, 1),
+        })
+        return True
+
+    def _save_index(self) -> None:
+        if self.index is not None and self.index.ntotal != self._index_saved:
+            self.index.save(self.directory / _INDEX)
+            self._index_saved = self.index.ntotal
+
+    def _open_index(self) -> None:
+        path = self.directory / _INDEX
+        if self.index_kind == "flat" or not path.exists():
+            return
+        try:
+            index = IVFIndex.load(path, nprobe=settings.VDB_IVF_NPROBE, rerank=settings.VDB_PQ_RERANK)
+        except Exception:
+            log.exception("vdb_index_load_failed", extra={"collection": self.directory.name})
+            index = None
+        want_pq = settings.VDB_PQ_M if self.index_kind == "ivfpq" else 0
+        if index is None or index.base != self._base() or index.ntotal > len(self._ids) \
+                or index.dim != self.dim or index.pq_m != want_pq:
+            # compaction 이후/설정 변경 등으로 맞지 않으면 새로 생성
+            self._unlink(_INDEX)
+            self._maybe_build_index()
+            return
+        self._index_saved = index.ntotal
+        if index.ntotal < len(self._ids):
+            # 인덱스 저장 이후 flush된 행 이어 넣기
+            rows = np.arange(index.ntotal, len(self._ids))
+            index.add(rows, self._vectors_of(rows))
+        self.index = index
+
+    def _vectors_of(self, rows: np.ndarray, blocks: Optional[List[Tuple[int, np.ndarray]]] = None) -> np.ndarray:
+        """전체 행 번호 -> 벡터 (len(rows), dim). blocks: lock 밖에서 읽을 때 미리 잡아 둔 _blocks()."""
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.empty((rows.shape[0], self.dim), dtype=np.float32)
+        for offset, mat in blocks if blocks is not None else self._blocks():
+            sel = (rows >= offset) & (rows < offset + mat.shape[0])
+            if sel.any():
+                out[sel] = mat[rows[sel] - offset]
+        return out
+
+    # ========= internal =========
+
+    def _blocks(self) -> List[Tuple[int, np.ndarray]]:
+        """(시작 행, 행렬) 목록: 세그먼트들 + tail."""
+        out: List[Tuple[int, np.ndarray]] = []
+        offset = 0
+        for _, mat in self._segments:
+            out.append((offset, mat))
+            offset += mat.shape[0]
+        if self._tail:
+            out.append((offset, self._tail_matrix()))
+        return out
+
+    def _tail_matrix(self) -> np.ndarray:
+        if self._tail_mat is None:
+            self._tail_mat = np.concatenate(self._tail, axis=0)
+            self._tail = [self._tail_mat]
+        return self._tail_mat
+
+    def _grow(self, n: int) -> None:
+        need = len(self._ids) + n
+        if need > self._alive.shape[0]:
+            alive = np.zeros(max(need, 2 * self._alive.shape[0], 64), dtype=bool)
+            alive[:self._alive.shape[0]] = self._alive
+            self._alive = alive
+
+    def _tombstone(self, id_: str) -> bool:
+        row = self._row.pop(id_, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        return True
+
+    def _seg_name(self) -> str:
+        name = f"seg-{self._next_seg:06d}.npy"
+        self._next_seg += 1
+        return name
+
+    @staticmethod
+    def _write_npy(path: Path, mat: np.ndarray) -> None:
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(mat, dtype=np.float32))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _append_meta(self, record: Dict[str, Any]) -> None:
+        with open(self.directory / _META, "ab") as f:
+            size = f.tell()
+            try:
+                f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                # 반쯤 쓴 줄 뒤에 다음 기록이 붙지 않도록 되돌림
+                f.truncate(size)
+                raise
+
+    def _unlink(self, name: str) -> None:
+        try:
+            (self.directory / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _open(self) -> None:
+        """
+        meta.jsonl 재생. 세그먼트는 mmap으로만 붙입니다.
+        크래시로 잘린 마지막 줄은 다음 기록이 그 뒤에 붙지 않도록 먼저 잘라내고, 깨진 줄은 건너뛰고 계속 재생합니다.
+        """
+        meta_path = self.directory / _META
+        known = set()
+        if meta_path.exists():
+            with open(meta_path, "rb+") as f:
+                data = f.read()
+                end = data.rfind(b"\n") + 1
+                if end < len(data):
+                    f.truncate(end)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    log.warning("vdb_meta_partial_line_truncated", extra={
+                        "collection": self.directory.name, "bytes": len(data) - end,
+                    })
+            for line in data[:end].decode("utf-8", errors="replace").split("\n"):
+                if not line.strip():
+                    continue
+                rec = self._parse_meta(line)
+                if rec is None:
+                    # 읽을 수 없는 줄이 가리키는 세그먼트는 커밋됐을 수 있으므로 지우지 않음
+                    known.update(_SEG_NAME.findall(line))
+                    metrics.incr("vdb_meta_bad_lines")
+                    log.warning("vdb_meta_bad_line", extra={"collection": self.directory.name})
+                    continue
+                if rec["op"] == "add":
+                    mat = np.load(self.directory / rec["seg"], mmap_mode="r")
+                    known.add(rec["seg"])
+                    self._segments.append((rec["seg"], mat))
+                    start = len(self._ids)
+                    self._grow(len(rec["ids"]))
+                    for i, id_ in enumerate(rec["ids"]):
+                        self._tombstone(id_)
+                        self._row[id_] = start + i
+                    self._ids.extend(rec["ids"])
+                    self._meta.extend(rec["meta"])
+                    self._alive[start:start + len(rec["ids"])] = True
+                elif rec["op"] == "del":
+                    for id_ in rec["ids"]:
+                        self._tombstone(id_)
+
+        for p in self.directory.glob("seg-*"):
+            try:
+                self._next_seg = max(self._next_seg, int(p.name[4:10]) + 1)
+            except ValueError:
+                pass
+            if p.name not in known:
+                # compaction/flush 도중 끊겨 커밋되지 않은 세그먼트
+                p.unlink()
+
+    @staticmethod
+    def _parse_meta(line: str) -> Optional[Dict[str, Any]]:
+        """
+        meta.jsonl 한 줄 -> 기록. 이전 크래시의 잘린 줄 뒤에 온전한 기록이 이어 붙은 줄이면
+        그 기록을 꺼냅니다. 읽을 수 없으면 None.
+        """
+        start = 0
+        while start >= 0:
+            try:
+                rec = json.loads(line[start:])
+                if isinstance(rec, dict) and rec.get("op") in ("add", "del"):
+                    return rec
+            except ValueError:
+                pass
+            start = line.find('{"op"', start + 1)
+        return None
+
+
+class VectorDB:
+    """
+    아이(child_id)별 Collection 모음. 컬렉션은 처음 접근할 때 엽니다.
+
+      vdb = get_vdb()
+      vdb.add(child_id, ["diary:123"], vecs, [{"kind": "summary", "text": "..."}])
+      vdb.search(child_id, query_vec, k=5)
+    """
+
+    def __init__(self, directory: Path, dim: int) -> None:
+        self.directory = Path(directory)
+        self.dim = dim
+        self._collections: Dict[str, Collection] = {}
+        self._lock = threading.Lock()
+
+        metrics.register_gauge("vdb_collections", lambda: len(self._collections))
+        metrics.register_gauge("vdb_vectors", lambda: sum(len(c) for c in list(self._collections.values())))
+
+    def _path(self, child_id: str) -> Path:
+        return self.directory / hashlib.sha1(str(child_id).encode("utf-8")).hexdigest()
+
+    def exists(self, child_id: str) -> bool:
+        """저장된 기억이 있는지(없는 아이에 대해 디렉토리를 만들지 않고 확인)."""
+        return child_id in self._collections or (self._path(child_id) / _META).exists()
+
+    def collection(self, child_id: str) -> Collection:
+        with self._lock:
+            col = self._collections.get(child_id)
+            if col is None:
+                col = self._collections[child_id] = Collection(self._path(child_id), self.dim)
+            return col
+
+    def add(self, child_id: str, ids: Sequence[str], vectors: np.ndarray,
+            metas: Optional[Sequence[Dict[str, Any]]] = None, *, flush: bool = True) -> None:
+        col = self.collection(child_id)
+        col.add(ids, vectors, metas)
+        if flush:
+            col.flush()
+
+    def delete(self, child_id: str, ids: Iterable[str], *, flush: bool = True) -> int:
+        col = self.collection(child_id)
+        removed = col.delete(ids)
+        if flush:
+            col.flush()
+        return removed
+
+    def search(self, child_id: str, query: np.ndarray, k: int = 5) -> List[Hit]:
+        return self.collection(child_id).search(query, k)[0]
+
+    def flush(self) -> None:
+        for col in list(self._collections.values()):
+            try:
+                col.flush()
+            except Exception:
+                log.exception("vdb_flush_failed", extra={"collection": str(col.directory)})
+
+    def close(self) -> None:
+        """종료 시 tail flush + ANN 인덱스 저장."""
+        for col in list(self._collections.values()):
+            try:
+                col.close()
+            except Exception:
+                log.exception("vdb_close_failed", extra={"collection": str(col.directory)})
+
+
+_vdb: Optional[VectorDB] = None
+
+
+def get_vdb() -> VectorDB:
+    global _vdb
+    if _vdb is None:
+        _vdb = VectorDB(settings.VDB_DIR, settings.VDB_DIM)
+    return _vdb
+
+
+def close_vdb() -> None:
+    if _vdb is not None:
+        _vdb.close()
@@ -3,7 +3,8 @@
 from fastapi import APIRouter
 from schemas.diary import DiaryChatRequest
 from schemas.roleplay import RoleplayRequest, RoleplayEndRequest
-from services.roleplay_service import reply, end_reply
+from services.roleplay_service import reply, reply_stream, end_reply
+from common.sse import sse_response
 
 router = APIRouter()
 
@@ -11,6 +12,11 @@ router = APIRouter()
 async def roleplay(req: RoleplayRequest):
     return await reply(req)
 
+@router.post("/roleplay/stream")
+async def roleplay_stream(req: RoleplayRequest):
+    # text/event-stream: delta* -> done | error
+    return sse_response(await reply_stream(req))
+
 @router.post("/roleplay/close")
 async def end_roleplay(req: RoleplayEndRequest):
     return await end_reply(req)
@@ -11,6 +11,7 @@ from schemas.diary import (
     DiarySummarizeResponse,
 )
 from services import diary_service
+from common.sse import sse_response
 
 router = APIRouter()
 
@@ -20,6 +21,12 @@ async def diary_chat(req: DiaryChatRequest):
     return await diary_service.chat(req)
 
 
+@router.post("/chat/stream")
+async def diary_chat_stream(req: DiaryChatRequest):
+    # text/event-stream: delta* -> done | error
+    return sse_response(await diary_service.chat_stream(req))
+
+
 @router.post("/end", response_model=DiarySessionEndResponse)
 async def diary_end(req: DiarySessionEndRequest):
     return await diary_service.end_session(req)
@@ -1,25 +1,121 @@
 # routers/stt.py
 
-from typing import Optional
-from fastapi import APIRouter, UploadFile, File, Form
-from schemas.stt import STTResponse
-from services import stt_service
+import asyncio
+from typing import Awaitable, Optional, TypeVar
+from fastapi import APIRouter, Request
+from starlette.datastructures import FormData, UploadFile
+from config import settings
+from schemas.stt import STTArchiveResponse, STTResponse
+from services import stt_archive, stt_service
+from common.errors import AppError, not_found
+from common.logging import get_logger
+from common.upload import parse_multipart
 
 router = APIRouter()
+log = get_logger("greeni.stt")
 
-@router.post("/transcribe", response_model=STTResponse)
-async def transcribe(
-    voice: UploadFile = File(...),
-    purpose: str = Form(...),
-    store_audio: bool = Form(False),
-    session_id: Optional[str] = Form(None)
-):
-    audio_bytes = await voice.read()
-
-    return await stt_service.transcribe_file(
-        audio_bytes=audio_bytes,
+T = TypeVar("T")
+
+# 클라이언트 연결 끊김 확인 주기
+DISCONNECT_POLL_SEC = 0.5
+
+
+async def _cancel_on_disconnect(request: Request, work: Awaitable[T]) -> T:
+    """
+    클라이언트가 연결을 끊으면 작업을 취소합니다.
+    (같은 녹음을 기다리는 다른 요청이 없으면 STT_ABANDON_GRACE_SEC 뒤에 서비스 계층 작업도 취소되어
+     ffmpeg 프로세스 종료 / 전사 요청 중단. grace 안에 재시도가 오면 진행 중인 작업에 합류)
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SEC)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                log.info("stt_client_disconnected", extra={"path": request.url.path})
+                task.cancel()
+                raise asyncio.CancelledError()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+# request.form() 대신 직접 파싱하므로 OpenAPI 문서에 폼 스키마를 따로 적어 줌
+_TRANSCRIBE_FORM = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["voice", "purpose"],
+            "properties": {
+                "voice": {"type": "string", "format": "binary"},
+                "purpose": {"type": "string"},
+                "store_audio": {"type": "boolean", "default": False},
+                "session_id": {"type": "string"},
+            },
+        }}},
+    },
+}
+
+_TRUE = {"true", "1", "yes", "on"}
+_FALSE = {"false", "0", "no", "off", ""}
+
+
+def _form_str(form: FormData, name: str, *, required: bool = False) -> Optional[str]:
+    value = form.get(name)
+    if isinstance(value, UploadFile):
+        raise AppError(message=f"'{name}' must be a text field", code="validation_error", status_code=422)
+    if required and not value:
+        raise AppError(message=f"'{name}' is required", code="validation_error", status_code=422)
+    return value
+
+
+def _form_bool(form: FormData, name: str) -> bool:
+    value = (_form_str(form, name) or "").lower()
+    if value not in _TRUE | _FALSE:
+        raise AppError(message=f"'{name}' must be a boolean", code="validation_error", status_code=422)
+    return value in _TRUE
+
+
+@router.post("/transcribe", response_model=STTResponse, openapi_extra=_TRANSCRIBE_FORM)
+async def transcribe(request: Request):
+    # 업로드를 받는 동안 크기를 검사하고(넘으면 바로 413) 파일은 청크 단위로 spool에 기록
+    form = await parse_multipart(
+        request,
+        max_bytes=settings.STT_UPLOAD_MAX_BYTES,
+        spool_bytes=settings.STT_UPLOAD_SPOOL_BYTES,
+    )
+    try:
+        voice = form.get("voice")
+        if not isinstance(voice, UploadFile):
+            raise AppError(message="'voice' file is required", code="validation_error", status_code=422)
+        purpose = _form_str(form, "purpose", required=True)
+        store_audio = _form_bool(form, "store_audio")
+        session_id = _form_str(form, "session_id") or None
+    except AppError:
+        await form.close()
+        raise
+
+    # 여기부터 업로드 파일은 서비스가 닫음 (연결이 끊겨도 grace 동안은 재시도 합류를 위해 전사가 계속됨)
+    return await _cancel_on_disconnect(request, stt_service.transcribe_file(
+        upload=voice,
         filename=voice.filename,
         purpose=purpose,
         store_audio=store_audio,
-        session_id=session_id
+        session_id=session_id,
+    ))
+
+
+@router.get("/archive/{session_id}", response_model=STTArchiveResponse)
+async def archive(session_id: str):
+    # store_audio=true로 보낸 녹음의 보관 URL (백그라운드 업로드라 pending이 0이 될 때까지 늘어남)
+    state = stt_archive.get_session_archive(session_id)
+    if state is None:
+        raise not_found("no archived audio for this session", code="stt_archive_not_found")
+    return STTArchiveResponse(
+        session_id=session_id,
+        audio_urls=list(state.audio_urls),
+        pending=state.pending,
+        failed=state.failed,
     )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field, conint, confloat
+from typing import Optional
 from typing_extensions import Literal
 
 
@@ -22,6 +23,7 @@ EmotionLabel = Literal[
 class DiaryChatRequest(BaseModel):
     session_id: str = Field(..., description="Diary session id (from frontend)")
     user_text: str = Field(..., min_length=1, description="Child utterance text")
+    child_id: Optional[str] = Field(None, description="Child id for memory recall (optional)")
 
 class DiaryChatResponse(BaseModel):
     session_id: str
@@ -50,6 +52,7 @@ class DiaryEmotion(BaseModel):
 
 class DiarySummarizeRequest(BaseModel):
     session_id: str
+    child_id: Optional[str] = Field(None, description="Child id; summary is saved to the child's memory when set")
 
 class DiarySummarizeResponse(BaseModel):
     session_id: str
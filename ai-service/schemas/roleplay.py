@@ -9,6 +9,7 @@ class RoleplayRequest(BaseModel):
     session_id: str = Field(..., description="Session Identifier")
     role: RoleType = Field(..., description='"shop"|"teacher"|"friend"')
     user_text: str = Field(..., min_length=1)
+    child_id: Optional[str] = Field(None, description="Child id for memory recall (optional)")
     temperature: float = 0.7
     top_p: float = 1.0
     max_tokens: int = 256
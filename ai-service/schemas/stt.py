@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from pydantic import BaseModel, Field
 
 
@@ -34,5 +34,16 @@ class STTResponse(BaseModel):
     )
     audio_url: Optional[str] = Field(
         None, 
-        description="Stored audio URL (optional)"
+        description="Stored audio URL (optional). store_audio is archived in the background; "
+                    "fetch the URL with GET /stt/archive/{session_id}"
     )
+
+
+class STTArchiveResponse(BaseModel):
+    session_id: str
+    audio_urls: List[str] = Field(
+        default_factory=list,
+        description="Archived audio URLs for the session, in upload order",
+    )
+    pending: int = Field(0, description="Recordings still being uploaded")
+    failed: int = Field(0, description="Recordings that could not be archived after retries")
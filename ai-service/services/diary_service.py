@@ -1,10 +1,11 @@
 # services/diary_service.py
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any
 
-from langchain_classic.memory import ConversationBufferMemory
+from fastapi import HTTPException
 
 from schemas.diary import (
     DiaryChatRequest,
@@ -15,31 +16,30 @@ from schemas.diary import (
     DiarySummarizeResponse,
     DiaryEmotion,
 )
-from common.llm import chat_text
+from common.llm import chat_text_async, stream_text_async
+from common.sse import READY, sse_event, start_stream
 from common.errors import AppError
+from common.session_backend import create_backend
+from common.session_actor import SessionActors
+from memory.recall import recall
+from memory.indexer import enqueue_diary_summary
 
-_memory_storage: Dict[str, ConversationBufferMemory] = {}
+# 세션별 턴 히스토리 (SESSION_BACKEND: memory/sqlite/redis)
+_sessions = create_backend("diary")
 
-
-def _get_memory(session_id: str) -> ConversationBufferMemory:
-    if session_id not in _memory_storage:
-        _memory_storage[session_id] = ConversationBufferMemory(
-            return_messages=True,
-            memory_key="chat_history",
-        )
-    return _memory_storage[session_id]
+# 같은 세션의 턴은 하나씩 처리 (더블탭/재시도로 턴 수가 꼬이지 않도록)
+_actors = SessionActors("diary")
 
 
-def _turn_count(memory: ConversationBufferMemory) -> int:
-    return len(memory.chat_memory.messages) // 2
+def _turn_count(history_messages: list[dict[str, str]]) -> int:
+    return len(history_messages) // 2
 
 
-def _serialize_history(memory: ConversationBufferMemory) -> str:
-    history_messages = memory.load_memory_variables({})["chat_history"]
+def _serialize_history(history_messages: list[dict[str, str]]) -> str:
     lines = []
     for msg in history_messages:
-        speaker = "아이" if msg.type == "human" else "그리니"
-        lines.append(f"{speaker}: {msg.content}")
+        speaker = "아이" if msg["role"] == "user" else "그리니"
+        lines.append(f"{speaker}: {msg['content']}")
     return "\n".join(lines).strip()
 
 
@@ -80,67 +80,53 @@ CLOSING_PROMPT = (
     "2~3문장으로 부드럽게 마무리하세요."
 )
 
-def generate_prompt(turn: int):
-    system_prompt=f"""
-    "당신은 5~10세 어린이를 위한 일기 대화 도우미입니다. "
-    "따뜻하고 짧으며, 쉬운 단어를 사용하여 대답합니다 ."
-    "오늘 하루 있었던 일을 아이가 자연스럽게 말할 수 있도록 질문 위주의 대화로 이끌어주어야 합니다 ."
-    "아이의 말을 존중하고, 판단하거나 훈계하지 않습니다. "
-    "아이가 폭력, 혐오, 차별, 성적, 불법과 관련된 표현을 사용하면, 아이를 혼내거나 지적하지 말고 표현을 부드럽게 바꿔 말해 준 뒤 안전한 주제로 자연스럽게 대화를 이어나가야 합니다 ."
-    "항상 반말을 사용합니다. "
-    "한 번에 2~3문장으로 짧게 대답합니다. "
-    "질문은 최대 1개만 합니다. "
-    "아이의 감정을 대신 단정하지 말고, 스스로 표현하도록 돕습니다."
-    "아이의 말에 공감과 긍정적인 반응을 해주어야 합니다 ."
-    "당신에 대한 질문에는 최소한으로 답하고, 항상 아이의 경험과 생각을 더 듣는 방향으로 대화를 이어가야 합니다 ."
-    "대화는 총 10번의 질문과 10번의 아이의 응답으로 진행됩니다 ."
-    "마지막에는 아이를 칭찬하며 자연스럽게 대화를 마무리 해야 합니다 ."
-    현재 턴 수: {turn}
+def generate_prompt(turn: int) -> str:
     """
-    return system_prompt
-
-
-async def chat(req: DiaryChatRequest) -> DiaryChatResponse:
-    memory = _get_memory(req.session_id)
-    history_messages = memory.load_memory_variables({})["chat_history"]
+    턴에 따라 달라지는 지시문.
+    - prompt caching이 앞부분(고정 system + 지난 히스토리)을 재사용할 수 있도록
+      이 부분은 항상 메시지 맨 끝(이번 사용자 입력 직전)에 붙입니다.
+    """
+    prompt = f"현재 턴 수: {turn}"
+    # 이번 응답이 10번째가 되도록 마무리 유도
+    if turn >= 9:
+        prompt += "\n" + CLOSING_PROMPT
+    return prompt
+
+
+async def _build_messages(req: DiaryChatRequest) -> list[dict[str, str]]:
+    # 히스토리 + 아이 기억 검색을 동시에 (기억 검색은 RECALL_BUDGET_MS 안에 못 끝나면 생략)
+    history_messages, memory = await asyncio.gather(
+        _sessions.load(req.session_id),
+        recall(req.child_id, req.user_text, feature="diary", session_id=req.session_id),
+    )
 
     # 현재 턴 수 계산 (assistant 응답 기준)
-    tc = _turn_count(memory)
-    system_prompt = generate_prompt(tc)
-
-    # 이번 응답이 10번째가 되도록 마무리 유도 여부 판단
-    is_closing_turn = tc >= 9
+    tc = _turn_count(history_messages)
 
+    # 고정 system prompt를 맨 앞에 두어 턴마다 byte 단위로 동일하게 유지
     messages: list[dict[str, str]] = [
-        {"role": "system", "content": system_prompt}
+        {"role": "system", "content": DIARY_SYSTEM_PROMPT}
     ]
 
-    # 10턴 도달 직전이면 마무리 프롬프트 추가
-    if is_closing_turn:
-        messages.append(
-            {"role": "system", "content": CLOSING_PROMPT}
-        )
-
     # 기존 대화 히스토리 반영
-    for msg in history_messages:
-        role = "user" if msg.type == "human" else "assistant"
-        messages.append({"role": role, "content": msg.content})
+    messages.extend(history_messages)
+
+    # 기억(RAG)은 고정 prefix 뒤에 추가
+    if memory.message is not None:
+        messages.append(memory.message)
+
+    # 턴 수/마무리 지시는 맨 끝에 추가
+    messages.append({"role": "system", "content": generate_prompt(tc)})
 
     # 이번 사용자 입력 추가
     messages.append({"role": "user", "content": req.user_text})
 
-    # LLM 호출
-    reply = chat_text(
-        messages=messages,
-        feature="diary_chat",
-        session_id=req.session_id,
-    )
+    return messages
 
-    # 메모리 저장
-    memory.save_context({"input": req.user_text}, {"output": reply})
 
-    # 저장 후 턴 수 재계산
-    tc = _turn_count(memory)
+async def _commit_turn(req: DiaryChatRequest, reply: str) -> DiaryChatResponse:
+    # 히스토리 저장 (user/assistant 한 쌍을 원자적으로 추가) 후 턴 수 재계산
+    tc = await _sessions.append_turn(req.session_id, req.user_text, reply)
 
     # 10턴 도달 시 대화 종료 상태 반환 (memory는 유지)
     if tc >= 10:
@@ -160,16 +146,76 @@ async def chat(req: DiaryChatRequest) -> DiaryChatResponse:
     )
 
 
+async def chat(req: DiaryChatRequest) -> DiaryChatResponse:
+    return await _actors.run(req.session_id, req.user_text, lambda: _chat_turn(req))
+
+
+async def _chat_turn(req: DiaryChatRequest) -> DiaryChatResponse:
+    messages = await _build_messages(req)
+
+    # LLM 호출
+    reply = await chat_text_async(
+        messages=messages,
+        feature="diary_chat",
+        session_id=req.session_id,
+    )
+
+    return await _commit_turn(req, reply)
+
+
+async def chat_stream(req: DiaryChatRequest) -> AsyncIterator[str]:
+    """
+    chat의 SSE 스트리밍 버전.
+    - "delta" 이벤트로 토큰을 전달하고, 끝나면 "done" 이벤트로 DiaryChatResponse를 보냅니다.
+    - 스트림이 정상 종료된 경우에만 memory에 저장합니다.
+    - 세션 lock은 스트림이 끝나거나 닫힐 때까지 유지합니다(한 번도 읽지 않고 버려져도 풀림).
+    """
+    async def events() -> AsyncIterator[str]:
+        # lock과 upstream 스트림은 generator 안에서만 잡음 (generator가 닫히면 항상 풀림)
+        async with _actors.turn(req.session_id):
+            messages = await _build_messages(req)
+
+            deltas = await stream_text_async(
+                messages=messages,
+                feature="diary_chat_stream",
+                session_id=req.session_id,
+            )
+            yield READY
+
+            parts: list[str] = []
+            try:
+                async for delta in deltas:
+                    parts.append(delta)
+                    yield sse_event({"delta": delta}, event="delta")
+            except HTTPException as e:
+                yield sse_event({"error": str(e.detail), "code": "llm_upstream_error"}, event="error")
+                return
+
+            reply = "".join(parts).strip()
+            if not reply:
+                yield sse_event({"error": "llm_bad_response", "code": "llm_bad_response"}, event="error")
+                return
+
+            resp = await _commit_turn(req, reply)
+            yield sse_event(resp.model_dump(), event="done")
+
+    return await start_stream(events())
+
+
 
 async def end_session(req: DiarySessionEndRequest) -> DiarySessionEndResponse:
+    # 진행 중인 턴이 저장된 뒤에 종료
+    async with _actors.lock(req.session_id):
+        return await _end_session(req)
+
+
+async def _end_session(req: DiarySessionEndRequest) -> DiarySessionEndResponse:
     # 일기쓰기 자체를 종료 -> memory 삭제
     # 대화를 종료하고 일기 summary로 넘어감 -> memory 삭제 x
-    memory = _get_memory(req.session_id)
-    turn_count = _turn_count(memory)
+    turn_count = await _sessions.turn_count(req.session_id)
 
     if req.status != "completed":
-        memory.clear()
-        del _memory_storage[req.session_id]
+        await _sessions.delete(req.session_id)
 
         return DiarySessionEndResponse(
             session_id=req.session_id,
@@ -185,16 +231,22 @@ async def end_session(req: DiarySessionEndRequest) -> DiarySessionEndResponse:
 
 
 async def summarize(req: DiarySummarizeRequest) -> DiarySummarizeResponse:
-    memory = _memory_storage.get(req.session_id)
-    if not memory:
+    # 진행 중인 턴이 저장된 뒤의 히스토리로 요약
+    async with _actors.lock(req.session_id):
+        return await _summarize(req)
+
+
+async def _summarize(req: DiarySummarizeRequest) -> DiarySummarizeResponse:
+    history_messages = await _sessions.load(req.session_id)
+    if not history_messages:
         raise AppError(
             message="해당 일기 세션을 찾을 수 없습니다.",
             code="diary_session_not_found",
             status_code=404,
         )
 
-    diary_text = _serialize_history(memory)
-    tc = _turn_count(memory)
+    diary_text = _serialize_history(history_messages)
+    tc = _turn_count(history_messages)
 
     user_prompt = {
         "dialogue": diary_text,
@@ -214,7 +266,7 @@ async def summarize(req: DiarySummarizeRequest) -> DiarySummarizeResponse:
         ],
     }
 
-    result = chat_text(
+    result = await chat_text_async(
         messages=[
             {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
             {"role": "user", "content": json.dumps(user_prompt, ensure_ascii=False)},
@@ -248,9 +300,12 @@ async def summarize(req: DiarySummarizeRequest) -> DiarySummarizeResponse:
 
     keyword = str(parsed.get("keyword", "")).strip() or "일상"
 
-    # 현재는 기존처럼 세션 종료 후 메모리 삭제(원하시면 여기 대신 Vector DB 저장으로 교체)
-    memory.clear()
-    del _memory_storage[req.session_id]
+    # 요약/키워드/감정은 아이별 기억으로 저장 (임베딩/색인은 백그라운드 큐에서, 응답은 바로 반환)
+    if req.child_id:
+        enqueue_diary_summary(req.child_id, req.session_id, summary=summary, keyword=keyword, emotion=primary)
+
+    # 대화 히스토리는 요약 후 삭제
+    await _sessions.delete(req.session_id)
   
     return DiarySummarizeResponse(
         session_id=req.session_id,
@@ -1,13 +1,69 @@
 # game_service.py
 
 import json
-from openai import OpenAI
-from config import settings
+import random
 from typing import Dict, List
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from config import settings
+from common.cache import DiskCache, TieredCache, TTLCache, content_key
+from common.llm import chat_text_async
+from common.singleflight import SingleFlight
+
+# 프롬프트/모델을 바꾸면 버전을 올려 이전 캐시를 자연스럽게 무효화합니다.
+FIVEQ_PROMPT_VERSION = "v1"
+FIVEQ_MODEL = "gpt-4o-mini"
+
+# 정답별 힌트 캐시: (answer, prompt version, model) -> [hints, hints, ...]
+_hint_cache = TieredCache(
+    "fiveq_hint",
+    memory=TTLCache(
+        max_entries=settings.HINT_CACHE_MAX_ENTRIES,
+        ttl_sec=settings.HINT_CACHE_TTL_SEC,
+    ),
+    disk=DiskCache(
+        settings.HINT_CACHE_DIR,
+        max_entries=settings.HINT_CACHE_DISK_MAX_ENTRIES,
+        max_bytes=settings.HINT_CACHE_DISK_MAX_BYTES,
+        ttl_sec=settings.HINT_CACHE_TTL_SEC,
+    ),
+)
+
+# 같은 정답으로 동시에 시작된 게임은 LLM 호출 1번을 공유
+_hint_flight = SingleFlight("fiveq_hint")
+
+
+def _is_valid_hints(hints) -> bool:
+    return isinstance(hints, list) and len(hints) == 5 and all(isinstance(h, str) for h in hints)
+
+
+async def generate_fiveq(answer: str):
+    """
+    다섯고개 힌트 생성(캐시 우선).
+    - 정답별로 힌트 세트를 최대 HINT_CACHE_VARIANTS개까지 모은 뒤에는 그중 하나를 골라 반환합니다.
+      (1이면 항상 같은 힌트, 2 이상이면 게임마다 힌트가 조금씩 달라짐)
+    """
+    key = content_key(answer.strip(), FIVEQ_PROMPT_VERSION, FIVEQ_MODEL)
+    variants: List[List[str]] = await _hint_cache.get(key) or []
+
+    if len(variants) >= settings.HINT_CACHE_VARIANTS:
+        return {"hints": random.choice(variants)}
+
+    hints = await _hint_flight.do(key, lambda: _generate_and_store(key, answer, variants))
+    return {"hints": hints}
+
 
-def generate_fiveq(answer: str):
+async def _generate_and_store(key: str, answer: str, variants: List[List[str]]) -> List[str]:
+    # single-flight 안에서 캐시까지 갱신해야 합쳐진 요청들이 같은 힌트를 중복 저장하지 않음
+    hints = await _generate_hints(answer)
+
+    if _is_valid_hints(hints):
+        variants = (variants + [hints])[-settings.HINT_CACHE_VARIANTS:]
+        await _hint_cache.put(key, variants)
+
+    return hints
+
+
+async def _generate_hints(answer: str) -> List[str]:
     system_prompt = f"""
 당신은 어린이를 위한 다섯고개 퀴즈 문제를 만듭니다. 
 규칙: 
@@ -29,21 +85,21 @@ def generate_fiveq(answer: str):
 출력은 JSON 배열만 반환하세요. 
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    raw = await chat_text_async(
+        model=FIVEQ_MODEL,
         temperature=1,
         messages=[
             {"role":"system", "content":system_prompt},
             {"role":"user", "content":user_prompt},
-        ]
+        ],
+        feature="fiveq_hint",
     )
 
-    raw = response.choices[0].message.content
     hints: List[str] = json.loads(raw)
 
-    return {"hints": hints}
+    return hints
 
-def check_fiveq(utterance: str, answer: str) -> Dict:
+async def check_fiveq(utterance: str, answer: str) -> Dict:
 
     prompt = f"""
 아래는 어린이용 다섯고개 퀴즈입니다.
@@ -68,16 +124,15 @@ def check_fiveq(utterance: str, answer: str) -> Dict:
 아이의 발화는 정답을 맞춘 것으로 볼 수 있나요?
     """
 
-    completion = client.chat.completions.create(
+    result = await chat_text_async(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "You are a strict evaluator."},
             {"role": "user", "content": prompt}
-        ]
+        ],
+        feature="fiveq_check",
     )
 
-    result = completion.choices[0].message.content.strip()
-
     correct = result.lower() == "true"
 
     return {"correct": correct}
@@ -1,28 +1,26 @@
 # services/roleplay_service.py
 from __future__ import annotations
 
-from typing import Literal, Optional
-from openai import OpenAI, AsyncOpenAI
+import asyncio
+from typing import AsyncIterator, Literal
+from fastapi import HTTPException
 from config import settings
 
 from schemas.roleplay import RoleplayRequest, RoleplayResponse
 from schemas.roleplay import RoleplayEndRequest, RoleplayEndResponse
-
-from langchain_classic.memory import ConversationBufferMemory
-import os
+from common.llm import chat_text_async, stream_text_async
+from common.sse import READY, sse_event, start_stream
+from common.session_backend import create_backend
+from common.session_actor import SessionActors
+from memory.recall import recall
 
 RoleType = Literal["shop", "teacher", "friend"]
 
-_memory_storage = {}
+# 세션별 턴 히스토리 (SESSION_BACKEND: memory/sqlite/redis)
+_sessions = create_backend("roleplay")
 
-def _get_memory(session_id: str) -> ConversationBufferMemory:
-    # 세션 ID에 해당하는 메모리 객체를 가져오거나 생성.
-    if session_id not in _memory_storage:
-        _memory_storage[session_id] = ConversationBufferMemory(
-            return_messages=True,
-            memory_key="chat_history"
-        )
-    return _memory_storage[session_id]
+# 같은 세션의 턴은 하나씩 처리 (SESSION_DUPLICATE_POLICY: queue/reject/merge)
+_actors = SessionActors("roleplay")
 
 def _system_base() -> str:
     # 존댓말, 안전/품위 유지(이모티콘 금지), 어린이 친화 톤.
@@ -79,37 +77,40 @@ def _role_instruction(role: RoleType) -> str:
     )
 
 
-def _build_messages(req: RoleplayRequest) -> list[dict]:
+FINAL_TURN_PROMPT = (
+    "★★★ [CRITICAL: FINAL MESSAGE] ★★★\n"
+    "이번이 아이와 나누는 오늘의 마지막 대화입니다."
+    "사용자가 어떤 질문을 하더라도 대화를 확장하지 마세요."
+    "다정하게 작별 인사를 하고 대화 주제를 자연스럽게 마무리하세요."
+)
+
+async def _build_messages(req: RoleplayRequest) -> list[dict]:
     # messages에 system prompt 생성
+    # (역할별로 고정 -> 매 턴 byte 단위로 동일해야 prompt caching 적용)
     sys_prompt = _system_base() + " " + _role_instruction(req.role)
 
-    # 과거 대화 내역 가져오기 (dict 형식으로 변환)
-    memory = _get_memory(req.session_id)
-    history_messages = memory.load_memory_variables({})["chat_history"]
+    # 과거 대화 내역 + 아이 기억 검색을 동시에 (기억 검색은 RECALL_BUDGET_MS 안에 못 끝나면 생략)
+    history_messages, memory = await asyncio.gather(
+        _sessions.load(req.session_id),
+        recall(req.child_id, req.user_text, feature="roleplay", session_id=req.session_id),
+    )
 
     # 현재 턴수 가져오기
-    current_turn = len(memory.chat_memory.messages) // 2
+    current_turn = len(history_messages) // 2
 
-    # 이번이 마지막 턴인 경우, 작별 인사 추가
-    if current_turn==9:
-        sys_prompt = (
-            "★★★ [CRITICAL: FINAL MESSAGE] ★★★\n"
-            "이번이 아이와 나누는 오늘의 마지막 대화입니다."
-            "사용자가 어떤 질문을 하더라도 대화를 확장하지 마세요."
-            "다정하게 작별 인사를 하고 대화 주제를 자연스럽게 마무리하세요."
-        ) + sys_prompt
-    
     # 메시지 리스트 조립
     messages: list[dict] = [{"role": "system", "content": sys_prompt}]
 
-    # 과거 대화 내역 추가 (dict 형식으로 변환)
-    for msg in history_messages:
-        role = "user" if msg.type == "human" else "assistant"
-        messages.append({"role": role, "content": msg.content})
+    # 과거 대화 내역 추가
+    messages.extend(history_messages)
 
-    # 이번이 마지막 턴인 경우, 작별 인사 추가
+    # 기억(RAG)은 고정 prefix 뒤, 이번 턴 직전에만 추가
+    if memory.message is not None:
+        messages.append(memory.message)
+
+    # 이번이 마지막 턴인 경우, 작별 인사 지시를 맨 끝에만 추가
     if current_turn==9:
-        messages.append({"role": "system", "content": sys_prompt})
+        messages.append({"role": "system", "content": FINAL_TURN_PROMPT})
 
     # 현재 유저 질문 추가
     messages.append({"role": "user", "content": req.user_text})
@@ -117,14 +118,27 @@ def _build_messages(req: RoleplayRequest) -> list[dict]:
     return messages
 
 async def end_reply(req: RoleplayEndRequest) -> RoleplayEndResponse:
-    if req.session_id in _memory_storage:
-        _memory_storage[req.session_id].clear()
-        del _memory_storage[req.session_id]
+    async with _actors.lock(req.session_id):
+        await _sessions.delete(req.session_id)
     
     return RoleplayEndResponse(
         session_id=req.session_id
     )
 
+async def _commit_turn(req: RoleplayRequest, text: str) -> RoleplayResponse:
+    # 대화 내용 저장 (user/assistant 한 쌍을 원자적으로 추가) + 턴수 세기
+    current_turn = await _sessions.append_turn(req.session_id, req.user_text, text)
+
+    ## 10턴이 끝나면 해당 세션 대화 지우기
+    if current_turn>=10:
+        await _sessions.delete(req.session_id)
+
+    return RoleplayResponse(
+        session_id=req.session_id,
+        reply=text,
+        turn=current_turn 
+    )
+
 async def reply(req: RoleplayRequest) -> RoleplayResponse:
     """
     반환 예:
@@ -133,43 +147,66 @@ async def reply(req: RoleplayRequest) -> RoleplayResponse:
       "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
     }
     """
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-    model = getattr(settings, "CHAT_MODEL", "gpt-4o")
+    return await _actors.run(req.session_id, req.user_text, lambda: _reply_turn(req))
 
-    messages = _build_messages(req)
+async def _reply_turn(req: RoleplayRequest) -> RoleplayResponse:
+    model = getattr(settings, "CHAT_MODEL", "gpt-4o")
 
-    # TODO: 필요 시 여기서 RAG 문맥을 삽입 (Vector DB 검색 결과를 system 또는 assistant role로 prepend)
+    messages = await _build_messages(req)
 
-    resp = await client.chat.completions.create(
-        model=model, 
+    text = await chat_text_async(
+        model=model,
         messages=messages,
         temperature=req.temperature,
         top_p=req.top_p,
         max_tokens=req.max_tokens,
+        feature="roleplay",
+        session_id=req.session_id,
     )
 
-    choice = resp.choices[0].message
-    text = (choice.content or "").strip()
-
-    # 대화 내용 저장
-    memory = _get_memory(req.session_id)
-    memory.save_context(
-        {"input": req.user_text},
-        {"output": text}
-    )
-
-    ## 턴수 세기
-    total_message = len(memory.chat_memory.messages)
-    current_turn = total_message // 2
+    return await _commit_turn(req, text)
 
-    ## 10턴이 끝나면 해당 세션 대화 지우기
-    if current_turn>=10:
-        if req.session_id in _memory_storage:
-            _memory_storage[req.session_id].clear()
-            del _memory_storage[req.session_id]
+async def reply_stream(req: RoleplayRequest) -> AsyncIterator[str]:
+    """
+    reply의 SSE 스트리밍 버전.
+    - "delta" 이벤트로 토큰을 바로 전달하고, 끝나면 "done" 이벤트로 RoleplayResponse를 보냅니다.
+    - 메모리는 스트림이 정상 종료된 뒤에만 저장합니다(중간 끊김/에러 시 턴이 늘지 않음).
+    - 세션 lock은 스트림이 끝나거나 닫힐 때까지 유지합니다(한 번도 읽지 않고 버려져도 풀림).
+    """
+    model = getattr(settings, "CHAT_MODEL", "gpt-4o")
 
-    return RoleplayResponse(
-        session_id=req.session_id,
-        reply=text,
-        turn=current_turn 
-    )
\ No newline at end of file
+    async def events() -> AsyncIterator[str]:
+        # lock과 upstream 스트림은 generator 안에서만 잡음 (generator가 닫히면 항상 풀림)
+        async with _actors.turn(req.session_id):
+            messages = await _build_messages(req)
+
+            # 연결 실패는 응답 시작 전에 502로 올라감 (start_stream)
+            deltas = await stream_text_async(
+                model=model,
+                messages=messages,
+                temperature=req.temperature,
+                top_p=req.top_p,
+                max_tokens=req.max_tokens,
+                feature="roleplay_stream",
+                session_id=req.session_id,
+            )
+            yield READY
+
+            parts: list[str] = []
+            try:
+                async for delta in deltas:
+                    parts.append(delta)
+                    yield sse_event({"delta": delta}, event="delta")
+            except HTTPException as e:
+                yield sse_event({"error": str(e.detail), "code": "llm_upstream_error"}, event="error")
+                return
+
+            text = "".join(parts).strip()
+            if not text:
+                yield sse_event({"error": "llm_bad_response", "code": "llm_bad_response"}, event="error")
+                return
+
+            resp = await _commit_turn(req, text)
+            yield sse_event(resp.model_dump(), event="done")
+
+    return await start_stream(events())
@@ -0,0 +1,187 @@
+# services/stt_archive.py
+from __future__ import annotations
+
+import asyncio
+import datetime
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Union
+
+from fastapi import UploadFile
+
+from config import settings
+from common.background import BackgroundQueue
+from common.cache import TTLCache
+from common.logging import get_logger
+from common.metrics import metrics
+from storage.presign import put_upload, public_url, request_presign, resolve_path
+
+log = get_logger("greeni.stt_archive")
+
+Encode = Callable[[UploadFile], Awaitable[bytes]]
+
+# store_audio=true 녹음 보관 (write-behind). 전사 응답은 기다리지 않음
+_queue = BackgroundQueue(
+    "stt_archive",
+    maxsize=settings.STT_ARCHIVE_QUEUE_MAX,
+    workers=settings.STT_ARCHIVE_WORKERS,
+    max_retries=settings.STT_ARCHIVE_RETRIES,
+)
+
+# session_id -> 보관 상태 (GET /stt/archive/{session_id})
+_sessions = TTLCache(max_entries=settings.STT_ARCHIVE_SESSIONS_MAX, ttl_sec=settings.STT_ARCHIVE_URL_TTL_SEC)
+
+
+@dataclass
+class _Item:
+    id: str
+    session_id: Optional[str]
+    purpose: str
+    upload: UploadFile  # 요청에서 spool된 원본 (보관이 끝나면 닫음)
+    size: int
+    ext: str
+    encode: Optional[Encode] = None
+    url: Optional[str] = None
+
+
+@dataclass
+class SessionArchive:
+    """세션별 보관 상태. pending은 아직 올리는 중인 녹음 수."""
+    audio_urls: List[str] = field(default_factory=list)
+    pending: int = 0
+    failed: int = 0
+
+
+# 아직 어느 batch도 가져가지 않은 녹음 (id -> item, 들어온 순서)
+_pending: Dict[str, _Item] = {}
+# 업로드가 끝나지 않은 녹음 바이트 합 (큐 깊이와 별개로 메모리/임시 파일 상한)
+_pending_bytes = 0
+
+metrics.register_gauge("stt_archive_pending_bytes", lambda: _pending_bytes)
+
+
+def _session(session_id: Optional[str]) -> Optional[SessionArchive]:
+    if not session_id:
+        return None
+    state = _sessions.get(session_id)
+    if state is None:
+        state = SessionArchive()
+        _sessions.put(session_id, state)
+    return state
+
+
+async def _finish(item: _Item, ok: bool) -> None:
+    global _pending_bytes
+    _pending_bytes -= item.size
+    await item.upload.close()
+    state = _session(item.session_id)
+    if state is not None:
+        state.pending -= 1
+        if ok:
+            state.audio_urls.append(item.url)
+        else:
+            state.failed += 1
+        _sessions.put(item.session_id, state)  # 마지막 변경부터 TTL
+    metrics.incr("stt_archive", purpose=item.purpose, result="stored" if ok else "failed")
+
+
+def _make_filename(purpose: str, ext: str) -> str:
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"stt_{purpose}_{timestamp}_{uuid.uuid4().hex[:8]}.{ext}"
+
+
+def _upload(item: _Item, data: Union[bytes, BinaryIO]) -> str:
+    filename = _make_filename(item.purpose, item.ext)
+    path = resolve_path(item.purpose)
+    presign = request_presign(filename, path)
+    if not isinstance(data, bytes):
+        data.seek(0)  # 재시도 때도 처음부터
+    put_upload(presign["url"], data, code_prefix="stt", message="녹음 보관에 실패했습니다.")
+    return public_url(presign["key"])
+
+
+async def _store(item: _Item) -> None:
+    # 압축이 필요 없으면 spool 파일을 그대로 스트리밍(bytes로 복사하지 않음)
+    data = await item.encode(item.upload) if item.encode is not None else item.upload.file
+    item.url = await asyncio.to_thread(_upload, item, data)
+    log.info("stt_archive_stored", extra={
+        "session_id": item.session_id, "purpose": item.purpose,
+        "bytes": len(data) if isinstance(data, bytes) else item.size, "audio_url": item.url,
+    })
+
+
+def _batch_job(first: _Item) -> Callable[[], Awaitable[None]]:
+    """
+    큐 작업 1개 = batch 1개. 처음 실행될 때 first와 함께 밀려 있는 녹음을 최대 STT_ARCHIVE_BATCH개까지 가져가
+    동시에 올립니다(presign/PUT 왕복을 겹침). 이미 다른 batch가 가져간 녹음이면 아무것도 하지 않습니다.
+    재시도 때는 실패한 녹음만 다시 올리고, 마지막 시도에서도 실패하면 failed로 기록합니다.
+    """
+    batch: List[_Item] = []
+    attempts = 0
+
+    async def run() -> None:
+        nonlocal attempts
+        if not batch:
+            if _pending.pop(first.id, None) is None:
+                return
+            batch.append(first)
+            while _pending and len(batch) < settings.STT_ARCHIVE_BATCH:
+                batch.append(_pending.pop(next(iter(_pending))))
+            metrics.observe("stt_archive_batch", len(batch))
+
+        attempts += 1
+        todo = [item for item in batch if item.url is None]
+        results = await asyncio.gather(*(_store(item) for item in todo), return_exceptions=True)
+        failed = [item for item, r in zip(todo, results) if isinstance(r, BaseException)]
+        for item in todo:
+            if item.url is not None:
+                await _finish(item, ok=True)
+        if failed:
+            if attempts > settings.STT_ARCHIVE_RETRIES:
+                for item in failed:
+                    await _finish(item, ok=False)
+            raise next(r for r in results if isinstance(r, BaseException))
+
+    return run
+
+
+def enqueue_audio(
+    session_id: Optional[str],
+    purpose: str,
+    upload: UploadFile,
+    ext: str,
+    *,
+    encode: Optional[Encode] = None,
+) -> bool:
+    """
+    응답 경로에서 호출. 녹음(spool된 업로드 파일)을 보관 대기열에 넣고 바로 반환합니다.
+    True면 upload는 이 모듈이 보관 후 닫고, False(대기 중인 바이트가 STT_ARCHIVE_MAX_BYTES를 넘거나
+    큐가 가득 참)면 호출한 쪽이 닫습니다.
+    encode가 있으면 업로드 직전(백그라운드)에 압축합니다(예: WAV -> opus).
+    """
+    global _pending_bytes
+    size = upload.size or 0
+    if _pending_bytes + size > settings.STT_ARCHIVE_MAX_BYTES:
+        metrics.incr("stt_archive", purpose=purpose, result="dropped")
+        log.warning("stt_archive_dropped", extra={
+            "session_id": session_id, "reason": "bytes", "pending_bytes": _pending_bytes,
+        })
+        return False
+
+    item = _Item(uuid.uuid4().hex, session_id, purpose, upload, size, ext, encode)
+    _pending[item.id] = item
+    if not _queue.submit(f"stt:{session_id}", _batch_job(item)):
+        _pending.pop(item.id, None)
+        metrics.incr("stt_archive", purpose=purpose, result="dropped")
+        return False
+
+    _pending_bytes += size
+    state = _session(session_id)
+    if state is not None:
+        state.pending += 1
+    return True
+
+
+def get_session_archive(session_id: str) -> Optional[SessionArchive]:
+    """세션에서 보관한(또는 보관 중인) 녹음. STT_ARCHIVE_URL_TTL_SEC 동안 유지, 없으면 None."""
+    return _sessions.get(session_id)
@@ -1,11 +1,26 @@
-import os, uuid, shutil, subprocess
-from typing import Optional
+import asyncio, hashlib, io, os, time, uuid, shutil, tempfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, BinaryIO, Optional
+from fastapi import UploadFile
 from schemas.stt import STTResponse
-from openai import OpenAI
 
 import imageio_ffmpeg as iio_ffmpeg
+import numpy as np
 
-client = OpenAI()
+from config import settings
+from common import audio
+from common.cache import TieredCache, TTLCache, content_key
+from common.errors import AppError
+from common.llm import transcribe_async
+from common.logging import get_logger
+from common.metrics import metrics
+from common.singleflight import SingleFlight
+from common.upload import iter_chunks, read_head
+from common.worker_pool import WorkerPool
+from services import stt_archive
+
+log = get_logger("greeni.stt_service")
 
 # Whisper가 무리 없이 처리하는 대표 확장자 목록
 #SUPPORTED_EXTS = {
@@ -13,74 +28,425 @@ client = OpenAI()
 #    ".wav", ".webm", ".ogg", ".oga", ".flac"
 #}
 
+# moov atom이 파일 끝에 있을 수 있어 stdin(비탐색 파이프)으로는 못 읽는 컨테이너
+SEEKABLE_ONLY_EXTS = {".m4a", ".mp4", ".mov", ".3gp"}
+
+# 16kHz mono s16le raw PCM (VAD/분할을 프로세스 안에서 하기 위해 압축하지 않음)
+FFMPEG_PCM_ARGS = ["-vn", "-ar", str(audio.TARGET_RATE), "-ac", "1", "-f", "s16le"]
+
+# 녹음 보관: 이미 압축된 형식은 원본 그대로, 나머지(WAV/FLAC 등)는 백그라운드에서 mono opus로
+ARCHIVE_AS_IS_FORMATS = {"mp3", "m4a", "webm", "ogg"}
+FFMPEG_ARCHIVE_ARGS = ["-vn", "-ac", "1", "-c:a", "libopus", "-b:a", "32k", "-f", "ogg"]
+
+# ffmpeg는 CPU를 다 쓰므로 코어 수만큼만 동시에 실행하고, 넘치면 503으로 거절
+_transcoders = WorkerPool(
+    "stt_transcode",
+    size=settings.STT_TRANSCODE_WORKERS,
+    max_queue=settings.STT_TRANSCODE_QUEUE_MAX,
+    max_wait_sec=settings.STT_TRANSCODE_QUEUE_TIMEOUT_SEC,
+)
+
+# 클라이언트 재시도(같은 녹음 재업로드) 대비: 원본 해시 -> {"text", "ms"(처리 시간)} 짧은 TTL 캐시
+_stt_cache = TieredCache(
+    "stt",
+    memory=TTLCache(max_entries=settings.STT_CACHE_MAX_ENTRIES, ttl_sec=settings.STT_CACHE_TTL_SEC),
+)
+# 진행 중인 같은 녹음은 변환/전사 1번을 공유.
+# 기다리는 요청이 모두 끊기면 STT_ABANDON_GRACE_SEC 동안만 재시도 합류를 기다렸다가 취소(ffmpeg 종료/전사 중단)
+_stt_flight = SingleFlight("stt", abandon_grace_sec=settings.STT_ABANDON_GRACE_SEC)
+
+# 보관용 압축은 전사 경로(_transcoders)와 CPU를 나눠 쓰지 않도록 따로, 적게
+_archive_encoders = asyncio.Semaphore(settings.STT_ARCHIVE_ENCODE_WORKERS)
+
+PASSTHROUGH_FORMATS = {f.strip() for f in settings.STT_PASSTHROUGH_FORMATS.split(",") if f.strip()}
+
+# ffmpeg 변환 시간(입력 MB당 ms) EWMA. 변환을 건너뛴 요청의 절약 시간 추정에 사용
+_ffmpeg_ms_per_mb = 100.0
+
 def ext(path: str) -> str:
     return os.path.splitext(path)[1].lower()
 
 def have_ffmpeg() -> bool:
     return shutil.which("ffmpeg") is not None
 
-async def transcribe_file(
-    audio_bytes: bytes,
+@lru_cache(maxsize=1)
+def ffmpeg_exe() -> str:
+    """ffmpeg 경로는 프로세스당 한 번만 찾습니다. (FFMPEG_PATH -> PATH -> imageio-ffmpeg 번들)"""
+    return settings.FFMPEG_PATH or shutil.which("ffmpeg") or iio_ffmpeg.get_ffmpeg_exe()
+
+class _TranscodeFailed(Exception):
+    """ffmpeg가 0이 아닌 코드로 종료(메시지는 stderr 끝부분)."""
+
+async def _ffmpeg(
+    input_arg: str,
+    source: Optional[AsyncIterator[bytes]],
+    timeout_sec: float,
+    output_args: list[str] = FFMPEG_PCM_ARGS,
+) -> bytes:
+    """
+    ffmpeg 변환 결과(기본: PCM)를 stdout 파이프로 받습니다. source가 있으면 청크를 받는 대로 stdin(pipe:0)에 씁니다.
+    timeout이나 취소(클라이언트 연결 끊김)가 나면 ffmpeg 프로세스를 종료하고 기다려 정리합니다.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        ffmpeg_exe(), "-hide_banner", "-loglevel", "error",
+        "-i", input_arg, *output_args, "pipe:1",
+        stdin=asyncio.subprocess.PIPE if source is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def feed() -> None:
+        try:
+            async for chunk in source:
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 입력을 못 읽어 ffmpeg가 먼저 종료 -> returncode로 판단
+        finally:
+            proc.stdin.close()
+
+    feeder = asyncio.ensure_future(feed()) if source is not None else None
+    try:
+        out, err = await asyncio.wait_for(
+            asyncio.gather(proc.stdout.read(), proc.stderr.read()), timeout=timeout_sec,
+        )
+        await proc.wait()
+    except asyncio.TimeoutError:
+        log.warning("stt_transcode_timeout", extra={"timeout_sec": timeout_sec})
+        raise AppError(message="audio transcoding timed out", code="stt_transcode_timeout", status_code=504)
+    finally:
+        if feeder is not None:
+            feeder.cancel()
+            await asyncio.gather(feeder, return_exceptions=True)
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+    if proc.returncode != 0:
+        raise _TranscodeFailed(err.decode(errors="replace")[-200:])
+    return out
+
+async def _spool_to_temp(upload: UploadFile, suffix: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, "wb") as f:
+        async for chunk in iter_chunks(upload, settings.STT_UPLOAD_CHUNK_BYTES):
+            await asyncio.to_thread(f.write, chunk)
+    return path
+
+async def transcode_to_pcm(
+    upload: UploadFile,
+    filename: Optional[str] = None,
+    *,
+    timeout_sec: float = settings.STT_TRANSCODE_TIMEOUT_SEC,
+) -> np.ndarray:
+    """
+    업로드 음성을 16kHz mono PCM(float32)으로 디코딩합니다.
+    업로드를 청크 단위로 ffmpeg stdin에 흘려 넣고 stdout 파이프로 받습니다(전체 bytes 복사 없음).
+    (m4a/mp4처럼 파이프로 못 읽는 파일만 임시 파일로 다시 시도)
+    동시 변환 수는 _transcoders가 제한합니다(포화 시 AppError 503 + Retry-After).
+    """
+    async with _transcoders.slot():
+        return await _transcode(upload, filename, timeout_sec)
+
+async def _transcode(upload: UploadFile, filename: Optional[str], timeout_sec: float) -> np.ndarray:
+    try:
+        try:
+            out = await _ffmpeg("pipe:0", iter_chunks(upload, settings.STT_UPLOAD_CHUNK_BYTES), timeout_sec)
+        except _TranscodeFailed as e:
+            if not filename or ext(filename) not in SEEKABLE_ONLY_EXTS:
+                raise
+            log.info("stt_transcode_seekable_retry", extra={"ext": ext(filename), "stderr": str(e)})
+            path = await _spool_to_temp(upload, ext(filename))
+            try:
+                out = await _ffmpeg(path, None, timeout_sec)
+            finally:
+                os.remove(path)
+    except _TranscodeFailed as e:
+        log.warning("stt_transcode_failed", extra={"ext": ext(filename or ""), "stderr": str(e)})
+        raise AppError(message="unsupported or corrupted audio", code="stt_bad_audio", status_code=400)
+
+    return audio.pcm16_to_float(out)
+
+@dataclass
+class PreparedAudio:
+    """
+    path: passthrough / resample / ffmpeg,  format: audio.sniff 결과
+    pcm: 16kHz mono float32 (passthrough면 None),  file: passthrough 원본 (파일명, 파일 객체)
+    """
+    path: str
+    format: str
+    pcm: Optional[np.ndarray] = None
+    file: Optional[tuple[str, BinaryIO]] = None
+
+def _passthrough_ok(fmt: str, size: int, purpose: Optional[str]) -> bool:
+    """
+    원본 그대로 보내도 되는지. 일기(diary)는 길어지기 쉬우므로 항상 디코딩해 VAD/분할을 거치고,
+    나머지도 크기로 추정한 길이(최저 비트레이트 STT_PASSTHROUGH_MIN_KBPS 가정)가 분할 기준을 넘으면 디코딩합니다.
+    """
+    if fmt not in PASSTHROUGH_FORMATS or size > settings.STT_PASSTHROUGH_MAX_BYTES:
+        return False
+    if purpose == "diary":
+        return False
+    max_sec_bytes = settings.STT_SEGMENT_MAX_SEC * settings.STT_PASSTHROUGH_MIN_KBPS * 1000 / 8
+    return size <= max_sec_bytes
+
+async def prepare_audio(
+    upload: UploadFile,
+    filename: Optional[str] = None,
+    purpose: Optional[str] = None,
+) -> PreparedAudio:
+    """
+    업로드 음성을 전사 직전 형태로 만듭니다. 형식은 헤더 바이트로 판별(audio.sniff)하고 경로를 고릅니다.
+      passthrough : 압축 형식 중 전사 API가 그대로 받는 짧은 녹음(STT_PASSTHROUGH_FORMATS, _passthrough_ok)
+                    -> 원본 그대로(VAD/분할 생략)
+      resample    : PCM/float WAV -> NumPy로 디코딩/다운믹스/리샘플해 16kHz mono PCM
+      ffmpeg      : 나머지(webm/ogg/ADPCM WAV, 일기/긴 mp3·m4a 등) -> ffmpeg로 16kHz mono PCM(transcode_to_pcm)
+    업로드는 spool된 파일(UploadFile)로 받아 필요한 만큼만 읽습니다(bytes는 common.upload.as_upload로 감싸기).
+    메트릭: stt_audio_path{path,format}, stt_prepare_ms{path},
+           stt_transcode_saved_ms{path} (ffmpeg였다면 걸렸을 시간 추정 - 실제 시간)
+    """
+    global _ffmpeg_ms_per_mb
+    fmt = audio.sniff(await read_head(upload))
+    size = upload.size or 0
+    t0 = time.perf_counter()
+
+    info = None
+    if fmt == "wav":
+        # WAV는 어차피 전체를 PCM으로 디코딩하므로 한 번에 읽음
+        data = await upload.read()
+        info = audio.wav_info(data)
+
+    if _passthrough_ok(fmt, size, purpose):
+        await upload.seek(0)
+        prepared = PreparedAudio("passthrough", fmt, file=(f"{uuid.uuid4().hex}.{fmt}", upload.file))
+    elif info is not None:
+        prepared = PreparedAudio("resample", fmt, pcm=await asyncio.to_thread(audio.to_target_pcm, data, info))
+    else:
+        prepared = PreparedAudio("ffmpeg", fmt, pcm=await transcode_to_pcm(upload, filename))
+    path = prepared.path
+
+    ms = (time.perf_counter() - t0) * 1000
+    mb = size / (1024 * 1024)
+    if path == "ffmpeg":
+        if mb > 0.01:
+            _ffmpeg_ms_per_mb = 0.8 * _ffmpeg_ms_per_mb + 0.2 * (ms / mb)
+    else:
+        metrics.incr("stt_transcode_saved_ms", max(0.0, _ffmpeg_ms_per_mb * mb - ms), path=path)
+    metrics.incr("stt_audio_path", path=path, format=fmt)
+    metrics.observe("stt_prepare_ms", ms, path=path)
+    log.info("stt_audio_prepared", extra={"path": path, "format": fmt, "bytes": size, "latency_ms": int(ms)})
+    return prepared
+
+def _vad(pcm: np.ndarray) -> audio.VadResult:
+    return audio.vad(
+        pcm,
+        min_db=settings.STT_VAD_MIN_DB,
+        margin_db=settings.STT_VAD_MARGIN_DB,
+        pad_ms=settings.STT_VAD_PAD_MS,
+        max_pause_ms=settings.STT_VAD_MAX_PAUSE_MS,
+        min_speech_ms=settings.STT_VAD_MIN_SPEECH_MS,
+    )
+
+async def trim_silence(prepared: PreparedAudio, purpose: str) -> PreparedAudio:
+    """
+    PCM이면 VAD로 앞뒤 무음을 자르고 긴 쉼을 줄인 PCM으로 바꿉니다(passthrough는 그대로).
+    말소리가 전혀 없으면 전사 API를 부르지 않고 AppError(422 stt_no_speech).
+
+    메트릭(purpose별): stt_vad{state=trimmed|silent|skipped|off}, stt_vad_ms,
+                      stt_audio_in_sec / stt_audio_out_sec / stt_audio_saved_sec (업로드한 음성 길이)
+    """
+    if prepared.pcm is None or not settings.STT_VAD_ENABLED:
+        metrics.incr("stt_vad", purpose=purpose, state="skipped" if prepared.pcm is None else "off")
+        return prepared
+
+    t0 = time.perf_counter()
+    result = await asyncio.to_thread(_vad, prepared.pcm)
+    ms = (time.perf_counter() - t0) * 1000
+    metrics.observe("stt_vad_ms", ms, purpose=purpose)
+    metrics.incr("stt_audio_in_sec", result.input_sec, purpose=purpose)
+    metrics.incr("stt_audio_out_sec", result.output_sec, purpose=purpose)
+    metrics.incr("stt_audio_saved_sec", result.input_sec - result.output_sec, purpose=purpose)
+    metrics.incr("stt_vad", purpose=purpose, state="silent" if result.silent else "trimmed")
+    log.info("stt_vad_done", extra={
+        "purpose": purpose, "input_sec": round(result.input_sec, 2), "output_sec": round(result.output_sec, 2),
+        "speech_sec": round(result.speech_sec, 2), "latency_ms": int(ms),
+    })
+    if result.silent:
+        raise AppError(message="목소리가 들리지 않았어요. 다시 말해 줄래요?", code="stt_no_speech", status_code=422)
+
+    prepared.pcm = result.pcm
+    return prepared
+
+_WORD_EDGE = ".,!?~…\"'“”‘’"
+
+def stitch(texts: list[str], overlapped: Optional[list[bool]] = None, max_overlap_words: int = 8) -> str:
+    """
+    조각별 전사 결과를 순서대로 이어 붙입니다.
+    overlapped[i]: i번째 조각이 앞 조각과 겹치게 잘렸는지(말하는 중에 자른 경우).
+    겹친 경계에서는 같은 단어가 반복되므로, 앞 끝 k단어 == 다음 앞 k단어(문장부호 무시)인
+    가장 긴 k만큼 다음 조각에서 뺍니다. 쉼에서 자른 경계는 그대로 붙입니다.
+    """
+    overlapped = overlapped or [True] * len(texts)
+    words: list[str] = []
+    for text, dedupe in zip(texts, overlapped):
+        nxt = text.split()
+        if not nxt:
+            continue
+        if not dedupe:
+            words.extend(nxt)
+            continue
+        norm_prev = [w.strip(_WORD_EDGE) for w in words[-max_overlap_words:]]
+        norm_next = [w.strip(_WORD_EDGE) for w in nxt[:max_overlap_words]]
+        k = next(
+            (k for k in range(min(len(norm_prev), len(norm_next)), 0, -1) if norm_prev[-k:] == norm_next[:k]),
+            0,
+        )
+        words.extend(nxt[k:])
+    return " ".join(words)
+
+def _wav_file(pcm: np.ndarray) -> tuple[str, io.BytesIO]:
+    buf = audio.encode_wav(pcm)
+    return f"{uuid.uuid4().hex}.wav", buf
+
+async def _transcribe(prepared: PreparedAudio, purpose: str, session_id: Optional[str]) -> str:
+    """
+    전사 API 호출. 긴 PCM(STT_SEGMENT_MAX_SEC 초과)은 조용한 지점에서 나눠
+    최대 STT_SEGMENT_CONCURRENCY개씩 동시에 전사하고 순서대로 이어 붙입니다. 짧으면 요청 1번.
+    메트릭(purpose별): stt_segments (요청당 조각 수)
+    """
+    call = lambda file: transcribe_async(  # noqa: E731
+        file,
+        feature=f"stt_{purpose}",
+        session_id=session_id,
+        timeout_sec=settings.STT_TRANSCRIBE_TIMEOUT_SEC,
+    )
+    if prepared.pcm is None:
+        return await call(prepared.file)
+
+    ranges = audio.split(
+        prepared.pcm,
+        max_sec=settings.STT_SEGMENT_MAX_SEC,
+        min_sec=settings.STT_SEGMENT_MIN_SEC,
+        overlap_ms=settings.STT_SEGMENT_OVERLAP_MS,
+    )
+    metrics.observe("stt_segments", len(ranges), purpose=purpose)
+    if len(ranges) == 1:
+        return await call(await asyncio.to_thread(_wav_file, prepared.pcm))
+
+    sem = asyncio.Semaphore(settings.STT_SEGMENT_CONCURRENCY)
+
+    async def one(start: int, end: int) -> str:
+        async with sem:
+            return await call(await asyncio.to_thread(_wav_file, prepared.pcm[start:end]))
+
+    texts = await asyncio.gather(*(one(s, e) for s, e in ranges))
+    overlapped = [False] + [prev_end > start for (_, prev_end), (start, _) in zip(ranges, ranges[1:])]
+    log.info("stt_segmented", extra={
+        "purpose": purpose, "session_id": session_id, "segments": len(ranges),
+        "audio_sec": round(prepared.pcm.size / audio.TARGET_RATE, 2),
+    })
+    return stitch(texts, overlapped)
+
+async def _content_key(upload: UploadFile, purpose: str) -> str:
+    """원본 업로드 바이트의 BLAKE2b 해시 + 결과를 바꾸는 설정(purpose/모델/VAD)."""
+    h = hashlib.blake2b(digest_size=16)
+    async for chunk in iter_chunks(upload, settings.STT_UPLOAD_CHUNK_BYTES):
+        h.update(chunk)
+    return content_key(h.hexdigest(), purpose, settings.STT_MODEL, settings.STT_VAD_ENABLED)
+
+async def _encode_for_archive(upload: UploadFile) -> bytes:
+    """보관용 압축(백그라운드 작업에서 호출). 동시에 STT_ARCHIVE_ENCODE_WORKERS개까지만."""
+    async with _archive_encoders:
+        return await _ffmpeg(
+            "pipe:0", iter_chunks(upload, settings.STT_UPLOAD_CHUNK_BYTES),
+            settings.STT_TRANSCODE_TIMEOUT_SEC, FFMPEG_ARCHIVE_ARGS,
+        )
+
+async def _archive(upload: UploadFile, purpose: str, session_id: Optional[str]) -> bool:
+    """spool된 업로드를 그대로 보관 큐로 넘김(복사 없음). True면 upload는 보관 큐가 닫습니다."""
+    fmt = audio.sniff(await read_head(upload))
+    if fmt in ARCHIVE_AS_IS_FORMATS:
+        return stt_archive.enqueue_audio(session_id, purpose, upload, fmt)
+    return stt_archive.enqueue_audio(session_id, purpose, upload, "ogg", encode=_encode_for_archive)
+
+async def _run(
+    key: str,
+    upload: UploadFile,
     filename: str,
     purpose: str,
-    store_audio: bool = False,
-    session_id: str = None
-) -> STTResponse:
-    
-    unique = uuid.uuid4().hex
-    ext = os.path.splitext(filename)[1].lower() if filename else ".bin"
-    temp_dir = os.path.abspath("./tmp_stt")
-    os.makedirs(temp_dir, exist_ok=True)
+    session_id: Optional[str],
+    store_audio: bool,
+) -> str:
+    """
+    _stt_flight 안에서 실행. 끝나거나 취소되면 upload를 닫습니다(store_audio면 보관 큐로 넘김).
+    요청이 끊겨도 STT_ABANDON_GRACE_SEC 안에 같은 녹음으로 재시도가 합류하면 계속 진행하고, 아니면 취소됩니다.
+    """
+    t0 = time.perf_counter()
+    handed = False
+    try:
+        # 1) 형식 판별 -> 그대로 / NumPy 리샘플 / ffmpeg 디코딩 (메모리에서, 이벤트 루프를 막지 않음)
+        prepared = await prepare_audio(upload, filename, purpose)
 
-    temp_input_path = os.path.join(temp_dir, f"in_{unique}{ext}")
-    temp_output_path: Optional[str] = None
+        # 2) 무음 자르기 (말소리가 없으면 여기서 422, 전사 API 호출 없음)
+        prepared = await trim_silence(prepared, purpose)
 
-    # 1) 바이너리 데이터를 임시 파일로 저장
-    with open(temp_input_path, "wb") as f:
-        f.write(audio_bytes)
+        # 3) Whisper 호출 (공유 async client, 긴 음성은 조각 단위 동시 전사)
+        t1 = time.perf_counter()
+        text_out = await _transcribe(prepared, purpose, session_id)
+        metrics.observe("stt_transcribe_ms", (time.perf_counter() - t1) * 1000, purpose=purpose)
 
-    use_path = temp_input_path
+        # 4) 녹음 보관은 백그라운드 큐로 (URL은 나중에 GET /stt/archive/{session_id})
+        if store_audio:
+            handed = await _archive(upload, purpose, session_id)
+    finally:
+        if not handed:
+            await upload.close()
+
+    await _stt_cache.put(key, {"text": text_out, "ms": (time.perf_counter() - t0) * 1000})
+    return text_out
 
+async def transcribe_file(
+    upload: UploadFile,
+    filename: str,
+    purpose: str,
+    store_audio: bool = False,
+    session_id: str = None
+) -> STTResponse:
+    """
+    업로드 음성 전사. upload는 이 함수가 닫습니다.
+    네트워크가 불안정한 클라이언트는 응답이 늦으면 같은 녹음을 다시 올리므로,
+    원본 바이트 해시로 최근 결과(STT_CACHE_TTL_SEC)를 재사용하고 진행 중인 같은 녹음에는 합류합니다.
+    메트릭(purpose별): stt_dedup{result=hit|coalesced|miss}, stt_dedup_saved_ms (건너뛴 처리 시간)
+    store_audio면 spool된 원본을 보관 큐(services/stt_archive)에 넘기기만 하고 바로 응답합니다(audio_url은 항상 None).
+    """
+    leader = handed = False
     try:
-        # 항상 mp3로 변환
-        ffmpeg_path = iio_ffmpeg.get_ffmpeg_exe()
-        
-        temp_output_path = os.path.join(temp_dir, f"conv_{unique}.mp3")
-        cmd = [
-            ffmpeg_path, 
-            "-y",
-            "-i", temp_input_path,
-            "-vn",
-            "-ar", "16000", 
-            "-ac", "1", 
-            "-b:a", "64k", 
-            "-f", "mp3",
-            temp_output_path,
-        ]
-        subprocess.run(
-            cmd, 
-            check=True, 
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        use_path = temp_output_path
- 
-        # 3) Whisper 호출
-        with open(use_path, "rb") as audio_file:
-            fname = os.path.basename(use_path) 
-            
-            transcript = client.audio.transcriptions.create(
-                model="gpt-4o-transcribe",
-                file=(fname, audio_file),  
-                language="ko",
-                response_format="json",
+        key = await _content_key(upload, purpose)
+        cached = await _stt_cache.get(key)
+        if cached is not None:
+            metrics.incr("stt_dedup", purpose=purpose, result="hit")
+            result, text_out, saved_ms = "hit", cached["text"], cached["ms"]
+        else:
+            leader = key not in _stt_flight
+            result = "miss" if leader else "coalesced"
+            metrics.incr("stt_dedup", purpose=purpose, result=result)
+            t0 = time.perf_counter()
+            text_out = await _stt_flight.do(
+                key, lambda: _run(key, upload, filename, purpose, session_id, store_audio),
             )
+            # 합류한 요청이 아낀 시간 = 앞선 요청의 처리 시간 - 기다린 시간
+            done = _stt_cache.memory.get(key) or {"ms": 0.0}
+            saved_ms = max(0.0, done["ms"] - (time.perf_counter() - t0) * 1000)
 
-        text_out = transcript.text.strip()
-        return STTResponse(text=text_out, audio_url=None)
-
+        # leader는 _run이 보관까지 처리, 나머지는 자기 upload를 보관 큐로
+        if store_audio and not leader:
+            handed = await _archive(upload, purpose, session_id)
     finally:
-        # 4) 임시 파일 정리
-        for path in [temp_input_path, temp_output_path]:
-            if path and os.path.exists(path):
-                os.remove(path)
+        # leader의 upload는 _run이 닫음 (leader가 끊겨도 grace 동안 합류한 요청을 위해 계속 읽어야 하므로)
+        if not leader and not handed:
+            await upload.close()
+
+    if result != "miss":
+        metrics.incr("stt_dedup_saved_ms", saved_ms, purpose=purpose)
+        log.info("stt_dedup", extra={"purpose": purpose, "session_id": session_id, "result": result})
+    return STTResponse(text=text_out, audio_url=None)
@@ -6,10 +6,15 @@ from fastapi import HTTPException
 from config import settings
 from common.logging import get_logger
 from common.errors import AppError
+from common.cache import content_key
+from common.singleflight import SingleFlight
 
 CLOVA_TTS_URL = "https://naveropenapi.apigw.ntruss.com/tts-premium/v1/tts"
 log = get_logger("greeni.tts_service")
 
+# 같은 문장/목소리/속도의 동시 요청은 CLOVA 호출 1번을 공유
+_tts_flight = SingleFlight("tts")
+
 # 재시도 가능한 세션
 _session = requests.Session()
 _session.mount(
@@ -109,4 +114,8 @@ async def synthesize(text: str, voice: Optional[str], speed: float) -> bytes:
     speaker = voice or "ngaram"
     pitch = 1
     speed_opt = _map_speed(speed)
-    return await asyncio.to_thread(_call_clova_tts, text, speaker, speed_opt, pitch)
+    key = content_key(text, speaker, speed_opt, pitch)
+    return await _tts_flight.do(
+        key,
+        lambda: asyncio.to_thread(_call_clova_tts, text, speaker, speed_opt, pitch),
+    )
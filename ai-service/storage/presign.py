@@ -0,0 +1,144 @@
+# storage/presign.py
+"""
+백엔드 presign -> S3 PUT 업로드 (TTS 일기 음성, STT 녹음 보관에서 공용).
+requests 기반 동기 함수이므로 이벤트 루프에서는 asyncio.to_thread로 호출합니다.
+"""
+from typing import BinaryIO, Union
+
+import requests
+
+from config import settings
+from common.logging import get_logger
+from common.errors import AppError
+
+log = get_logger("greeni.presign")
+
+
+# purpose를 path로 바꾸는 함수
+def resolve_path(purpose: str) -> str:
+    if purpose == "diary":
+        return "diary"
+    return "tmp"
+
+
+# presign 요청 (filename과 path 같이 보내기)
+def request_presign(filename: str, path: str) -> dict:
+    """
+    백엔드 presign 요청:
+    GET {BACKEND_BASE_URL}{BACKEND_PRESIGN_PATH}?file=<filename>
+    """
+    presign_url = settings.BACKEND_BASE_URL.rstrip("/") + settings.BACKEND_PRESIGN_PATH
+
+    headers = {}
+    if getattr(settings, "BACKEND_MASTER_TOKEN", ""):
+        headers["Authorization"] = f"Bearer {settings.BACKEND_MASTER_TOKEN}"
+        log.info(
+            "presign_request_start",
+            extra={
+                "file_name": filename,
+                "path": path,
+                "url": presign_url,
+                "has_auth": bool(settings.BACKEND_MASTER_TOKEN),
+            },
+        )
+
+    try:
+        r = requests.get(
+            presign_url,
+            params={
+                "fileName": filename,
+                "path": path,
+            },
+            headers=headers,
+            timeout=60,
+        )
+    except requests.RequestException as e:
+        log.exception(
+            "presign_request_failed",
+            extra={"file_name": filename, "path": path},
+        )
+        raise AppError(
+            message="presign 요청에 실패했습니다.",
+            code="presign_network_error",
+            status_code=502,
+        ) from e
+
+    if r.status_code != 200:
+        log.warning(
+            "presign_bad_status",
+            extra={
+                "file_name": filename,
+                "path": path,
+                "status_code": r.status_code,
+            },
+        )
+        raise AppError(
+            message="presign 요청에 실패했습니다.",
+            code="presign_bad_status",
+            status_code=502,
+        )
+
+    data = r.json()
+
+    # 경우1 { "url": "...", "key": "..." }
+    if isinstance(data, dict) and data.get("url") and data.get("key"):
+        return {"url": data["url"], "key": data["key"]}
+
+    # 경우2 { "isSuccess": true, "result": {"url": "...", "key": "..."} }
+    if data.get("isSuccess") is True:
+        result = data.get("result") or {}
+        if result.get("url") and result.get("key"):
+            return {"url": result["url"], "key": result["key"]}
+
+    log.warning(
+        "presign_invalid_response",
+        extra={
+            "file_name": filename,
+            "path": path,
+        },
+    )
+    raise AppError(
+        message="presign 응답 형식이 올바르지 않습니다.",
+        code="presign_invalid_response",
+        status_code=502,
+    )
+
+
+# presign url로 PUT 업로드
+# code_prefix: 에러 코드 앞부분(예: tts -> tts_upload_bad_status), message: 호출한 기능의 에러 메시지
+# audio_bytes 대신 파일 객체를 넘기면 처음부터 읽어 올림(Content-Length는 requests가 계산)
+def put_upload(
+    presigned_url: str,
+    audio_bytes: Union[bytes, BinaryIO],
+    code_prefix: str = "tts",
+    message: str = "TTS 업로드에 실패했습니다.",
+) -> None:
+    try:
+        r = requests.put(
+            presigned_url,
+            data=audio_bytes,
+            timeout=30,
+        )
+    except requests.RequestException as e:
+        log.exception(f"{code_prefix}_upload_network_error")
+        raise AppError(
+            message=message,
+            code=f"{code_prefix}_upload_network_error",
+            status_code=502,
+        ) from e
+
+    if r.status_code < 200 or r.status_code >= 300:
+        log.warning(
+            f"{code_prefix}_upload_bad_status",
+            extra={"status_code": r.status_code},
+        )
+        raise AppError(
+            message=message,
+            code=f"{code_prefix}_upload_bad_status",
+            status_code=502,
+        )
+
+
+def public_url(key: str) -> str:
+    """presign key -> 공개 URL"""
+    return settings.S3_PUBLIC_BASE_URL.rstrip("/") + "/" + key.lstrip("/")
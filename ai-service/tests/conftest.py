@@ -0,0 +1,9 @@
+# tests/conftest.py
+import os
+import sys
+
+# 앱 모듈은 import 시점에 OpenAI client/설정을 만들므로 테스트용 값을 먼저 넣어 둠
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("SESSION_BACKEND", "memory")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,132 @@
+# tests/test_background.py
+import asyncio
+
+import pytest
+
+from common import background
+from common.background import BackgroundQueue
+from common.metrics import metrics
+
+
+@pytest.fixture(autouse=True)
+def _isolated_registry(monkeypatch):
+    # 테스트 큐가 app lifespan의 start_queues/drain_queues 대상에 남지 않도록
+    monkeypatch.setattr(background, "_queues", [])
+
+
+def _count(key):
+    return metrics._counters.get(key, 0)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    async def main():
+        q = BackgroundQueue("t_full", maxsize=1, workers=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        assert q.submit("a", blocked)
+        await asyncio.sleep(0)  # worker가 a를 꺼내 실행 중
+        assert q.submit("b", blocked)
+        dropped = _count("bg_dropped{queue=t_full,reason=full}")
+        assert not q.submit("c", blocked)
+        assert _count("bg_dropped{queue=t_full,reason=full}") == dropped + 1
+        release.set()
+        await q.drain(1.0)
+
+    asyncio.run(main())
+
+
+def test_failed_job_is_retried_with_exponential_backoff(monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(background.random, "random", lambda: 0.5)  # jitter 계수 1.0
+
+    async def main():
+        q = BackgroundQueue("t_retry", workers=1, max_retries=3, backoff_sec=0.1, max_backoff_sec=0.3)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 4:
+                raise RuntimeError("upstream down")
+
+        monkeypatch.setattr(background.asyncio, "sleep", fake_sleep)
+        q.submit("flaky", flaky)
+        await q._queue.join()
+        monkeypatch.setattr(background.asyncio, "sleep", real_sleep)
+        await q.drain(1.0)
+        return len(attempts)
+
+    done = _count("bg_done{queue=t_retry}")
+    assert asyncio.run(main()) == 4
+    assert delays == [0.1, 0.2, 0.3]  # 0.1 * 2^n, max_backoff_sec에서 멈춤
+    assert _count("bg_done{queue=t_retry}") == done + 1
+
+
+def test_job_that_keeps_failing_is_given_up_and_worker_survives():
+    async def main():
+        q = BackgroundQueue("t_giveup", workers=1, max_retries=1, backoff_sec=0.001)
+        ran = []
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        async def ok():
+            ran.append("ok")
+
+        q.submit("broken", broken)
+        q.submit("ok", ok)
+        await q.drain(1.0)
+        return ran
+
+    failed = _count("bg_failed{queue=t_giveup}")
+    assert asyncio.run(main()) == ["ok"]
+    assert _count("bg_failed{queue=t_giveup}") == failed + 1
+
+
+def test_drain_finishes_pending_jobs_then_rejects_new_ones():
+    async def main():
+        q = BackgroundQueue("t_drain", workers=2)
+        done = []
+
+        def job(i):
+            async def run():
+                await asyncio.sleep(0.01)
+                done.append(i)
+            return run
+
+        for i in range(5):
+            assert q.submit(f"j{i}", job(i))
+        await q.drain(1.0)
+        assert sorted(done) == list(range(5))
+        assert not q.submit("late", job(99))
+        assert q._tasks == []
+
+    asyncio.run(main())
+
+
+def test_drain_gives_up_on_a_stuck_job_after_timeout():
+    async def main():
+        q = BackgroundQueue("t_stuck", workers=1)
+        cancelled = asyncio.Event()
+
+        async def stuck():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        q.submit("stuck", stuck)
+        await asyncio.sleep(0)
+        await asyncio.wait_for(q.drain(0.05), timeout=1.0)
+        assert cancelled.is_set()
+
+    asyncio.run(main())
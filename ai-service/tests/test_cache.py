@@ -0,0 +1,26 @@
+# tests/test_cache.py
+import asyncio
+import time
+
+from common.cache import DiskCache, TieredCache, TTLCache
+
+
+def test_disk_hit_keeps_remaining_ttl_in_memory(tmp_path, monkeypatch):
+    disk = DiskCache(tmp_path, max_entries=10, max_bytes=1 << 20, ttl_sec=100)
+    cache = TieredCache("t_promote", memory=TTLCache(max_entries=10, ttl_sec=1000), disk=disk)
+
+    disk.put("k", "v")
+    # 디스크에 저장된 지 90초 지난 상태 -> 남은 TTL 10초
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 90)
+    assert asyncio.run(cache.get("k")) == "v"
+
+    expires_at, _ = cache.memory._data["k"]
+    assert expires_at - time.monotonic() <= 10.5
+
+
+def test_memory_put_never_exceeds_own_ttl():
+    mem = TTLCache(max_entries=10, ttl_sec=5)
+    mem.put("k", "v", ttl_sec=60)
+    expires_at, _ = mem._data["k"]
+    assert expires_at - time.monotonic() <= 5.1
@@ -0,0 +1,73 @@
+# tests/test_indexer.py
+import asyncio
+
+import numpy as np
+import pytest
+
+from common import background
+from common.background import BackgroundQueue
+from common.embedding import Embedded
+from memory import indexer
+
+
+class FlakyEmbedder:
+    """처음 fail_times번은 upstream 실패(fallback 벡터)를 돌려줌."""
+
+    def __init__(self, fail_times):
+        self.fail_times = fail_times
+        self.calls = 0
+
+    async def embed(self, texts):
+        self.calls += 1
+        fallback = np.full(len(texts), self.calls <= self.fail_times)
+        return Embedded(np.ones((len(texts), 8), np.float32), fallback)
+
+
+class FakeVdb:
+    def __init__(self):
+        self.added = []
+
+    def add(self, child_id, ids, vectors, metas):
+        self.added.append((child_id, list(ids), [m["kind"] for m in metas]))
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    monkeypatch.setattr(background, "_queues", [])
+    vdb = FakeVdb()
+    monkeypatch.setattr(indexer, "get_vdb", lambda: vdb)
+    monkeypatch.setattr(indexer, "_queue", BackgroundQueue("t_memory_index", max_retries=2, backoff_sec=0.001))
+    return vdb
+
+
+def test_fallback_embedding_is_retried_and_never_stored(fakes, monkeypatch):
+    embedder = FlakyEmbedder(fail_times=1)
+    monkeypatch.setattr(indexer, "get_embedder", lambda: embedder)
+
+    async def main():
+        assert indexer.enqueue_diary_summary("c1", "s1", summary="공룡 놀이", keyword="공룡", emotion="happy")
+        await indexer._queue.drain(1.0)
+
+    asyncio.run(main())
+    assert embedder.calls == 2
+    assert fakes.added == [("c1", ["diary:s1:summary", "diary:s1:keyword", "diary:s1:emotion"],
+                            ["summary", "keyword", "emotion"])]
+
+
+def test_upstream_down_gives_up_without_storing(fakes, monkeypatch):
+    embedder = FlakyEmbedder(fail_times=10)
+    monkeypatch.setattr(indexer, "get_embedder", lambda: embedder)
+
+    async def main():
+        indexer.enqueue_diary_summary("c1", "s1", summary="s", keyword="k", emotion="sad")
+        await indexer._queue.drain(1.0)
+
+    asyncio.run(main())
+    assert embedder.calls == 3  # 1번 + 재시도 2번
+    assert fakes.added == []
+
+
+def test_direct_call_raises_embedding_unavailable(fakes, monkeypatch):
+    monkeypatch.setattr(indexer, "get_embedder", lambda: FlakyEmbedder(fail_times=1))
+    with pytest.raises(indexer.EmbeddingUnavailable):
+        asyncio.run(indexer.index_diary_summary("c1", "s1", summary="s", keyword="k", emotion="sad"))
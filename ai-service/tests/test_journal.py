@@ -0,0 +1,72 @@
+# tests/test_journal.py
+import asyncio
+import os
+
+from common import journal as journal_mod
+from common.journal import SessionJournal
+
+
+def test_batch_wider_than_open_file_limit_is_fully_synced(tmp_path, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(journal_mod.os, "fsync", lambda fd: (synced.append(fd), real_fsync(fd)))
+
+    async def main():
+        j = SessionJournal(tmp_path, fsync_interval_sec=0.2, compact_every=2, max_open_files=2)
+        try:
+            # 한 batch에서 열린 파일 한도(2)보다 많은 세션에 기록 -> 닫히는 handle도 fsync돼야 함
+            for i in range(6):
+                j.append(f"s{i}", 0, f"u{i}", f"a{i}")
+                j.append(f"s{i}", 1, f"u{i}b", f"a{i}b")
+            await j.flush()
+
+            for i in range(6):
+                turn_log = await j.load(f"s{i}")
+                assert turn_log is not None and turn_log.turn_count == 2
+                # compact_every=2 -> 모든 세션이 스냅샷으로 합쳐짐(중간에 멈추지 않음)
+                assert (tmp_path / f"{SessionJournal._key(f's{i}')}.snapshot.json").exists()
+        finally:
+            j.close()
+
+    asyncio.run(main())
+    assert len(synced) >= 6
+
+
+def test_partial_last_line_is_truncated_before_appending(tmp_path):
+    async def main():
+        j = SessionJournal(tmp_path, fsync_interval_sec=0.01, compact_every=100)
+        j.append("s1", 0, "u0", "a0")
+        await j.flush()
+        j.close()
+
+        # 쓰는 도중 크래시 -> 개행 없이 잘린 마지막 줄
+        path = tmp_path / f"{SessionJournal._key('s1')}.jsonl"
+        with open(path, "ab") as f:
+            f.write(b'{"n": 1, "u": "u1", "a')
+
+        j = SessionJournal(tmp_path, fsync_interval_sec=0.01, compact_every=100)
+        try:
+            j.append("s1", 1, "u1", "a1")
+            j.append("s1", 2, "u2", "a2")
+            await j.flush()
+            turn_log = await j.load("s1")
+            assert turn_log is not None and turn_log.turn_count == 3
+            assert path.read_bytes().count(b"\n") == 3
+        finally:
+            j.close()
+
+    asyncio.run(main())
+
+
+def test_unparseable_line_is_skipped_not_the_rest(tmp_path):
+    key = SessionJournal._key("s1")
+    (tmp_path / f"{key}.jsonl").write_text(
+        '{"n": 0, "u": "u0", "a": "a0"}\n{"n": 1, "u": "u1", "a\n{"n": 1, "u": "u1", "a": "a1"}\n',
+        encoding="utf-8",
+    )
+    j = SessionJournal(tmp_path)
+    try:
+        turn_log = j._read(key)
+    finally:
+        j.close()
+    assert turn_log.turn_count == 2
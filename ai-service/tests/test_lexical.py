@@ -0,0 +1,59 @@
+# tests/test_lexical.py
+import numpy as np
+import pytest
+
+from memory import lexical
+from memory.lexical import LexicalIndex, fuse, terms, to_jamo
+from memory.vdb import Collection, Hit
+
+DOCS = [
+    ("d1", "강아지랑 공원에서 공놀이를 했다"),
+    ("d2", "공룡 그림을 그리며 신났다"),
+    ("d3", "친구와 싸워서 속상했다"),
+]
+
+
+def _index():
+    return LexicalIndex([i for i, _ in DOCS], [{"text": t} for _, t in DOCS])
+
+
+def test_jamo_and_terms():
+    assert to_jamo("먹었어") == "ㅁㅓㄱㅇㅓㅆㅇㅓ"
+    assert terms("강아지가") == ["w:강아지가", "b:강아", "b:아지", "b:지가"]
+
+
+def test_search_matches_through_particles():
+    hits = _index().search("강아지가 보고 싶어", k=3)
+    assert hits[0].id == "d1"
+    assert all(0 < h.score <= 1 for h in hits)
+
+
+def test_unrelated_query_has_no_hits():
+    assert _index().search("xyz", k=3) == []
+    assert LexicalIndex([], []).search("강아지") == []
+
+
+def test_reuse_keeps_features_of_unchanged_docs():
+    old = _index()
+    new = LexicalIndex(["d1", "d4"], [{"text": DOCS[0][1]}, {"text": "바다에서 수영했다"}], reuse=old)
+    assert new._features[DOCS[0][1]] is old._features[DOCS[0][1]]
+    assert new.search("바다 수영", k=1)[0].id == "d4"
+
+
+def test_for_collection_rebuilds_only_when_memories_change(tmp_path):
+    col = Collection(tmp_path, 8, index="flat")
+    vecs = np.eye(8, dtype=np.float32)[:3]
+    col.add([i for i, _ in DOCS], vecs, [{"text": t} for _, t in DOCS])
+
+    first = lexical.for_collection(col)
+    assert lexical.for_collection(col) is first
+    col.delete(["d1"])
+    second = lexical.for_collection(col)
+    assert second is not first and "d1" not in second.ids
+
+
+def test_fuse_normalizes_each_list_and_merges_ids():
+    dense = [Hit("a", 0.8, {}), Hit("b", 0.4, {})]
+    lex = [Hit("b", 2.0, {}), Hit("c", 1.0, {})]
+    fused = {h.id: h.score for h in fuse(dense, lex, alpha=0.5)}
+    assert fused == pytest.approx({"a": 0.5, "b": 0.75, "c": 0.25})
@@ -0,0 +1,56 @@
+# tests/test_recall.py
+import asyncio
+
+import numpy as np
+
+from common.embedding import Embedded
+from memory import recall
+from memory.vdb import Hit
+
+LEX_HIT = Hit("lex", 0.9, {"text": "강아지"})
+DENSE_HIT = Hit("dense", 0.9, {"text": "공룡"})
+
+
+class FakeEmbedder:
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    async def embed(self, texts):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return Embedded(np.ones((len(texts), 8), np.float32), np.zeros(len(texts), bool))
+
+
+class FakeVdb:
+    def search(self, child_id, vector, k):
+        return [DENSE_HIT]
+
+
+def _patch(monkeypatch, delay):
+    embedder = FakeEmbedder(delay)
+    monkeypatch.setattr(recall, "get_embedder", lambda: embedder)
+    monkeypatch.setattr(recall, "get_vdb", lambda: FakeVdb())
+    monkeypatch.setattr(recall, "_lexical", lambda child_id, text, k: [LEX_HIT])
+    return embedder
+
+
+def test_default_mode_never_calls_the_embedder(monkeypatch):
+    embedder = _patch(monkeypatch, 0)
+    hits, source, state = asyncio.run(recall._search("c1", "강아지 얘기", 3, recall.settings.RECALL_MODE, 80))
+    assert recall.settings.RECALL_MODE == "lexical"
+    assert (hits, source, state) == ([LEX_HIT], "lexical", "off")
+    assert embedder.calls == 0
+
+
+def test_hybrid_falls_back_to_lexical_when_embedding_misses_the_budget(monkeypatch):
+    _patch(monkeypatch, 1.0)
+    hits, source, state = asyncio.run(recall._search("c1", "강아지 얘기", 3, "hybrid", 50))
+    assert (hits, source, state) == ([LEX_HIT], "lexical", "timeout")
+
+
+def test_hybrid_fuses_dense_when_embedding_fits_the_budget(monkeypatch):
+    _patch(monkeypatch, 0)
+    hits, source, state = asyncio.run(recall._search("c1", "강아지 얘기", 3, "hybrid", 500))
+    assert (source, state) == ("hybrid", "ok")
+    assert {h.id for h in hits} == {"lex", "dense"}
@@ -0,0 +1,128 @@
+# tests/test_session_backend.py
+"""RedisBackend는 로컬 stand-in(FakeRedis)으로 검증합니다. redis 서버 없이 실행됩니다."""
+import asyncio
+import time
+
+from common.session_backend import RedisBackend, SQLiteBackend
+
+
+class _FakePipeline:
+    def __init__(self, server: "FakeRedis", transaction: bool) -> None:
+        self.server = server
+        self.transaction = transaction
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.commands = []
+
+    def rpush(self, key, *values):
+        self.commands.append(("rpush", key, values))
+
+    def expire(self, key, ttl):
+        self.commands.append(("expire", key, ttl))
+
+    async def execute(self):
+        # 실제 서버의 MULTI/EXEC처럼 await 없이 한 번에 적용 (다른 명령이 끼어들 수 없음)
+        self.server.transactions.append([c[0] for c in self.commands])
+        results = []
+        for name, key, arg in self.commands:
+            if name == "rpush":
+                self.server.lists.setdefault(key, []).extend(arg)
+                results.append(len(self.server.lists[key]))
+            else:
+                self.server.ttls[key] = arg
+                results.append(key in self.server.lists)
+        return results
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.lists = {}
+        self.ttls = {}
+        self.transactions = []
+        self.closed = False
+
+    def pipeline(self, transaction: bool = True):
+        assert transaction, "append_turn must use MULTI/EXEC"
+        return _FakePipeline(self, transaction)
+
+    async def lrange(self, key, start, end):
+        await asyncio.sleep(0)
+        items = self.lists.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    async def llen(self, key):
+        await asyncio.sleep(0)
+        return len(self.lists.get(key, []))
+
+    async def delete(self, key):
+        await asyncio.sleep(0)
+        self.ttls.pop(key, None)
+        return int(self.lists.pop(key, None) is not None)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_append_turn_is_atomic_and_counts_turns():
+    async def main():
+        fake = FakeRedis()
+        backend = RedisBackend("roleplay", idle_ttl_sec=60, client=fake)
+
+        assert await backend.append_turn("s1", "안녕", "반가워") == 1
+        results = await asyncio.gather(*(backend.append_turn("s1", f"u{i}", f"a{i}") for i in range(5)))
+        assert sorted(results) == [2, 3, 4, 5, 6]
+        assert await backend.turn_count("s1") == 6
+
+        # RPUSH(user, assistant) + EXPIRE 가 항상 한 트랜잭션
+        assert fake.transactions == [["rpush", "expire"]] * 6
+        key = backend._key("s1")
+        assert fake.ttls[key] == 60
+
+        messages = await backend.load("s1")
+        assert messages[:2] == [{"role": "user", "content": "안녕"}, {"role": "assistant", "content": "반가워"}]
+        # 턴끼리 섞이지 않음: user 다음엔 항상 같은 턴의 assistant
+        for user, assistant in zip(messages[2::2], messages[3::2]):
+            assert user["role"] == "user" and assistant["role"] == "assistant"
+            assert user["content"][1:] == assistant["content"][1:]
+
+        await backend.close()
+        assert fake.closed
+
+    asyncio.run(main())
+
+
+def test_delete_clears_session():
+    async def main():
+        fake = FakeRedis()
+        backend = RedisBackend("diary", client=fake)
+        await backend.append_turn("s1", "u", "a")
+        await backend.append_turn("s2", "u", "a")
+
+        await backend.delete("s1")
+        assert await backend.turn_count("s1") == 0
+        assert await backend.load("s1") == []
+        assert await backend.turn_count("s2") == 1
+
+    asyncio.run(main())
+
+
+def test_sqlite_sweep_counts_sessions_not_rows(tmp_path, monkeypatch):
+    async def main():
+        backend = SQLiteBackend("roleplay", tmp_path / "sessions.db", idle_ttl_sec=60)
+        for _ in range(3):
+            await backend.append_turn("old1", "u", "a")
+        await backend.append_turn("old2", "u", "a")
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 120)
+        await backend.append_turn("fresh", "u", "a")
+
+        assert backend.sweep() == 2
+        assert await backend.turn_count("old1") == 0
+        assert await backend.turn_count("fresh") == 1
+        assert backend.sweep() == 0
+
+    asyncio.run(main())
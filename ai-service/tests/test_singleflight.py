@@ -0,0 +1,71 @@
+# tests/test_singleflight.py
+import asyncio
+
+import pytest
+
+from common.singleflight import SingleFlight
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_abandoned_flight_is_cancelled_after_grace():
+    async def main():
+        flight = SingleFlight("t_abandon", abandon_grace_sec=0.05)
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiter = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1.0)
+        assert "k" not in flight
+
+    _run(main())
+
+
+def test_rejoin_within_grace_keeps_flight():
+    async def main():
+        flight = SingleFlight("t_rejoin", abandon_grace_sec=0.1)
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.2)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.05)  # grace 안에 재시도
+        assert await flight.do("k", work) == "done"
+        assert calls == 1
+
+    _run(main())
+
+
+def test_without_grace_flight_outlives_waiters():
+    async def main():
+        flight = SingleFlight("t_keep")
+        done = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            done.set()
+
+        waiter = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(done.wait(), timeout=1.0)
+
+    _run(main())
@@ -0,0 +1,79 @@
+# tests/test_stream_lock.py
+"""스트리밍 턴의 세션 lock은 generator를 한 번도 읽지 않고 버려도 풀려야 합니다."""
+import asyncio
+import gc
+
+import pytest
+
+from common.errors import AppError
+from common.session_actor import SessionActors
+from schemas.diary import DiaryChatRequest
+from schemas.roleplay import RoleplayRequest
+from services import diary_service, roleplay_service
+
+
+async def _fake_stream(**_):
+    async def deltas():
+        yield "안녕"
+    return deltas()
+
+
+async def _fake_messages(_req):
+    return [{"role": "user", "content": "hi"}]
+
+
+@pytest.fixture(params=["queue", "reject"])
+def services(request, monkeypatch):
+    for mod in (roleplay_service, diary_service):
+        monkeypatch.setattr(mod, "_actors", SessionActors(mod.__name__, policy=request.param))
+        monkeypatch.setattr(mod, "stream_text_async", _fake_stream)
+        monkeypatch.setattr(mod, "_build_messages", _fake_messages)
+    return request.param
+
+
+def _roleplay():
+    return roleplay_service.reply_stream(RoleplayRequest(session_id="s1", role="friend", user_text="hi"))
+
+
+def _diary():
+    return diary_service.chat_stream(DiaryChatRequest(session_id="s1", child_id="c1", user_text="hi"))
+
+
+@pytest.mark.parametrize("start", [_roleplay, _diary])
+def test_unstarted_stream_releases_lock(services, start):
+    async def main():
+        stream = await start()
+        del stream  # 응답 시작 전에 끊긴 경우: 한 번도 읽지 않고 버려짐
+        gc.collect()
+        await asyncio.sleep(0)  # finalizer가 예약한 aclose 실행
+
+        # 같은 세션이 다음 턴을 바로 잡을 수 있어야 함 (queue면 대기, reject면 409가 나면 실패)
+        stream = await asyncio.wait_for(start(), timeout=1.0)
+        events = [e async for e in stream]
+        assert events and "event: done" in events[-1]
+
+    asyncio.run(main())
+
+
+def test_closed_stream_releases_lock(services):
+    async def main():
+        stream = await _roleplay()
+        await stream.aclose()  # sse_response의 BackgroundTask가 하는 정리
+        stream = await asyncio.wait_for(_roleplay(), timeout=1.0)
+        await stream.aclose()
+
+    asyncio.run(main())
+
+
+def test_busy_session_is_rejected_while_streaming(services):
+    if services != "reject":
+        pytest.skip("reject policy only")
+
+    async def main():
+        stream = await _roleplay()
+        with pytest.raises(AppError) as e:
+            await _roleplay()
+        assert e.value.status_code == 409
+        await stream.aclose()
+
+    asyncio.run(main())
@@ -0,0 +1,19 @@
+# tests/test_stt_prepare.py
+from config import settings
+from services.stt_service import _passthrough_ok
+
+
+def test_short_compressed_clip_is_passed_through():
+    assert _passthrough_ok("mp3", 100 * 1024, "roleplay")
+    assert not _passthrough_ok("webm", 100 * 1024, "roleplay")
+
+
+def test_diary_is_always_decoded():
+    # 일기는 길어지기 쉬워 VAD/분할을 거치도록 항상 디코딩
+    assert not _passthrough_ok("m4a", 10 * 1024, "diary")
+
+
+def test_long_clip_is_decoded_for_segmentation():
+    max_bytes = int(settings.STT_SEGMENT_MAX_SEC * settings.STT_PASSTHROUGH_MIN_KBPS * 1000 / 8)
+    assert _passthrough_ok("m4a", max_bytes, "fiveq")
+    assert not _passthrough_ok("m4a", max_bytes + 1, "fiveq")
@@ -0,0 +1,62 @@
+# tests/test_vdb.py
+import numpy as np
+
+from memory.vdb import Collection
+
+
+def _vecs(n, dim=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_add_search_delete_survive_reopen(tmp_path):
+    v = _vecs(3)
+    col = Collection(tmp_path, 8, index="flat")
+    col.add(["a", "b", "c"], v, [{"text": "a"}, {"text": "b"}, {"text": "c"}])
+    col.add(["b"], v[2:3], [{"text": "b2"}])  # upsert
+    col.delete(["c"])
+    col.close()
+
+    col = Collection(tmp_path, 8, index="flat")
+    assert len(col) == 2
+    assert col.get("b") == {"text": "b2"}
+    assert col.get("c") is None
+    assert col.search(v[0], k=1)[0][0].id == "a"
+
+
+def test_partial_meta_line_does_not_lose_later_segments(tmp_path):
+    v = _vecs(3)
+    col = Collection(tmp_path, 8, index="flat")
+    col.add(["a"], v[:1])
+    col.flush()
+
+    # meta 줄을 쓰던 중 크래시
+    with open(tmp_path / "meta.jsonl", "ab") as f:
+        f.write(b'{"op": "add", "seg": "seg-000002.npy", "ids": ["x"')
+
+    col = Collection(tmp_path, 8, index="flat")
+    col.add(["b"], v[1:2])
+    col.flush()
+    col = Collection(tmp_path, 8, index="flat")
+    col.add(["c"], v[2:3])
+    col.flush()
+
+    col = Collection(tmp_path, 8, index="flat")
+    assert sorted(col.docs()[0]) == ["a", "b", "c"]
+    assert len(list(tmp_path.glob("seg-*"))) == 3
+
+
+def test_record_glued_onto_partial_line_is_recovered(tmp_path):
+    """잘린 줄 뒤에 다음 기록이 붙은 meta.jsonl(이전 버전이 남긴 파일)도 그 기록과 세그먼트를 살림."""
+    v = _vecs(2)
+    col = Collection(tmp_path, 8, index="flat")
+    col.add(["a"], v[:1])
+    col.flush()
+    col.add(["b"], v[1:2])
+    col.flush()
+
+    meta = (tmp_path / "meta.jsonl").read_bytes().split(b"\n")
+    (tmp_path / "meta.jsonl").write_bytes(meta[0] + b"\n" + b'{"op": "del", "ids": ["z' + meta[1] + b"\n")
+
+    col = Collection(tmp_path, 8, index="flat")
+    assert sorted(col.docs()[0]) == ["a", "b"]
+    assert col.search(v[1], k=1)[0][0].id == "b"
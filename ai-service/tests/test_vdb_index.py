@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+
+from memory import ann
+from memory.vdb import Collection
+
+
+def _vecs(n, dim=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def test_index_build_runs_outside_the_lock(tmp_path, monkeypatch):
+    """학습 중에도 검색/추가가 막히지 않고, 그 사이 추가된 행도 새 인덱스에 들어가야 함."""
+    col = Collection(tmp_path, 16, index="ivf", ann_min_vectors=1000)
+    col.add([f"a{i}" for i in range(2000)], _vecs(2000))
+
+    training, release = threading.Event(), threading.Event()
+    seen = {}
+    train = ann.IVFIndex.train
+
+    def slow_train(self, x, **kw):
+        seen["sample"] = x.shape[0]
+        training.set()
+        assert release.wait(5)
+        return train(self, x, **kw)
+
+    monkeypatch.setattr(ann.IVFIndex, "train", slow_train)
+    t = threading.Thread(target=col.flush)
+    t.start()
+    assert training.wait(5)
+
+    # 학습 중: 전체 스캔으로 검색되고 추가도 바로 끝남
+    late = _vecs(10, seed=1)
+    col.add([f"b{i}" for i in range(10)], late)
+    assert col.search(late[0], k=1)[0][0].id == "b0"
+    assert col.index is None
+
+    release.set()
+    t.join(5)
+    assert col.index is not None
+    assert col.index.ntotal == 2010
+    assert seen["sample"] == col.index.train_size(2000)
+    assert col.search(late[3], k=1, nprobe=len(col.index.lists))[0][0].id == "b3"
+
+
+def test_compaction_during_build_restarts(tmp_path, monkeypatch):
+    col = Collection(tmp_path, 16, index="ivf", ann_min_vectors=1000)
+    col.add([f"a{i}" for i in range(2000)], _vecs(2000))
+    col.flush()
+    assert col.index is not None
+
+    col.delete([f"a{i}" for i in range(1500)])
+    add = ann.IVFIndex.add
+    compacted = []
+
+    def add_then_compact(self, rows, x):
+        # 첫 재할당 도중 다른 스레드에서 compaction이 일어난 상황
+        if not compacted:
+            compacted.append(True)
+            threading.Thread(target=col._compact).start()
+            threading.Event().wait(0.2)
+        return add(self, rows, x)
+
+    monkeypatch.setattr(ann.IVFIndex, "add", add_then_compact)
+    col.compact()
+    assert col.index is not None
+    assert col.index.ntotal == len(col) == 500
+    hit = col.search(_vecs(2000)[1999], k=1, nprobe=len(col.index.lists))[0][0]
+    assert hit.id == "a1999"